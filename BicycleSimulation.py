@@ -8,9 +8,16 @@ import time
 import os
 import sys
 from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, List, Tuple, Optional, Set
 
+import numpy as np
+
+from autopilot import AUTOPILOT_FILE, load_autopilot, mix_plan
+from demand_model import QUALITIES, QUALITY_ELASTICITY, ElasticDemandModel
+from instrumentation import PhaseTimer
+from price_optimizer import get_price_optimizer
+
 # Try to import optional graphing modules
 try:
     import pandas as pd
@@ -38,6 +45,29 @@ UNSKILLED_WORKER_MONTHLY_HOURS = 150  # Monthly working hours for unskilled work
 SKILLED_WORKER_MONTHLY_SALARY = 3200  # Monthly salary for skilled workers
 UNSKILLED_WORKER_MONTHLY_SALARY = 1800  # Monthly salary for unskilled workers
 
+# Prefixes of the part names in the Streamlit catalog, which the autopilot strategies use
+CATALOG_PART_PREFIXES = {
+    "wheelset": "laufradsatz",
+    "frame": "rahmen",
+    "handlebar": "lenker",
+    "saddle": "sattel",
+    "gear": "schaltung",
+    "motor": "motor",
+}
+
+
+def catalog_name(name):
+    """Catalog name of a bicycle model or market, e.g. E-Mountainbike -> e_mountainbike"""
+    return name.lower().replace("-", "_")
+
+
+def catalog_part_name(component_type, component_name):
+    """Catalog name of a component, e.g. frame Herrenrahmen Basic -> rahmen_herren"""
+    word = component_name.split()[0].lower()
+    if component_type == "frame":
+        word = word.replace("rahmen", "")
+    return f"{CATALOG_PART_PREFIXES[component_type]}_{word}"
+
 
 # Data structures
 @dataclass
@@ -78,6 +108,7 @@ class Market:
     location: str
     preferences: Dict[str, float]
     price_sensitivity: Dict[str, float]
+    price_elasticity: Dict[str, float] = field(default_factory=dict)
 
 
 class BicycleSimulation:
@@ -98,6 +129,15 @@ class BicycleSimulation:
         self.game_over = False
         self.enable_graphing = GRAPHING_AVAILABLE
 
+        # Background dashboard renders started from the graphs menu
+        self.pending_renders = []
+
+        # Flattened monthly reports shared by the dashboards (dashboards.ReportsTable, created on first use)
+        self.report_table = None
+
+        # Opt-in timing of the month-end phases (set BIKESIM_PHASE_TIMING=1 to enable)
+        self.timer = PhaseTimer(enabled=os.environ.get("BIKESIM_PHASE_TIMING", "") not in ("", "0"))
+
         # Initialize components, bicycles, suppliers, and markets
         self.initialize_components()
         self.initialize_bicycles()
@@ -416,6 +456,14 @@ class BicycleSimulation:
                     "standard": 0.35,
                     "premium": 0.15,
                 },
+                {
+                    "Herrenrad": 1.6,
+                    "Damenrad": 1.6,
+                    "E-Bike": 1.2,
+                    "Rennrad": 1.5,
+                    "Mountainbike": 1.5,
+                    "E-Mountainbike": 1.4,
+                },
             ),
             "Toulouse": Market(
                 "Toulouse",
@@ -433,6 +481,14 @@ class BicycleSimulation:
                     "standard": 0.40,
                     "premium": 0.20,
                 },
+                {
+                    "Rennrad": 1.1,
+                    "E-Mountainbike": 1.1,
+                    "Mountainbike": 1.2,
+                    "Herrenrad": 1.7,
+                    "Damenrad": 1.7,
+                    "E-Bike": 1.4,
+                },
             ),
         }
 
@@ -449,6 +505,50 @@ class BicycleSimulation:
                 "premium": 0,
             }
 
+        # Selling prices per market, model and quality; they start at the reference prices
+        self.market_prices = {
+            market_name: {
+                bike_model: {quality: self.reference_price(market_name, bike_model, quality) for quality in QUALITIES}
+                for bike_model in self.bicycles
+            }
+            for market_name in self.markets
+        }
+        self.demand_model = self.build_demand_model()
+
+    def reference_price(self, market_name, bike_model, quality):
+        """Default selling price of a bicycle; demand is calibrated to this price"""
+        base_price = 500  # Base price for a standard bicycle
+        if quality == "budget":
+            sale_price = base_price * 0.7
+        elif quality == "premium":
+            sale_price = base_price * 1.5
+        else:  # standard
+            sale_price = base_price
+
+        # Apply market adjustments
+        if market_name == "Toulouse":  # Higher prices in Toulouse
+            sale_price *= 1.1
+
+        # Apply quality adjustments based on bicycle model
+        if bike_model in ["E-Bike", "E-Mountainbike"]:
+            sale_price *= 1.3  # E-bikes command higher prices
+        elif bike_model == "Mountainbike":
+            sale_price *= 1.1  # Mountain bikes slightly more expensive
+        elif bike_model == "Rennrad":
+            sale_price *= 1.15  # Racing bikes slightly more expensive
+
+        return sale_price
+
+    def build_demand_model(self):
+        """Price-elastic demand over markets x models x qualities (see demand_model.py)"""
+        markets = list(self.markets)
+        models = list(self.bicycles)
+        reference_prices = [[[self.reference_price(market_name, bike_model, quality) for quality in QUALITIES]
+                             for bike_model in models] for market_name in markets]
+        elasticity = [[[self.markets[market_name].price_elasticity.get(bike_model, 1.5) * QUALITY_ELASTICITY[quality]
+                        for quality in QUALITIES] for bike_model in models] for market_name in markets]
+        return ElasticDemandModel(markets, models, QUALITIES, reference_prices, elasticity)
+
     def initialize_warehouse(self):
         """Initialize warehouse with starting materials for 10 standard bicycles"""
         # Initial components for 10 standard bicycles
@@ -618,10 +718,12 @@ class BicycleSimulation:
             print("\n1. Transport bicycles to Münster market")
             print("2. Transport bicycles to Toulouse market")
             print("3. View market preferences")
+            print("4. Set selling prices")
+            print("5. Suggest optimal prices")
             print("0. Back to main menu")
 
             try:
-                choice = int(input("\nSelect option (0-3): "))
+                choice = int(input("\nSelect option (0-5): "))
                 if choice == 0:
                     break
                 elif choice == 1:
@@ -630,6 +732,10 @@ class BicycleSimulation:
                     self.transport_bicycles_to_market("Toulouse")
                 elif choice == 3:
                     self.view_market_preferences()
+                elif choice == 4:
+                    self.set_market_prices()
+                elif choice == 5:
+                    self.suggest_market_prices()
                 else:
                     print("Invalid choice. Please try again.")
                     time.sleep(1)
@@ -637,6 +743,138 @@ class BicycleSimulation:
                 print("Please enter a number.")
                 time.sleep(1)
 
+    def set_market_prices(self):
+        """Let the player change the selling price of a model and quality in one market"""
+        self.print_header()
+
+        print("\n" + "-" * 80)
+        print("SELLING PRICES".center(80))
+        print("-" * 80)
+
+        market_names = list(self.markets)
+        for i, market_name in enumerate(market_names, 1):
+            print(f"{i}. {market_name}")
+
+        try:
+            choice = int(input(f"\nSelect market (0-{len(market_names)}): "))
+            if choice == 0:
+                return
+            market_name = market_names[choice - 1]
+
+            models = list(self.bicycles)
+            prices = self.market_prices[market_name]
+            factors = self.demand_model.market_factors(market_name, prices)
+            print(f"\nCurrent prices in {market_name} (demand relative to the reference price):")
+            for i, bike_model in enumerate(models, 1):
+                entries = ", ".join(f"{quality} {prices[bike_model][quality]:.2f} € ({factors[bike_model][quality] * 100:.0f}%)"
+                                    for quality in QUALITIES)
+                print(f"{i}. {bike_model}: {entries}")
+
+            bike_model = models[int(input(f"\nSelect model (1-{len(models)}): ")) - 1]
+            quality = QUALITIES[int(input("Select quality (1. Budget, 2. Standard, 3. Premium): ")) - 1]
+            reference = self.reference_price(market_name, bike_model, quality)
+            price = float(input(f"New price for {quality} {bike_model} (reference {reference:.2f} €): "))
+            if price <= 0:
+                print("The price must be positive.")
+            else:
+                prices[bike_model][quality] = price
+                factor = self.demand_model.market_factors(market_name, prices)[bike_model][quality]
+                print(f"Price set. Expected demand: {factor * 100:.0f}% of the demand at the reference price.")
+        except (ValueError, IndexError):
+            print("Invalid input.")
+
+        input("\nPress Enter to continue...")
+
+    def component_unit_costs(self):
+        """Component cost per bicycle model at the cheapest supplier"""
+        costs = {}
+        for bike_model, bike in self.bicycles.items():
+            cost = 0
+            for component_type, component_name in (("wheelset", bike.wheels), ("frame", bike.frame),
+                                                   ("handlebar", bike.handlebar), ("saddle", bike.saddle),
+                                                   ("gear", bike.gear), ("motor", bike.motor)):
+                if component_name == "NULL":
+                    continue
+                offers = [supplier.inventory[component_type][component_name] for supplier in self.suppliers.values()
+                          if component_name in supplier.inventory.get(component_type, {})]
+                cost += min(offers, default=0)
+            costs[bike_model] = cost
+        return costs
+
+    def optimize_prices(self, market_name, objective="revenue"):
+        """
+        Revenue- or margin-maximizing prices per model and quality for the bicycles currently in
+        a market. Returns {'prices', 'expected_sales', 'expected_revenue', 'expected_margin'},
+        each as {model: {quality: value}}. Results are cached per market stock.
+        """
+        model = self.demand_model
+        market = self.markets[market_name]
+        inventory = self.bicycles_in_market_muenster if market_name == "Muenster" else self.bicycles_in_market_toulouse
+
+        stock = [[inventory[bike_model][quality] for quality in QUALITIES] for bike_model in model.bike_types]
+        # Expected units sold at the reference price: stock times the mean sale percentage
+        # (model preference * quality preference * 1.4, the mean of the random factor)
+        base = [[inventory[bike_model][quality] * market.preferences.get(bike_model, 0.3)
+                 * market.price_sensitivity.get(quality, 0.4) * 1.4 for quality in QUALITIES]
+                for bike_model in model.bike_types]
+        unit_costs = None
+        if objective == "margin":
+            costs = self.component_unit_costs()
+            unit_costs = [[costs[bike_model]] * len(QUALITIES) for bike_model in model.bike_types]
+
+        result = get_price_optimizer(model).optimize(market_name, [[0.95 * q for q in row] for row in stock],
+                                                     unit_costs, objective, base)
+        return {name: {bike_model: dict(zip(QUALITIES, values[b].tolist()))
+                       for b, bike_model in enumerate(model.bike_types)}
+                for name, values in result.items()}
+
+    def suggest_market_prices(self):
+        """Show price suggestions for a market and optionally apply them"""
+        self.print_header()
+
+        print("\n" + "-" * 80)
+        print("PRICE SUGGESTIONS".center(80))
+        print("-" * 80)
+
+        market_names = list(self.markets)
+        for i, market_name in enumerate(market_names, 1):
+            print(f"{i}. {market_name}")
+
+        try:
+            choice = int(input(f"\nSelect market (0-{len(market_names)}): "))
+            if choice == 0:
+                return
+            market_name = market_names[choice - 1]
+            objective = "margin" if input("Maximize (r)evenue or (m)argin? [r]: ").strip().lower() == "m" else "revenue"
+        except (ValueError, IndexError):
+            print("Invalid input.")
+            time.sleep(1)
+            return
+
+        suggestion = self.optimize_prices(market_name, objective)
+        prices = self.market_prices[market_name]
+        print(f"\nSuggested prices in {market_name} (current price in brackets):")
+        any_stock = False
+        for bike_model, by_quality in suggestion["prices"].items():
+            for quality, price in by_quality.items():
+                expected = suggestion["expected_sales"][bike_model][quality]
+                if expected > 0:
+                    any_stock = True
+                    print(f"  {bike_model} {quality}: {price:.2f} € ({prices[bike_model][quality]:.2f} €), "
+                          f"expected sales {expected:.1f}")
+
+        if not any_stock:
+            print("  No bicycles in this market.")
+        else:
+            total = sum(sum(by_quality.values()) for by_quality in suggestion[f"expected_{objective}"].values())
+            print(f"\nExpected {objective}: {total:.2f} €")
+            if input("Apply these prices? (y/n): ").strip().lower() == "y":
+                for bike_model, by_quality in suggestion["prices"].items():
+                    prices[bike_model].update(by_quality)
+                print("Prices updated.")
+
+        input("\nPress Enter to continue...")
+
     def transport_bicycles_to_market(self, market_name):
         """Transport bicycles from warehouse to a specific market"""
         while True:
@@ -867,75 +1105,12 @@ class BicycleSimulation:
 
         time.sleep(1)
 
-    def advance_month(self):
-        """Advance to the next month"""
-        self.print_header()
-
-        # Confirm with the player
-        confirm = input("Advance to the next month? (y/n): ")
-        if confirm.lower() != 'y':
-            return
-
-        # Process monthly costs
-        monthly_expenses = 0
-
-        # Warehouse rent
-        warehouse_rent = WAREHOUSE_DE_RENT + WAREHOUSE_FR_RENT
-        self.balance -= warehouse_rent
-        monthly_expenses += warehouse_rent
-
-        # Staff salaries
-        staff_cost = (self.skilled_workers * SKILLED_WORKER_MONTHLY_SALARY) + \
-                     (self.unskilled_workers * UNSKILLED_WORKER_MONTHLY_SALARY)
-        self.balance -= staff_cost
-        monthly_expenses += staff_cost
-
-        # Process market sales
-        muenster_sales = self.process_market_sales("Muenster", self.bicycles_in_market_muenster)
-        toulouse_sales = self.process_market_sales("Toulouse", self.bicycles_in_market_toulouse)
-        monthly_revenue = muenster_sales + toulouse_sales
-
-        # Update financial tracking
-        self.total_revenue += monthly_revenue
-        self.total_expenses += monthly_expenses
-
-        # Create monthly report
-        monthly_report = {
-            "month": self.current_month,
-            "revenue": monthly_revenue,
-            "expenses": monthly_expenses,
-            "profit_loss": monthly_revenue - monthly_expenses
-        }
-        self.monthly_reports.append(monthly_report)
-
-        # Advance to next month
-        self.current_month += 1
-
-        # Check for game over condition
-        if self.balance < 0:
-            self.game_over = True
-            self.print_header()
-            print("\n" + "!" * 80)
-            print("GAME OVER".center(80))
-            print("!" * 80)
-            print("\nYou have run out of funds. Your bicycle business is bankrupt.")
-            print(f"You survived for {self.current_month - 1} months.")
-            print(f"Final balance: {self.balance:.2f} €")
-            print(f"Total revenue: {self.total_revenue:.2f} €")
-            print(f"Total expenses: {self.total_expenses:.2f} €")
-            input("\nPress Enter to exit...")
-        else:
-            print(f"\nAdvanced to month {self.current_month}")
-            print(f"Monthly revenue: {monthly_revenue:.2f} €")
-            print(f"Monthly expenses: {monthly_expenses:.2f} €")
-            print(f"Monthly profit/loss: {monthly_revenue - monthly_expenses:.2f} €")
-            print(f"New balance: {self.balance:.2f} €")
-            input("\nPress Enter to continue...")
-
-    def process_market_sales(self, market_name, market_inventory):
-        """Process sales in the specified market"""
-        # Get market preferences
+    def process_market_sales(self, market_name, market_inventory, verbose=True):
+        """Process sales in the specified market (verbose=False suppresses console output)"""
+        # Get market preferences and the demand response to the current prices
         market = self.markets[market_name]
+        prices = self.market_prices[market_name]
+        price_factors = self.demand_model.market_factors(market_name, prices)
 
         # Initialize total sales
         total_sales = 0
@@ -943,7 +1118,8 @@ class BicycleSimulation:
         sales_by_model = {}  # Track sales by bicycle model
         sales_by_quality = {"budget": 0, "standard": 0, "premium": 0}  # Track sales by quality
 
-        print(f"\nProcessing sales in {market_name} market:")
+        if verbose:
+            print(f"\nProcessing sales in {market_name} market:")
 
         # For each bicycle model in the market
         for bike_model, qualities in market_inventory.items():
@@ -956,7 +1132,8 @@ class BicycleSimulation:
             model_preference = market.preferences.get(bike_model, 0.3)  # Default to 30% if not specified
 
             # Show market preference for this model
-            print(f"  {bike_model} - Market preference: {model_preference * 100:.1f}%")
+            if verbose:
+                print(f"  {bike_model} - Market preference: {model_preference * 100:.1f}%")
 
             # Initialize model sales counter if not exists
             if bike_model not in sales_by_model:
@@ -974,8 +1151,11 @@ class BicycleSimulation:
                 # Calculate base sale probability
                 base_probability = model_preference * quality_preference
 
-                # Add randomness - but ensure we sell at least some bikes if available
-                sale_percentage = max(0.05, min(0.95, base_probability * random.uniform(0.8, 2.0)))
+                # Add randomness - but ensure we sell at least some bikes if available.
+                # Prices above the reference price lower the share sold, cheaper prices raise it;
+                # models without a price in the demand model sell at the neutral factor 1.0.
+                price_factor = price_factors.get(bike_model, {}).get(quality, 1.0)
+                sale_percentage = max(0.05, min(0.95, base_probability * random.uniform(0.8, 2.0) * price_factor))
 
                 # Ensure we sell at least 1 bike if there are any available
                 sales_quantity = max(1, int(quantity * sale_percentage))
@@ -988,26 +1168,10 @@ class BicycleSimulation:
                 if sales_quantity == 0:
                     continue
 
-                # Calculate sale price based on quality
-                base_price = 500  # Base price for a standard bicycle
-                if quality == "budget":
-                    sale_price = base_price * 0.7
-                elif quality == "premium":
-                    sale_price = base_price * 1.5
-                else:  # standard
-                    sale_price = base_price
-
-                # Apply market adjustments
-                if market_name == "Toulouse":  # Higher prices in Toulouse
-                    sale_price *= 1.1
-
-                # Apply quality adjustments based on bicycle model
-                if bike_model in ["E-Bike", "E-Mountainbike"]:
-                    sale_price *= 1.3  # E-bikes command higher prices
-                elif bike_model == "Mountainbike":
-                    sale_price *= 1.1  # Mountain bikes slightly more expensive
-                elif bike_model == "Rennrad":
-                    sale_price *= 1.15  # Racing bikes slightly more expensive
+                # Selling price set for this market (the reference price for models without one)
+                sale_price = prices.get(bike_model, {}).get(quality)
+                if sale_price is None:
+                    sale_price = self.reference_price(market_name, bike_model, quality)
 
                 # Calculate total revenue from these sales
                 revenue = sale_price * sales_quantity
@@ -1024,13 +1188,15 @@ class BicycleSimulation:
                 sales_by_model[bike_model] += sales_quantity
                 sales_by_quality[quality] += sales_quantity
 
-                print(
-                    f"    Sold {sales_quantity} {quality} {bike_model}(s) for {revenue:.2f} € ({sale_price:.2f} € each)")
+                if verbose:
+                    print(
+                        f"    Sold {sales_quantity} {quality} {bike_model}(s) for {revenue:.2f} € ({sale_price:.2f} € each)")
 
-        if total_bikes_sold == 0:
-            print(f"  No sales occurred in {market_name} this month.")
-        else:
-            print(f"  Total: {total_bikes_sold} bicycles sold for {total_sales:.2f} €")
+        if verbose:
+            if total_bikes_sold == 0:
+                print(f"  No sales occurred in {market_name} this month.")
+            else:
+                print(f"  Total: {total_bikes_sold} bicycles sold for {total_sales:.2f} €")
 
         # Return both total sales and detailed sales data
         return total_sales, total_bikes_sold, sales_by_model, sales_by_quality
@@ -1044,81 +1210,13 @@ class BicycleSimulation:
         if confirm.lower() != 'y':
             return
 
-        # Process monthly costs
-        monthly_expenses = 0
-
-        # Warehouse rent
-        warehouse_rent = WAREHOUSE_DE_RENT + WAREHOUSE_FR_RENT
-        self.balance -= warehouse_rent
-        monthly_expenses += warehouse_rent
-
-        # Staff salaries
-        staff_cost = (self.skilled_workers * SKILLED_WORKER_MONTHLY_SALARY) + \
-                     (self.unskilled_workers * UNSKILLED_WORKER_MONTHLY_SALARY)
-        self.balance -= staff_cost
-        monthly_expenses += staff_cost
-
-        # Process market sales with enhanced tracking
-        # Initialize sales trackers
-        total_bikes_sold = 0
-        total_sales_by_model = {}
-        total_sales_by_quality = {"budget": 0, "standard": 0, "premium": 0}
-        total_sales_by_market = {"Muenster": 0, "Toulouse": 0}
-
-        # Process Muenster market
-        muenster_sales, muenster_bikes, muenster_models, muenster_qualities = self.process_market_sales("Muenster",
-                                                                                                        self.bicycles_in_market_muenster)
-
-        # Process Toulouse market
-        toulouse_sales, toulouse_bikes, toulouse_models, toulouse_qualities = self.process_market_sales("Toulouse",
-                                                                                                        self.bicycles_in_market_toulouse)
-
-        # Calculate total values
-        monthly_revenue = muenster_sales + toulouse_sales
-        total_bikes_sold = muenster_bikes + toulouse_bikes
-        total_sales_by_market = {"Muenster": muenster_sales, "Toulouse": toulouse_sales}
-
-        # Merge model sales data
-        for model, quantity in muenster_models.items():
-            if model not in total_sales_by_model:
-                total_sales_by_model[model] = 0
-            total_sales_by_model[model] += quantity
-
-        for model, quantity in toulouse_models.items():
-            if model not in total_sales_by_model:
-                total_sales_by_model[model] = 0
-            total_sales_by_model[model] += quantity
-
-        # Merge quality sales data
-        for quality, quantity in muenster_qualities.items():
-            total_sales_by_quality[quality] += quantity
-
-        for quality, quantity in toulouse_qualities.items():
-            total_sales_by_quality[quality] += quantity
-
-        # Update financial tracking
-        self.total_revenue += monthly_revenue
-        self.total_expenses += monthly_expenses
-
-        # Create enhanced monthly report
-        monthly_report = {
-            "month": self.current_month,
-            "revenue": monthly_revenue,
-            "expenses": monthly_expenses,
-            "profit_loss": monthly_revenue - monthly_expenses,
-            "bikes_sold": total_bikes_sold,
-            "sales_by_market": total_sales_by_market,
-            "sales_by_model": total_sales_by_model,
-            "sales_by_quality": total_sales_by_quality
-        }
-        self.monthly_reports.append(monthly_report)
-
-        # Advance to next month
-        self.current_month += 1
+        monthly_report = self.close_month()
+        monthly_revenue = monthly_report["revenue"]
+        monthly_expenses = monthly_report["expenses"]
+        total_bikes_sold = monthly_report["bikes_sold"]
 
         # Check for game over condition
-        if self.balance < 0:
-            self.game_over = True
+        if self.game_over:
             self.print_header()
             print("\n" + "!" * 80)
             print("GAME OVER".center(80))
@@ -1136,8 +1234,98 @@ class BicycleSimulation:
             print(f"Monthly profit/loss: {monthly_revenue - monthly_expenses:.2f} €")
             print(f"Bicycles sold: {total_bikes_sold}")
             print(f"New balance: {self.balance:.2f} €")
+            if self.timer.enabled:
+                self.print_phase_timings()
             input("\nPress Enter to continue...")
 
+    def close_month(self, verbose=True):
+        """Process month-end costs and sales, record the monthly report and advance the month"""
+        timer = self.timer
+        timer.start_month(self.current_month)
+
+        # Process monthly costs
+        monthly_expenses = 0
+
+        # Warehouse rent
+        with timer.phase("rent"):
+            warehouse_rent = WAREHOUSE_DE_RENT + WAREHOUSE_FR_RENT
+            self.balance -= warehouse_rent
+            monthly_expenses += warehouse_rent
+
+        # Staff salaries
+        with timer.phase("salaries"):
+            staff_cost = (self.skilled_workers * SKILLED_WORKER_MONTHLY_SALARY) + \
+                         (self.unskilled_workers * UNSKILLED_WORKER_MONTHLY_SALARY)
+            self.balance -= staff_cost
+            monthly_expenses += staff_cost
+
+        # Process Muenster market
+        with timer.phase("sales_muenster"):
+            muenster_sales, muenster_bikes, muenster_models, muenster_qualities = self.process_market_sales(
+                "Muenster", self.bicycles_in_market_muenster, verbose=verbose)
+
+        # Process Toulouse market
+        with timer.phase("sales_toulouse"):
+            toulouse_sales, toulouse_bikes, toulouse_models, toulouse_qualities = self.process_market_sales(
+                "Toulouse", self.bicycles_in_market_toulouse, verbose=verbose)
+
+        with timer.phase("report"):
+            # Calculate total values
+            monthly_revenue = muenster_sales + toulouse_sales
+            total_bikes_sold = muenster_bikes + toulouse_bikes
+            total_sales_by_market = {"Muenster": muenster_sales, "Toulouse": toulouse_sales}
+            total_sales_by_model = {}
+            total_sales_by_quality = {"budget": 0, "standard": 0, "premium": 0}
+
+            # Merge model sales data
+            for model_sales in (muenster_models, toulouse_models):
+                for model, quantity in model_sales.items():
+                    total_sales_by_model[model] = total_sales_by_model.get(model, 0) + quantity
+
+            # Merge quality sales data
+            for quality_sales in (muenster_qualities, toulouse_qualities):
+                for quality, quantity in quality_sales.items():
+                    total_sales_by_quality[quality] += quantity
+
+            # Update financial tracking
+            self.total_revenue += monthly_revenue
+            self.total_expenses += monthly_expenses
+
+            # Create enhanced monthly report
+            monthly_report = {
+                "month": self.current_month,
+                "revenue": monthly_revenue,
+                "expenses": monthly_expenses,
+                "profit_loss": monthly_revenue - monthly_expenses,
+                "bikes_sold": total_bikes_sold,
+                "sales_by_market": total_sales_by_market,
+                "sales_by_model": total_sales_by_model,
+                "sales_by_quality": total_sales_by_quality
+            }
+            self.monthly_reports.append(monthly_report)
+
+        timer.end_month()
+
+        # Advance to next month
+        self.current_month += 1
+
+        # Check for game over condition
+        if self.balance < 0:
+            self.game_over = True
+
+        return monthly_report
+
+    def print_phase_timings(self):
+        """Print the phase timings of the last closed month and the averages of all measured months"""
+        last = self.timer.last()
+        if last is None:
+            return
+        print(f"\nMonth-end phase timings (month {last['month']}):")
+        for name, stats in self.timer.summary().items():
+            current = last["phases"].get(name, {"seconds": 0.0, "allocations": 0})
+            print(f"  {name:16} {current['seconds'] * 1000:8.3f} ms  {current['allocations']:7d} blocks"
+                  f"   avg {stats['mean_seconds'] * 1000:8.3f} ms  ({stats['share'] * 100:.1f}% of total)")
+
     def view_performance_graphs(self):
         """Generate and display performance graphs based on monthly reports"""
         if not GRAPHING_AVAILABLE:
@@ -1156,51 +1344,22 @@ class BicycleSimulation:
         print("\n" + "-" * 80)
         print("BUSINESS PERFORMANCE GRAPHS".center(80))
         print("-" * 80)
+        self.report_finished_renders()
         print("\nGenerating performance graphs...")
 
-        # Determine if we're in an interactive environment
-        # This uses a more reliable method than sys.stdout.isatty()
-        import matplotlib
-        is_interactive = True
-
-        try:
-            # Check if we're in a graphical environment
-            gui_backends = ['Qt5Agg', 'TkAgg', 'GTK3Agg', 'wxAgg', 'MacOSX']
-            current_backend = matplotlib.get_backend()
-
-            # If we're not using a GUI backend, try to set one
-            if current_backend not in gui_backends:
-                try:
-                    # Try to set a GUI backend
-                    for backend in gui_backends:
-                        try:
-                            matplotlib.use(backend, force=True)
-                            break
-                        except:
-                            continue
-                    else:
-                        # If all GUI backends failed, we're in a non-interactive environment
-                        is_interactive = False
-                except:
-                    is_interactive = False
-        except:
-            is_interactive = False
-
-        # Set a non-interactive backend if necessary
-        if not is_interactive:
-            try:
-                matplotlib.use('Agg', force=True)
-            except:
-                pass
+        # The backend is probed only once per process
+        from dashboards import select_backend
+        backend, is_interactive = select_backend()
 
         # Ask user which graphs to view
         print("\nSelect graph type to view:")
         print("1. Financial Performance")
         print("2. Sales Analysis")
         print("3. Market Comparison")
+        print("4. Save all graphs (PNG and SVG)")
 
         try:
-            choice = int(input("\nSelect graph type (1-3): "))
+            choice = int(input("\nSelect graph type (1-4): "))
 
             if choice == 1:
                 self.show_financial_graphs(data=None, is_interactive=is_interactive)
@@ -1208,6 +1367,8 @@ class BicycleSimulation:
                 self.show_sales_analysis_graphs(data=None, is_interactive=is_interactive)
             elif choice == 3:
                 self.show_market_comparison_graphs(data=None, is_interactive=is_interactive)
+            elif choice == 4:
+                self.save_all_graphs()
             else:
                 print("Invalid choice. Showing financial graphs by default.")
                 self.show_financial_graphs(data=None, is_interactive=is_interactive)
@@ -1217,322 +1378,88 @@ class BicycleSimulation:
 
         input("\nPress Enter to continue...")
 
+    def market_preferences(self):
+        """Model preferences per market, used to estimate unit sales per market"""
+        return {name: market.preferences for name, market in self.markets.items()}
+
     def show_financial_graphs(self, data=None, is_interactive=True):
         """Show financial performance graphs"""
-        import matplotlib.pyplot as plt
-        import pandas as pd
-
-        # Convert monthly reports to pandas DataFrame if not provided
-        if data is None:
-            data = pd.DataFrame(self.monthly_reports)
-
-        # Create a figure
-        plt.figure(figsize=(15, 10))
-
-        # Plot 1: Revenue, Expenses, and Profit/Loss over time
-        plt.subplot(2, 2, 1)
-        plt.plot(data['month'], data['revenue'], 'g-', label='Revenue')
-        plt.plot(data['month'], data['expenses'], 'r-', label='Expenses')
-        plt.plot(data['month'], data['profit_loss'], 'b-', label='Profit/Loss')
-        plt.title('Monthly Financial Performance')
-        plt.xlabel('Month')
-        plt.ylabel('Amount (€)')
-        plt.grid(True)
-        plt.legend()
-
-        # Plot 2: Cumulative Profit/Loss
-        plt.subplot(2, 2, 2)
-        plt.plot(data['month'], data['profit_loss'].cumsum(), 'b-')
-        plt.title('Cumulative Profit/Loss')
-        plt.xlabel('Month')
-        plt.ylabel('Amount (€)')
-        plt.grid(True)
-
-        # Plot 3: Revenue vs Expenses Bar Chart
-        plt.subplot(2, 2, 3)
-        bar_width = 0.35
-        x = data['month']
-        plt.bar(x - bar_width / 2, data['revenue'], bar_width, label='Revenue', color='g')
-        plt.bar(x + bar_width / 2, data['expenses'], bar_width, label='Expenses', color='r')
-        plt.title('Revenue vs Expenses Comparison')
-        plt.xlabel('Month')
-        plt.ylabel('Amount (€)')
-        plt.grid(True)
-        plt.legend()
-
-        # Plot 4: Profit Margin Percentage
-        plt.subplot(2, 2, 4)
-        margin_pct = (data['profit_loss'] / data['revenue'] * 100).fillna(0)
-        plt.plot(data['month'], margin_pct, 'purple')
-        plt.title('Monthly Profit Margin')
-        plt.xlabel('Month')
-        plt.ylabel('Profit Margin (%)')
-        plt.grid(True)
-
-        plt.tight_layout()
-
-        # Save or display the figure
-        if is_interactive:
-            try:
-                plt.show()
-            except Exception as e:
-                print(f"\nCould not display interactive graph: {e}")
-                self._save_and_show_graph_path("bicycle_sim_financial_graphs.png")
-        else:
-            self._save_and_show_graph_path("bicycle_sim_financial_graphs.png")
+        self._show_dashboard("financial", data, is_interactive)
 
     def show_sales_analysis_graphs(self, data=None, is_interactive=True):
         """Show sales analysis graphs"""
-        import matplotlib.pyplot as plt
-        import pandas as pd
-        import numpy as np
-
-        # Convert monthly reports to pandas DataFrame if not provided
-        if data is None:
-            data = pd.DataFrame(self.monthly_reports)
-
-        # Create a new figure
-        plt.figure(figsize=(15, 10))
-
-        # First, we need to extract sales by model data from all months
-        models = set()
-        for month_data in self.monthly_reports:
-            if 'sales_by_model' in month_data:
-                models.update(month_data['sales_by_model'].keys())
-
-        models = list(models)
-
-        # Extract data for graphs
-        months = data['month'].tolist()
-        total_bikes = data['bikes_sold'].tolist() if 'bikes_sold' in data else []
-
-        # Prepare data for sales by model
-        model_sales_data = {model: [] for model in models}
-        for month_data in self.monthly_reports:
-            if 'sales_by_model' in month_data:
-                for model in models:
-                    model_sales_data[model].append(month_data['sales_by_model'].get(model, 0))
-
-        # Prepare data for sales by quality
-        quality_sales_data = {quality: [] for quality in ["budget", "standard", "premium"]}
-        for month_data in self.monthly_reports:
-            if 'sales_by_quality' in month_data:
-                for quality in ["budget", "standard", "premium"]:
-                    quality_sales_data[quality].append(month_data['sales_by_quality'].get(quality, 0))
-
-        # Plot 1: Total Bicycle Sales Over Time
-        plt.subplot(2, 2, 1)
-        if total_bikes:
-            plt.plot(months, total_bikes, 'b-o')
-            plt.title('Total Bicycle Sales Per Month')
-            plt.xlabel('Month')
-            plt.ylabel('Number of Bicycles')
-            plt.grid(True)
-
-        # Plot 2: Sales by Bicycle Model
-        plt.subplot(2, 2, 2)
-        for model, sales in model_sales_data.items():
-            if any(sales):  # Only plot if there were any sales
-                plt.plot(months[:len(sales)], sales, marker='o', label=model)
-        plt.title('Sales by Bicycle Model')
-        plt.xlabel('Month')
-        plt.ylabel('Number of Bicycles')
-        plt.grid(True)
-        plt.legend()
-
-        # Plot 3: Sales by Quality (Stacked Bar Chart)
-        plt.subplot(2, 2, 3)
-        quality_data = []
-        for quality, sales in quality_sales_data.items():
-            if any(sales):  # Only include if there were any sales
-                quality_data.append(sales[:len(months)])
-
-        if quality_data:
-            qualities = ["Budget", "Standard", "Premium"]
-            qualities = qualities[:len(quality_data)]  # Match the number of data series we have
-
-            x = np.arange(len(months))
-            bottom = np.zeros(len(months))
-
-            for i, quality_sales in enumerate(quality_data):
-                if len(quality_sales) > 0:
-                    plt.bar(x[:len(quality_sales)], quality_sales, bottom=bottom[:len(quality_sales)],
-                            label=qualities[i])
-                    bottom = np.add(bottom[:len(quality_sales)], quality_sales)
-
-            plt.title('Sales by Quality Level')
-            plt.xlabel('Month')
-            plt.ylabel('Number of Bicycles')
-            plt.xticks(x, months)
-            plt.legend()
-
-        # Plot 4: Sales Distribution Pie Chart (using latest month)
-        plt.subplot(2, 2, 4)
-        if self.monthly_reports and 'sales_by_model' in self.monthly_reports[-1]:
-            latest_sales = self.monthly_reports[-1]['sales_by_model']
-            models = []
-            values = []
-
-            for model, sales in latest_sales.items():
-                if sales > 0:
-                    models.append(model)
-                    values.append(sales)
-
-            if values:
-                plt.pie(values, labels=models, autopct='%1.1f%%', shadow=True, startangle=90)
-                plt.title(f'Sales Distribution (Month {self.current_month - 1})')
-
-        plt.tight_layout()
-
-        # Save or display the figure
-        if is_interactive:
-            try:
-                plt.show()
-            except Exception as e:
-                print(f"\nCould not display interactive graph: {e}")
-                self._save_and_show_graph_path("bicycle_sim_sales_graphs.png")
-        else:
-            self._save_and_show_graph_path("bicycle_sim_sales_graphs.png")
+        self._show_dashboard("sales", data, is_interactive)
 
     def show_market_comparison_graphs(self, data=None, is_interactive=True):
         """Show market comparison graphs"""
-        import matplotlib.pyplot as plt
-        import pandas as pd
-        import numpy as np
+        self._show_dashboard("market", data, is_interactive)
 
-        # Convert monthly reports to pandas DataFrame if not provided
-        if data is None:
-            data = pd.DataFrame(self.monthly_reports)
-
-        # Create a new figure
-        plt.figure(figsize=(15, 10))
-
-        # Extract market data
-        muenster_revenue = []
-        toulouse_revenue = []
-
-        for month_data in self.monthly_reports:
-            if 'sales_by_market' in month_data:
-                muenster_revenue.append(month_data['sales_by_market'].get('Muenster', 0))
-                toulouse_revenue.append(month_data['sales_by_market'].get('Toulouse', 0))
-
-        months = data['month'].tolist()[:len(muenster_revenue)]
-
-        # Plot 1: Revenue Comparison Between Markets
-        plt.subplot(2, 2, 1)
-        if months and muenster_revenue and toulouse_revenue:
-            width = 0.35
-            x = np.arange(len(months))
-            plt.bar(x - width / 2, muenster_revenue, width, label='Münster')
-            plt.bar(x + width / 2, toulouse_revenue, width, label='Toulouse')
-            plt.title('Revenue Comparison Between Markets')
-            plt.xlabel('Month')
-            plt.ylabel('Revenue (€)')
-            plt.xticks(x, months)
-            plt.legend()
-
-        # Plot 2: Market Share by Revenue (Pie Chart using total data)
-        plt.subplot(2, 2, 2)
-        total_muenster = sum(muenster_revenue)
-        total_toulouse = sum(toulouse_revenue)
-
-        if total_muenster > 0 or total_toulouse > 0:
-            plt.pie([total_muenster, total_toulouse],
-                    labels=['Münster', 'Toulouse'],
-                    autopct='%1.1f%%',
-                    shadow=True,
-                    startangle=90)
-            plt.title('Total Market Share by Revenue')
-
-        # Plot 3: Market Revenue Over Time
-        plt.subplot(2, 2, 3)
-        if months and muenster_revenue and toulouse_revenue:
-            plt.plot(months, muenster_revenue, 'b-o', label='Münster')
-            plt.plot(months, toulouse_revenue, 'r-o', label='Toulouse')
-            plt.title('Market Revenue Over Time')
-            plt.xlabel('Month')
-            plt.ylabel('Revenue (€)')
-            plt.grid(True)
-            plt.legend()
-
-        # Plot 4: Revenue per Bike by Market
-        if len(muenster_revenue) > 0:
-            plt.subplot(2, 2, 4)
-
-            # Calculate average revenue per bike for each market
-            muenster_avg = []
-            toulouse_avg = []
-
-            for month_data in self.monthly_reports:
-                if 'sales_by_market' in month_data and 'sales_by_model' in month_data:
-                    # Count bikes sold in each market
-                    m_bikes = 0
-                    t_bikes = 0
-
-                    # This is an approximation since we don't track units by market in the original data
-                    for model, sales in month_data['sales_by_model'].items():
-                        # Estimate market split based on market preferences
-                        m_pref = self.markets['Muenster'].preferences.get(model, 0)
-                        t_pref = self.markets['Toulouse'].preferences.get(model, 0)
-
-                        if m_pref + t_pref > 0:
-                            m_ratio = m_pref / (m_pref + t_pref)
-                            m_bikes += sales * m_ratio
-                            t_bikes += sales * (1 - m_ratio)
-
-                    # Calculate average revenue per bike
-                    if m_bikes > 0:
-                        m_rev = month_data['sales_by_market'].get('Muenster', 0)
-                        muenster_avg.append(m_rev / m_bikes if m_bikes > 0 else 0)
-                    else:
-                        muenster_avg.append(0)
+    def reports_frame(self):
+        """DataFrame of all monthly reports; only months closed since the last call are flattened"""
+        from dashboards import ReportsTable
 
-                    if t_bikes > 0:
-                        t_rev = month_data['sales_by_market'].get('Toulouse', 0)
-                        toulouse_avg.append(t_rev / t_bikes if t_bikes > 0 else 0)
-                    else:
-                        toulouse_avg.append(0)
+        if self.report_table is None:
+            self.report_table = ReportsTable()
+        return self.report_table.update(self.monthly_reports).frame()
 
-            # Plot the average revenue per bike
-            if months and muenster_avg and toulouse_avg:
-                plt.plot(months[:len(muenster_avg)], muenster_avg, 'b-o', label='Münster')
-                plt.plot(months[:len(toulouse_avg)], toulouse_avg, 'r-o', label='Toulouse')
-                plt.title('Average Revenue per Bicycle by Market')
-                plt.xlabel('Month')
-                plt.ylabel('Average Revenue (€)')
-                plt.grid(True)
-                plt.legend()
+    def _show_dashboard(self, name, data=None, is_interactive=True):
+        """Display one dashboard, or save it as PNG when no interactive backend is available"""
+        from dashboards import show_dashboard
 
-        plt.tight_layout()
+        # data is the shared DataFrame of dashboards.reports_frame
+        if data is None:
+            data = self.reports_frame()
 
-        # Save or display the figure
         if is_interactive:
             try:
-                plt.show()
+                show_dashboard(name, self.monthly_reports, self.market_preferences(), frame=data)
+                return
             except Exception as e:
                 print(f"\nCould not display interactive graph: {e}")
-                self._save_and_show_graph_path("bicycle_sim_market_graphs.png")
-        else:
-            self._save_and_show_graph_path("bicycle_sim_market_graphs.png")
-
-    def _save_and_show_graph_path(self, filename):
-        """Save the graph to a file and show the file path"""
-        import matplotlib.pyplot as plt
-        import os
+        self._save_and_show_graph_path(name, data)
 
-        # Get absolute path to current directory
-        current_dir = os.path.abspath(os.getcwd())
-        file_path = os.path.join(current_dir, filename)
+    def _save_and_show_graph_path(self, name, data=None, formats=("png",)):
+        """Save a dashboard to the current directory and show the file path"""
+        from dashboards import render_dashboards
 
         try:
-            plt.savefig(file_path)
-            print(f"\nGraph saved to: {file_path}")
+            paths = render_dashboards(self.monthly_reports, self.market_preferences(), output_dir=os.getcwd(),
+                                      formats=formats, dashboards=(name,), frame=data)
+            for path in paths[name]:
+                print(f"\nGraph saved to: {path}")
             print("You can view the graph by opening this file in an image viewer.")
         except Exception as e:
             print(f"\nError saving graph: {e}")
             print("Unable to save the graph to a file. Try installing matplotlib with:")
             print("  pip install matplotlib pandas")
 
+    def save_all_graphs(self, formats=("png", "svg")):
+        """Render all three dashboards in the background render pool and save them to the current directory"""
+        from render_service import get_service
+
+        future = get_service().submit(self.monthly_reports, self.market_preferences(), formats=formats,
+                                      output_dir=os.getcwd())
+        self.pending_renders.append(future)
+        print("\nRendering graphs in the background. The file paths are listed the next time")
+        print("you open the graphs menu.")
+
+    def report_finished_renders(self):
+        """Print the files of background renders that have finished since the last call"""
+        finished = [future for future in self.pending_renders if future.done()]
+        for future in finished:
+            self.pending_renders.remove(future)
+            try:
+                paths = future.result()
+            except Exception as e:
+                print(f"\nError rendering graphs: {e}")
+                continue
+            print("\nGraphs saved to:")
+            for by_format in paths.values():
+                for path in by_format.values():
+                    print(f"  {path}")
+        if self.pending_renders:
+            print(f"\n{len(self.pending_renders)} graph render(s) still running in the background.")
+
     def check_warehouse_capacity(self, warehouse_code, space_needed):
         """Check if the warehouse has enough capacity for new items"""
         if warehouse_code == "DE":
@@ -2095,88 +2022,155 @@ class BicycleSimulation:
 
         input("\nPress Enter to continue...")
 
-    def view_performance_graphs(self):
-        """Generate and display performance graphs based on monthly reports"""
-        if not GRAPHING_AVAILABLE:
-            print("\nGraphing capability is not available.")
-            print("Please install matplotlib and pandas with:")
-            print("  pip install matplotlib pandas")
-            input("\nPress Enter to continue...")
-            return
+    def run_autopilot(self):
+        """Let the saved autopilot strategy make this month's decisions"""
+        self.print_header()
 
-        if not self.monthly_reports or len(self.monthly_reports) < 2:
-            print("\nNot enough data to generate graphs. Please play for at least 2 months.")
+        print("\n" + "-" * 80)
+        print("AUTOPILOT".center(80))
+        print("-" * 80)
+
+        try:
+            policy = load_autopilot()
+        except (OSError, ValueError, KeyError, IndexError) as e:
+            print(f"\nNo autopilot strategy could be loaded from {AUTOPILOT_FILE}: {e}")
+            print("Create one with: python policy_search.py")
             input("\nPress Enter to continue...")
             return
 
-        self.clear_screen()
-        print("\n" + "-" * 80)
-        print("BUSINESS PERFORMANCE GRAPHS".center(80))
-        print("-" * 80)
-        print("\nGenerating performance graphs...")
+        print()
+        for line in self.apply_autopilot(policy) or ["Nothing to do this month."]:
+            print(line)
+        input("\nPress Enter to continue...")
 
-        # Convert monthly reports to pandas DataFrame
-        data = pd.DataFrame(self.monthly_reports)
+    def apply_autopilot(self, policy):
+        """Apply one month of decisions of a ParametricPolicy (see autopilot.py) without prompts.
+
+        The policy works on the catalog names of the Streamlit version; components, models and
+        markets are mapped by name. Returns the list of actions taken as text lines.
+        """
+        spec = policy.spec
+        log = []
+
+        # Staff: hire or fire one worker per group at the balance thresholds (salaries are paid at month end)
+        change = policy.hiring(np.array([[self.skilled_workers, self.unskilled_workers]]), np.array([self.balance]))[0]
+        self.skilled_workers += int(change[0])
+        self.unskilled_workers += int(change[1])
+        for worker_type, delta in zip(("skilled", "unskilled"), change.tolist()):
+            if delta:
+                log.append(f"{'Hired' if delta > 0 else 'Fired'} one {worker_type} worker")
+
+        # Purchases: order the parts whose stock fell below their reorder point from the cheapest supplier
+        stock = np.zeros((1, len(spec.parts)))
+        for warehouse in (self.warehouse_de, self.warehouse_fr):
+            for component_type, components in warehouse.items():
+                for component_name, quantity in components.items():
+                    part = catalog_part_name(component_type, component_name)
+                    if part in spec.parts:
+                        stock[0, spec.parts.index(part)] += quantity
+
+        offers = {}
+        for supplier in self.suppliers.values():
+            for component_type, components in supplier.inventory.items():
+                for component_name, price in components.items():
+                    offers.setdefault(catalog_part_name(component_type, component_name), []).append(
+                        (price, supplier.name, component_type, component_name))
+
+        order = policy.purchase(stock, np.array([self.balance]))[0]
+        for part, quantity in zip(spec.parts, order.tolist()):
+            if quantity <= 0 or part not in offers:
+                continue
+            price, supplier_name, component_type, component_name = min(offers[part])
+            supplier = self.suppliers[supplier_name]
+            if random.random() < supplier.complaint_probability:
+                quantity -= int(quantity * supplier.complaint_percentage)
+            total_cost = price * quantity
+            if quantity <= 0 or total_cost > self.balance:
+                continue
 
-        # Make sure we're using a non-interactive backend if running in terminal
-        if not sys.stdout.isatty():
-            plt.switch_backend('Agg')
-
-        # Create figure with subplots
-        plt.figure(figsize=(15, 10))
-
-        # Plot 1: Revenue, Expenses, and Profit/Loss over time
-        plt.subplot(2, 2, 1)
-        plt.plot(data['month'], data['revenue'], 'g-', label='Revenue')
-        plt.plot(data['month'], data['expenses'], 'r-', label='Expenses')
-        plt.plot(data['month'], data['profit_loss'], 'b-', label='Profit/Loss')
-        plt.title('Monthly Financial Performance')
-        plt.xlabel('Month')
-        plt.ylabel('Amount (€)')
-        plt.grid(True)
-        plt.legend()
-
-        # Plot 2: Cumulative Profit/Loss
-        plt.subplot(2, 2, 2)
-        plt.plot(data['month'], data['profit_loss'].cumsum(), 'b-')
-        plt.title('Cumulative Profit/Loss')
-        plt.xlabel('Month')
-        plt.ylabel('Amount (€)')
-        plt.grid(True)
-
-        # Plot 3: Revenue vs Expenses Bar Chart
-        plt.subplot(2, 2, 3)
-        bar_width = 0.35
-        x = data['month']
-        plt.bar(x - bar_width / 2, data['revenue'], bar_width, label='Revenue', color='g')
-        plt.bar(x + bar_width / 2, data['expenses'], bar_width, label='Expenses', color='r')
-        plt.title('Revenue vs Expenses Comparison')
-        plt.xlabel('Month')
-        plt.ylabel('Amount (€)')
-        plt.grid(True)
-        plt.legend()
-
-        # Plot 4: Profit Margin Percentage
-        plt.subplot(2, 2, 4)
-        margin_pct = (data['profit_loss'] / data['revenue'] * 100).fillna(0)
-        plt.plot(data['month'], margin_pct, 'purple')
-        plt.title('Monthly Profit Margin')
-        plt.xlabel('Month')
-        plt.ylabel('Profit Margin (%)')
-        plt.grid(True)
-
-        plt.tight_layout()
-
-        # Save the figure to a temporary file if not in interactive mode
-        if not sys.stdout.isatty():
-            temp_file = "bicycle_sim_graphs.png"
-            plt.savefig(temp_file)
-            print(f"\nGraphs saved to {temp_file}")
-        else:
-            # Show the plots
-            plt.show()
+            space = self.components[component_name].space_per_unit * quantity
+            if self.check_warehouse_capacity("DE", space):
+                warehouse_code, warehouse = "DE", self.warehouse_de
+            elif self.check_warehouse_capacity("FR", space):
+                warehouse_code, warehouse = "FR", self.warehouse_fr
+            else:
+                continue
 
-        input("\nPress Enter to continue...")
+            self.balance -= total_cost
+            self.total_expenses += total_cost
+            warehouse[component_type][component_name] = warehouse[component_type].get(component_name, 0) + quantity
+            log.append(f"Purchased {quantity} {component_name} ({component_type}) from {supplier_name} "
+                       f"for {total_cost:.2f} € into warehouse {warehouse_code}")
+
+        # Production: standard bicycles in the policy's mix up to the worker hours
+        models = list(self.bicycles)
+        weights = np.array([policy.params["production_mix"][spec.bike_types.index(catalog_name(model))]
+                            for model in models])
+        hours = np.array([[self.bicycles[model].skilled_hours, self.bicycles[model].unskilled_hours]
+                          for model in models])
+        capacity = np.array([[self.skilled_workers * SKILLED_WORKER_MONTHLY_HOURS,
+                              self.unskilled_workers * UNSKILLED_WORKER_MONTHLY_HOURS]])
+        plan = np.floor(mix_plan(weights, capacity, hours)[0]).astype(int)
+
+        for model, quantity in zip(models, plan.tolist()):
+            bike = self.bicycles[model]
+            for warehouse_code, warehouse, bicycles in (("DE", self.warehouse_de, self.bicycles_in_warehouse_de),
+                                                         ("FR", self.warehouse_fr, self.bicycles_in_warehouse_fr)):
+                possible = min(quantity, self.max_producible(bike, warehouse))
+                if possible <= 0 or not self.check_warehouse_capacity(warehouse_code, bike.space_per_unit * possible):
+                    continue
+                self.consume_components_for_bicycle(bike, possible, warehouse)
+                bicycles.setdefault(model, {q: 0 for q in QUALITIES})["standard"] += possible
+                quantity -= possible
+                log.append(f"Produced {possible} standard {model}(s) in warehouse {warehouse_code}")
+
+        # Transport: split each model over the markets, shipping from the local warehouse first
+        models_by_name = {catalog_name(model): model for model in models}
+        markets_by_name = {catalog_name(market): market for market in self.markets}
+        stock = np.array([[sum(self.bicycles_in_warehouse_de.get(models_by_name[bike_type], {}).values())
+                           + sum(self.bicycles_in_warehouse_fr.get(models_by_name[bike_type], {}).values())
+                           for bike_type in spec.bike_types]])
+        shipments = policy.shipping(stock)[0]
+
+        for m, market in enumerate(spec.markets):
+            market_name = markets_by_name.get(market)
+            if market_name is None:
+                continue
+            if market_name == "Muenster":
+                target = self.bicycles_in_market_muenster
+                sources = ((self.bicycles_in_warehouse_de, TRANSPORT_COST_LOCAL),
+                           (self.bicycles_in_warehouse_fr, TRANSPORT_COST_DISTANT))
+            else:
+                target = self.bicycles_in_market_toulouse
+                sources = ((self.bicycles_in_warehouse_fr, TRANSPORT_COST_LOCAL),
+                           (self.bicycles_in_warehouse_de, TRANSPORT_COST_DISTANT))
+
+            for bike_type, quantity in zip(spec.bike_types, shipments[m].tolist()):
+                model = models_by_name[bike_type]
+                shipped, cost = 0, 0
+                for source, transport_cost in sources:
+                    for quality in QUALITIES:
+                        available = source.get(model, {}).get(quality, 0)
+                        moved = min(available, quantity - shipped, int(max(self.balance - cost, 0) // transport_cost))
+                        if moved <= 0:
+                            continue
+                        source[model][quality] -= moved
+                        target.setdefault(model, {q: 0 for q in QUALITIES})[quality] += moved
+                        shipped += moved
+                        cost += moved * transport_cost
+                if shipped:
+                    self.balance -= cost
+                    self.total_expenses += cost
+                    log.append(f"Transported {shipped} {model}(s) to {market_name} for {cost:.2f} €")
+
+        return log
+
+    def max_producible(self, bike, warehouse):
+        """Number of bicycles the components in a warehouse are sufficient for"""
+        required = [("wheelset", bike.wheels), ("frame", bike.frame), ("handlebar", bike.handlebar),
+                    ("saddle", bike.saddle), ("gear", bike.gear), ("motor", bike.motor)]
+        return min((warehouse[component_type].get(name, 0) for component_type, name in required if name != "NULL"),
+                   default=0)
 
     def run_game(self):
         """Main game loop"""
@@ -2193,10 +2187,11 @@ class BicycleSimulation:
             print("6. View financial status")
             print("7. View performance graphs")  # New option
             print("8. Advance to next month")
+            print("9. Autopilot (saved strategy)")
             print("0. Exit game")
 
             try:
-                choice = int(input("\nSelect option (0-8): "))  # Updated range
+                choice = int(input("\nSelect option (0-9): "))
                 if choice == 0:
                     self.game_over = True
                 elif choice == 1:
@@ -2219,6 +2214,8 @@ class BicycleSimulation:
                     self.view_performance_graphs()  # New method
                 elif choice == 8:
                     self.advance_month()
+                elif choice == 9:
+                    self.run_autopilot()
                 else:
                     print("Invalid choice. Please try again.")
                     time.sleep(1)
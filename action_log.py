@@ -0,0 +1,264 @@
+"""
+Deterministisches Aktionsprotokoll der Streamlit-Engine (simulation_engine.py).
+
+Jede Spielaktion (Einkauf, Transfer, Einstellen/Entlassen, Produktion, Verteilung, Preise,
+Kredite, Vorspulen und Monatsabschluss) wird mit ihren Argumenten, dem Spieltag und der
+Position im Zufallsstrom als eine JSON-Zeile angehängt. Der Monatsabschluss trägt zusätzlich
+den Hash des Spielstands danach. Die erste Zeile beschreibt den Start (Seed, Katalog, Modi und
+bei einem bereits laufenden Spiel dessen Stand):
+
+    log = ActionLog.attach(sim, 'spiel.jsonl')
+    sim.purchase_materials(...)
+    sim.close_month()
+
+replay.py baut ein Spiel aus dem Protokoll nach und prüft die Hashes Monat für Monat.
+
+Mit max_entries beginnt das Protokoll nach so vielen Einträgen einen neuen Abschnitt: Die
+Kopfzeile hält dann den aktuellen Stand samt Rückgängig-Stapel fest, sodass jeder Abschnitt für
+sich nachspielbar ist. In der Datei bleibt nur der vorige Abschnitt (Endung .1) erhalten.
+"""
+
+import base64
+import functools
+import hashlib
+import io
+import json
+import os
+import pickle
+import random
+import zlib
+
+import numpy as np
+
+# Kennung und Version des Protokollformats (erste Zeile)
+LOG_FORMAT = 'bikesim-actions'
+LOG_VERSION = 2
+
+# Namen der protokollierten Engine-Methoden (nur diese spielt replay.py nach)
+RECORDED_ACTIONS = set()
+
+# Attribute, die nicht zum Spielstand gehören (unveränderlich, Ausgabe oder Messung)
+UNHASHED_ATTRIBUTES = ('catalog', 'ui', 'timer', 'demand_model', 'action_log', 'record_metrics', '_shared')
+
+
+class CountingRandom(random.Random):
+    """
+    random.Random, das seine Position im Zufallsstrom mitzählt (draws = Anzahl der Aufrufe von
+    random() bzw. getrandbits() seit dem Seed). Ohne Seed wird einer gezogen und in
+    initial_seed festgehalten, damit sich jedes Spiel nachspielen lässt.
+    """
+
+    def seed(self, a=None, version=2):
+        if a is None:
+            a = int.from_bytes(os.urandom(8), 'big')
+        self.initial_seed = a
+        self.draws = 0
+        super().seed(a, version)
+
+    def random(self):
+        self.draws += 1
+        return super().random()
+
+    def getrandbits(self, k):
+        self.draws += 1
+        return super().getrandbits(k)
+
+    def __reduce__(self):
+        # random.Random speichert nur den Generatorzustand, nicht Seed und Position
+        return self.__class__, (self.initial_seed,), (self.getstate(), self.draws)
+
+    def __setstate__(self, state):
+        self.setstate(state[0])
+        self.draws = state[1]
+
+    def __copy__(self):
+        # Ohne erneutes Seeden (sim.fork kopiert den Zufallsstrom bei jedem Aufruf)
+        clone = self.__class__.__new__(self.__class__)
+        clone.setstate(self.getstate())
+        clone.initial_seed, clone.draws = self.initial_seed, self.draws
+        return clone
+
+
+def rng_position(rng):
+    """Position im Zufallsstrom oder None bei einem nicht zählenden Generator"""
+    return getattr(rng, 'draws', None)
+
+
+def state_hash(sim):
+    """Kurzer Hash des veränderlichen Spielstands (Guthaben, Bestände, Personal, Historie, Zufallsstrom)"""
+    state = {name: value for name, value in sim.__dict__.items() if name not in UNHASHED_ATTRIBUTES}
+    # Ohne Memo (fast) hängen die Bytes nur vom Inhalt ab, nicht davon, welche Objekte geteilt werden
+    buffer = io.BytesIO()
+    pickler = pickle.Pickler(buffer, pickle.HIGHEST_PROTOCOL)
+    pickler.fast = True
+    pickler.dump(state)
+    return hashlib.sha256(buffer.getvalue()).hexdigest()[:16]
+
+
+def _plain(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Nicht protokollierbares Argument: {type(value).__name__}")
+
+
+def encode_snapshot(state):
+    """Komprimierter Spielstand (ohne Oberfläche und Protokoll) oder Liste von Ständen als Text"""
+    return base64.b64encode(zlib.compress(pickle.dumps(state, pickle.HIGHEST_PROTOCOL))).decode('ascii')
+
+
+def decode_snapshot(text):
+    return pickle.loads(zlib.decompress(base64.b64decode(text)))
+
+
+class ActionLog:
+    """
+    Protokoll eines Spiels als JSON-Zeilen. Mit path wird jede Zeile sofort an die Datei
+    angehängt, sonst nur im Speicher gehalten (text() liefert den laufenden Abschnitt).
+    undo: Rückgängig-Stapel des Spiels (undo_stack.UndoStack), der beim Beginn eines neuen
+    Abschnitts mitgespeichert wird; max_entries: Einträge je Abschnitt (None = unbegrenzt).
+    """
+
+    def __init__(self, header, path=None, undo=None, max_entries=None):
+        self.path = path
+        self.undo = undo
+        self.max_entries = max_entries
+        self.recording = False
+        self._start(header)
+
+    def _start(self, header):
+        self.header = header
+        self.lines = [self._dumps(header)]
+        self._daily = header['daily']
+        if self.path is not None:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                f.write(self.lines[0] + '\n')
+
+    @staticmethod
+    def _dumps(data):
+        return json.dumps(data, separators=(',', ':'), ensure_ascii=False, default=_plain)
+
+    @classmethod
+    def attach(cls, sim, path=None, undo=None, max_entries=None):
+        """
+        Beginnt das Protokoll eines Spiels und hängt es an sim (sim.action_log). Ein frisches
+        Spiel wird über Seed und Katalog beschrieben, ein laufendes zusätzlich über seinen Stand.
+        """
+        log = cls(cls._header(sim, undo), path, undo, max_entries)
+        sim.action_log = log
+        return log
+
+    @staticmethod
+    def _header(sim, undo=None):
+        from result_cache import ENGINE_MODULES, engine_version
+        from simulation_catalog import load_catalog
+        from simulation_engine import BicycleSimulation
+
+        if not isinstance(sim.rng, CountingRandom):
+            raise ValueError("Das Spiel hat keinen zählenden Zufallsgenerator und lässt sich nicht protokollieren")
+        catalog = sim.catalog.to_dict()
+        header = {
+            'format': LOG_FORMAT,
+            'version': LOG_VERSION,
+            'engine': engine_version(ENGINE_MODULES['streamlit'])[:16],
+            'seed': sim.rng.initial_seed,
+            'lead_times': sim.lead_times,
+            'daily': sim.daily,
+            # Der Standardkatalog wird nicht mitgeschrieben
+            'catalog': None if catalog == load_catalog().to_dict() else catalog,
+            'snapshot': None,
+            'undo': None,
+        }
+        fresh = BicycleSimulation(catalog=sim.catalog, ui=None, seed=sim.rng.initial_seed,
+                                  lead_times=sim.lead_times, daily=sim.daily)
+        if state_hash(fresh) != state_hash(sim):
+            header['snapshot'] = encode_snapshot(sim)
+        if undo is not None and (undo.can_undo() or undo.can_redo()):
+            # Ein Pickle für alle Stände, damit geteilte Container nur einmal gespeichert werden
+            header['undo'] = encode_snapshot(undo.states())
+        return header
+
+    def rotate(self, sim):
+        """Beginnt einen neuen Abschnitt ab dem aktuellen Stand; die Datei des vorigen endet auf .1"""
+        if self.path is not None and os.path.exists(self.path):
+            os.replace(self.path, self.path + '.1')
+        self._start(self._header(sim, self.undo))
+
+    def append(self, entry):
+        line = self._dumps(entry)
+        self.lines.append(line)
+        if self.path is not None:
+            if not os.path.exists(self.path):
+                # Datei zwischenzeitlich aufgeräumt: den Abschnitt vollständig neu schreiben
+                with open(self.path, 'w', encoding='utf-8') as f:
+                    f.write(self.text())
+                return
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+    def text(self):
+        return '\n'.join(self.lines) + '\n'
+
+    def __len__(self):
+        return len(self.lines) - 1
+
+    def _entry(self, sim, action):
+        if self.max_entries is not None and len(self) >= self.max_entries:
+            self.rotate(sim)
+        entry = {'m': sim.current_month, 'd': sim.day, 'r': rng_position(sim.rng), 'a': action}
+        if sim.daily != self._daily:
+            self._daily = entry['daily'] = sim.daily
+        return entry
+
+    def note(self, sim, action, switched=False):
+        """
+        Protokolliert einen Eintrag ohne Engine-Aufruf (z. B. Rückgängig). switched=True, wenn
+        danach ein anderes Spielobjekt aktiv ist; dessen Tagesmodus wird dann neu festgehalten.
+        """
+        self.append(self._entry(sim, action))
+        if switched:
+            self._daily = None
+
+    def record(self, sim, action, args, kwargs, call):
+        """Führt call() aus und protokolliert die Aktion; Aufrufe innerhalb einer Aktion zählen nicht"""
+        if self.recording:
+            return call()
+        entry = self._entry(sim, action)
+        if args:
+            entry['p'] = json.loads(self._dumps(args))
+        if kwargs:
+            entry['k'] = json.loads(self._dumps(kwargs))
+        self.recording = True
+        try:
+            result = call()
+            if action == 'close_month':
+                entry['h'] = state_hash(sim)
+            return result
+        finally:
+            self.recording = False
+            self.append(entry)
+
+
+def recorded(method):
+    """Protokolliert Aufrufe der Engine-Methode, solange am Spiel ein ActionLog hängt"""
+    RECORDED_ACTIONS.add(method.__name__)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        log = getattr(self, 'action_log', None)
+        if log is None:
+            return method(self, *args, **kwargs)
+        return log.record(self, method.__name__, args, kwargs, lambda: method(self, *args, **kwargs))
+    return wrapper
+
+
+def read_log(path):
+    """Liest ein Protokoll; gibt (Kopfzeile, Liste der Aktionen) zurück"""
+    with open(path, encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    if not lines or lines[0].get('format') != LOG_FORMAT:
+        raise ValueError(f"{path} ist kein Aktionsprotokoll")
+    if lines[0]['version'] > LOG_VERSION:
+        raise ValueError(f"Protokollversion {lines[0]['version']} wird nicht unterstützt")
+    return lines[0], lines[1:]
@@ -0,0 +1,286 @@
+"""
+Entscheidungshilfe für den laufenden Monat der Streamlit-Engine (simulation_engine.py).
+
+Die Kandidaten sind Bündel von Monatsentscheidungen (Personal, Produktionsmenge, Einkauf und
+Verteilung der Fahrräder). Jedes Bündel wird auf einem Fork des Spielstands (sim.fork) in
+konkrete Aktionen übersetzt. Eine Monte-Carlo-Baumsuche mit einer Ebene bewertet die Bündel:
+Jede Auswertung wendet die Aktionen auf einen neuen Fork an, schließt den Monat ab und spielt
+`horizon` - 1 weitere Monate mit einer Strategie aus strategies.py (Rollout). Welches Bündel als
+nächstes ausgewertet wird, entscheidet UCB1; die n-te Auswertung jedes Bündels nutzt denselben
+Seed (gemeinsame Zufallszahlen). Die Suche endet nach `time_budget` Sekunden, frühestens aber,
+wenn jedes Bündel einmal ausgewertet ist:
+
+    advice = recommend(sim, time_budget=2.0, horizon=6)
+    apply_plan(sim, advice['actions'])
+
+Mit workers > 1 (oder einem eigenen executor) laufen die Rollouts in Worker-Prozessen.
+"""
+
+import itertools
+import math
+import multiprocessing
+import os
+import pickle
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from strategies import capacity_plan, produce_to_capacity
+
+# Auswahl je Entscheidung; die Kandidaten sind alle Kombinationen
+BUNDLE_OPTIONS = {
+    'staff': ((0, 0), (1, 2), (-1, -2)),   # Änderung (Facharbeiter, Hilfsarbeiter)
+    'production': (0.5, 1.0),              # Anteil der Arbeitskapazität
+    'purchase': (0, 1, 2),                 # Teile für so viele Monate voller Produktion
+    'distribution': ('best', 'split'),     # alles in den beliebtesten Markt oder nach Präferenz verteilt
+}
+
+# Guthaben, das der Einkauf eines Bündels nicht unterschreitet
+CASH_RESERVE = 20000
+
+# Rollouts je Aufgabe an einen Worker-Prozess
+ROLLOUTS_PER_TASK = 8
+
+
+def candidate_bundles(sim):
+    """Alle Bündel, die im aktuellen Zustand möglich sind (keine negativen Belegschaften)"""
+    bundles = []
+    for staff, production, purchase, distribution in itertools.product(*BUNDLE_OPTIONS.values()):
+        if sim.skilled_workers + staff[0] < 0 or sim.unskilled_workers + staff[1] < 0:
+            continue
+        bundles.append({'staff': staff, 'production': production, 'purchase': purchase,
+                        'distribution': distribution})
+    return bundles
+
+
+def describe_bundle(bundle):
+    """Kurzbeschreibung eines Bündels für die Oberfläche"""
+    skilled, unskilled = bundle['staff']
+    staff = ("Personal unverändert" if bundle['staff'] == (0, 0)
+             else f"Personal {skilled:+d} Facharbeiter, {unskilled:+d} Hilfsarbeiter")
+    purchase = ("kein Einkauf" if not bundle['purchase']
+                else f"Teile für {bundle['purchase']} Monat{'e' if bundle['purchase'] > 1 else ''} einkaufen")
+    distribution = ("Verteilung in den beliebtesten Markt" if bundle['distribution'] == 'best'
+                    else "Verteilung nach Marktpräferenz")
+    return f"{staff}; Produktion {bundle['production'] * 100:.0f}% der Kapazität; {purchase}; {distribution}"
+
+
+def _distribution(sim, mode):
+    """Verteilungsplan für alle Fahrräder in beiden Lagern"""
+    stock = sim.bike_stock[:2].sum(axis=(0, 2)).tolist()
+    plan = {}
+    for bike_type, count in zip(sim.bike_types, stock):
+        if count <= 0:
+            continue
+        preferences = {market: sim.markets[market]['preference'].get(bike_type, 0) for market in sim.markets}
+        if mode == 'best' or sum(preferences.values()) <= 0:
+            plan.setdefault(max(preferences, key=preferences.get), {})[bike_type] = count
+            continue
+        # Nach Präferenz aufteilen; der Rest geht in den beliebtesten Markt
+        total = sum(preferences.values())
+        shares = {market: int(count * weight / total) for market, weight in preferences.items()}
+        shares[max(preferences, key=preferences.get)] += count - sum(shares.values())
+        for market, quantity in shares.items():
+            if quantity > 0:
+                plan.setdefault(market, {})[bike_type] = quantity
+    return plan
+
+
+def _purchase(sim, months):
+    """Bestellung der fehlenden Teile für `months` Monate voller Produktion beim günstigsten Lieferanten"""
+    required = {}
+    for bike_type, quantity in capacity_plan(sim).items():
+        for component_type, part in sim.bicycle_recipes[bike_type].items():
+            if component_type in ['skilled_hours', 'unskilled_hours'] or part is None:
+                continue
+            required[part] = required.get(part, 0) + quantity * months
+
+    order, cost = {}, 0
+    for part, quantity in required.items():
+        missing = quantity - sim.item_count('germany', part) - sim.item_count('france', part)
+        offers = [(data['products'][part], supplier) for supplier, data in sim.suppliers.items()
+                  if part in data['products']]
+        if missing <= 0 or not offers:
+            continue
+        price, supplier = min(offers)
+        order.setdefault(supplier, {})[part] = missing
+        cost += price * missing
+
+    budget = sim.balance - CASH_RESERVE
+    if cost <= 0 or budget <= 0:
+        return {}
+    scale = min(1.0, budget / cost)
+    order = {supplier: {part: int(quantity * scale) for part, quantity in items.items()}
+             for supplier, items in order.items()}
+    return {supplier: items for supplier, items in order.items() if any(items.values())}
+
+
+def bundle_actions(sim, bundle):
+    """
+    Konkrete Aktionen [(Methode, Argumente)] eines Bündels im aktuellen Zustand. Die Schritte
+    werden dazu auf einem Fork ausgeführt, damit jeder den Zustand nach dem vorigen sieht.
+    """
+    sim = sim.fork()
+    actions = []
+
+    def act(name, *args):
+        getattr(sim, name)(*args)
+        actions.append((name, args))
+
+    skilled, unskilled = bundle['staff']
+    if skilled or unskilled:
+        act('manage_workers', max(skilled, 0), max(-skilled, 0), max(unskilled, 0), max(-unskilled, 0))
+
+    plan = {bike_type: int(quantity * bundle['production']) for bike_type, quantity in capacity_plan(sim).items()}
+    plan = {bike_type: quantity for bike_type, quantity in plan.items() if quantity > 0}
+    if plan:
+        act('produce_bicycles', plan)
+
+    distribution = _distribution(sim, bundle['distribution'])
+    if distribution:
+        act('distribute_to_markets', distribution)
+
+    if bundle['purchase']:
+        order = _purchase(sim, bundle['purchase'])
+        if order:
+            act('purchase_materials', order)
+    return actions
+
+
+def apply_plan(sim, actions):
+    """Führt die Aktionen einer Empfehlung am Spiel aus"""
+    for name, args in actions:
+        getattr(sim, name)(*args)
+
+
+def rollout(root, actions, seed, horizon, policy=produce_to_capacity):
+    """
+    Eine Auswertung: Aktionen auf einem Fork, Monatsabschluss und horizon - 1 Monate mit
+    `policy`. Gibt (Gewinn gegenüber dem Start, bankrott) zurück; ein bankrottes Spiel zählt mit seinem Guthaben bei der Insolvenz.
+    """
+    sim = root.fork()
+    sim.rng = random.Random(seed)
+    apply_plan(sim, actions)
+    for month in range(horizon):
+        if month:
+            policy(sim)
+        sim.close_month()
+        if sim.is_bankrupt():
+            return sim.balance - root.balance, True
+    return sim.balance - root.balance, False
+
+
+def _rollout_task(root_snapshot, jobs, horizon, policy):
+    root = pickle.loads(root_snapshot)
+    return [(index, *rollout(root, actions, seed, horizon, policy)) for index, actions, seed in jobs]
+
+
+class _Candidate:
+    """Statistik eines Bündels in der Suche"""
+
+    def __init__(self, bundle, actions):
+        self.bundle = bundle
+        self.actions = actions
+        self.visits = 0
+        self.pending = 0   # ausgegebene, noch nicht zurückgekehrte Rollouts
+        self.total = 0.0
+        self.total_squares = 0.0
+        self.ruined = 0
+
+    def add(self, profit, ruined):
+        self.visits += 1
+        self.total += profit
+        self.total_squares += profit * profit
+        self.ruined += ruined
+
+    @property
+    def mean(self):
+        return self.total / self.visits if self.visits else 0.0
+
+    @property
+    def std(self):
+        if self.visits < 2:
+            return 0.0
+        return math.sqrt(max(0.0, self.total_squares / self.visits - self.mean ** 2))
+
+    def to_dict(self):
+        return {
+            'bundle': self.bundle,
+            'description': describe_bundle(self.bundle),
+            'actions': self.actions,
+            'expected_profit': self.mean,
+            'profit_std': self.std,
+            'bankruptcy_risk': self.ruined / self.visits if self.visits else None,
+            'rollouts': self.visits,
+        }
+
+
+def _select(candidates, exploration):
+    """UCB1 über die Bündel; noch nicht (oder nur ausstehend) ausgewertete Bündel zuerst"""
+    for candidate in candidates:
+        if candidate.visits + candidate.pending == 0:
+            return candidate
+    visited = [c for c in candidates if c.visits]
+    means = np.array([c.mean for c in visited]) if visited else np.zeros(1)
+    scale = max(float(means.max() - means.min()), 1.0)
+    total = math.log(sum(c.visits + c.pending for c in candidates))
+    return max(candidates, key=lambda c: (c.mean if c.visits else 0.0)
+               + exploration * scale * math.sqrt(total / (c.visits + c.pending)))
+
+
+def recommend(sim, time_budget=2.0, horizon=6, policy=produce_to_capacity, workers=None, executor=None,
+              seed=0, exploration=1.0):
+    """
+    Sucht höchstens time_budget Sekunden nach dem besten Monatsbündel. Gibt das am häufigsten
+    ausgewertete Bündel (bei UCB1 das beste) mit 'description', 'actions', 'expected_profit'
+    (mittlerer Gewinn über `horizon` Monate), 'profit_std', 'bankruptcy_risk' und 'rollouts'
+    zurück, dazu 'ranking' (alle Bündel, beste zuerst), 'total_rollouts' und 'seconds'.
+    policy spielt die Folgemonate und muss für Worker-Prozesse eine Funktion auf Modulebene sein.
+    executor: eigener Executor (z. B. ein über mehrere Anfragen geteilter Prozess-Pool);
+    sonst startet workers > 1 einen Prozess-Pool nur für diese Anfrage.
+    """
+    started = time.perf_counter()
+    deadline = started + time_budget
+    candidates = [_Candidate(bundle, bundle_actions(sim, bundle)) for bundle in candidate_bundles(sim)]
+
+    def next_job():
+        candidate = _select(candidates, exploration)
+        candidate.pending += 1
+        index = candidates.index(candidate)
+        # Die n-te Auswertung jedes Bündels spielt dieselbe Nachfrage
+        return index, candidate.actions, seed * 100003 + candidate.visits + candidate.pending
+
+    own_executor = None
+    if executor is None and workers and workers > 1:
+        executor = own_executor = ProcessPoolExecutor(max_workers=workers,
+                                                      mp_context=multiprocessing.get_context('spawn'))
+    def searching():
+        return time.perf_counter() < deadline or any(c.visits == 0 for c in candidates)
+
+    try:
+        if executor is None:
+            while searching():
+                index, actions, job_seed = next_job()
+                candidates[index].pending -= 1
+                candidates[index].add(*rollout(sim, actions, job_seed, horizon, policy))
+        else:
+            snapshot = pickle.dumps(sim, pickle.HIGHEST_PROTOCOL)
+            parallel = workers or os.cpu_count() or 1
+            while searching():
+                tasks = [[next_job() for _ in range(ROLLOUTS_PER_TASK)] for _ in range(parallel)]
+                futures = [executor.submit(_rollout_task, snapshot, jobs, horizon, policy) for jobs in tasks]
+                for future in futures:
+                    for index, profit, ruined in future.result():
+                        candidates[index].pending -= 1
+                        candidates[index].add(profit, ruined)
+    finally:
+        if own_executor is not None:
+            own_executor.shutdown()
+
+    ranking = sorted(candidates, key=lambda c: (c.visits, c.mean), reverse=True)
+    advice = ranking[0].to_dict()
+    advice.update(ranking=[c.to_dict() for c in ranking], total_rollouts=sum(c.visits for c in candidates),
+                  seconds=time.perf_counter() - started)
+    return advice
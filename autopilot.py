@@ -0,0 +1,271 @@
+"""
+Parametrisierte Regelstrategie ("Autopilot") für alle Spieloberflächen.
+
+Eine ParametricPolicy trifft die Monatsentscheidungen nach festen Regeln, deren Schwellen und
+Anteile als Parameter vorliegen:
+
+- Einkauf: Bestellpunkt und Bestellmenge je Teil; fällt der Bestand (inklusive offener
+  Bestellungen) unter den Bestellpunkt, wird die Bestellmenge beim günstigsten Lieferanten
+  bestellt, solange cash_reserve auf dem Konto bleibt.
+- Produktion: Anteile je Fahrradtyp; produziert wird bis zur Arbeitskapazität, gekürzt auf
+  die vorhandenen Teile.
+- Verteilung: Aufteilung jedes Fahrradtyps auf die Märkte.
+- Personal: über hire_above wird je Gruppe ein Arbeiter eingestellt (bis max_workers),
+  unter fire_below einer entlassen.
+
+Die Regeln arbeiten auf Arrays mit einer führenden Spielachse und wirken damit auf
+VectorBicycleEnv (bicycle_env.py) genauso wie auf ein einzelnes Spiel. Als Strategie
+policy(sim) steuert sie die Streamlit-Engine (siehe strategies.py). Gute Parameter findet
+policy_search.py; die besten Strategien stehen in einer JSON-Datei (AUTOPILOT_FILE):
+
+    policy = load_autopilot()
+    policy(sim)                         # Entscheidungen eines Monats in der Engine
+    actions = policy.act(vector_env)    # Aktionen (K, action_size) für K Spiele
+"""
+
+import json
+import os
+
+import numpy as np
+
+from bicycle_env import HOURS_PER_WORKER, env_spec
+from simulation_catalog import load_catalog
+
+# Datei mit den gespeicherten Strategien (von policy_search.py geschrieben)
+AUTOPILOT_FILE = os.environ.get("BIKESIM_AUTOPILOT", "autopilot.json")
+
+# Suchbereich je Parameter (untere und obere Grenze, für alle Einträge gleich)
+PARAMETER_BOUNDS = {
+    'reorder_point': (0, 150),
+    'order_quantity': (0, 150),
+    'production_mix': (0, 1),
+    'shipping_split': (0, 1),
+    'hire_above': (0, 200000),
+    'fire_below': (0, 50000),
+    'max_workers': (1, 12),
+    'cash_reserve': (0, 60000),
+}
+
+
+def parameter_shapes(spec):
+    """Form jedes Parameters für eine EnvSpec"""
+    P, B, M = len(spec.parts), len(spec.bike_types), len(spec.markets)
+    return {
+        'reorder_point': (P,),
+        'order_quantity': (P,),
+        'production_mix': (B,),
+        'shipping_split': (M, B),
+        'hire_above': (2,),
+        'fire_below': (2,),
+        'max_workers': (2,),
+        'cash_reserve': (),
+    }
+
+
+def parameter_bounds(spec):
+    """Untere und obere Grenzen des flachen Parametervektors"""
+    lower, upper = [], []
+    for name, shape in parameter_shapes(spec).items():
+        size = int(np.prod(shape))
+        low, high = PARAMETER_BOUNDS[name]
+        lower.extend([low] * size)
+        upper.extend([high] * size)
+    return np.array(lower, dtype=float), np.array(upper, dtype=float)
+
+
+def mix_plan(weights, capacity, labour_hours):
+    """
+    Produktionsmengen (K, B) als Kommazahlen, die die Arbeitszeit (K, 2) mit den Anteilen
+    weights (B,) möglichst ausschöpfen; labour_hours (B, 2) sind die Stunden je Fahrrad.
+    """
+    capacity = np.asarray(capacity, dtype=float)
+    total = weights.sum()
+    if total <= 0:
+        return np.zeros((len(capacity), len(weights)))
+    share = weights / total
+    per_unit = share @ labour_hours
+    with np.errstate(divide='ignore'):
+        bikes = np.where(per_unit > 0, capacity / np.where(per_unit > 0, per_unit, 1), np.inf).min(axis=1)
+    return np.where(np.isfinite(bikes), bikes, 0)[:, None] * share
+
+
+class ParametricPolicy:
+    """Regelstrategie mit den Parametern aus parameter_shapes (Dictionary von Arrays)"""
+
+    def __init__(self, params, catalog=None):
+        self.catalog = catalog if catalog is not None else load_catalog()
+        self.spec = env_spec(self.catalog)
+        self.params = {name: np.asarray(params[name], dtype=float).reshape(shape)
+                       for name, shape in parameter_shapes(self.spec).items()}
+
+    @classmethod
+    def from_vector(cls, vector, catalog=None):
+        """Strategie aus einem flachen Parametervektor (Reihenfolge wie parameter_shapes)"""
+        spec = env_spec(catalog if catalog is not None else load_catalog())
+        params, start = {}, 0
+        for name, shape in parameter_shapes(spec).items():
+            size = int(np.prod(shape))
+            params[name] = np.asarray(vector[start:start + size]).reshape(shape)
+            start += size
+        return cls(params, catalog)
+
+    @classmethod
+    def default(cls, catalog=None):
+        """Ausgangspunkt ähnlich strategies.produce_to_capacity: Mix und Verteilung nach Präferenz"""
+        spec = env_spec(catalog if catalog is not None else load_catalog())
+        demand = spec.demand_mean
+        return cls({
+            'reorder_point': np.full(len(spec.parts), 20.0),
+            'order_quantity': np.full(len(spec.parts), 40.0),
+            'production_mix': demand.sum(axis=0) / demand.sum(),
+            'shipping_split': demand / demand.sum(axis=0),
+            'hire_above': np.full(2, PARAMETER_BOUNDS['hire_above'][1]),
+            'fire_below': np.zeros(2),
+            'max_workers': spec.initial_workers.astype(float),
+            'cash_reserve': 20000.0,
+        }, catalog)
+
+    def to_vector(self):
+        return np.concatenate([self.params[name].ravel() for name in parameter_shapes(self.spec)])
+
+    def clip(self):
+        """Begrenzt alle Parameter auf PARAMETER_BOUNDS"""
+        for name, value in self.params.items():
+            np.clip(value, *PARAMETER_BOUNDS[name], out=value)
+        return self
+
+    # Regeln auf Arrays mit führender Spielachse K
+
+    def hiring(self, workers, balance):
+        """Änderung der Arbeiterzahl (K, 2): +1, -1 oder 0 je Gruppe"""
+        p = self.params
+        balance = np.asarray(balance, dtype=float)[:, None]
+        max_workers = np.round(p['max_workers'])
+        hire = (balance > p['hire_above']) & (workers < max_workers)
+        fire = ((balance < p['fire_below']) | (workers > max_workers)) & (workers > 1) & ~hire
+        return hire.astype(np.int64) - fire
+
+    def purchase(self, stock, balance):
+        """Bestellmengen (K, P) für den Teilebestand stock (K, P) inklusive offener Bestellungen"""
+        p = self.params
+        order = np.where(stock < p['reorder_point'], np.round(p['order_quantity']), 0.0)
+        cost = order @ self.spec.part_prices
+        budget = np.asarray(balance, dtype=float) - p['cash_reserve']
+        scale = np.clip(np.divide(budget, cost, out=np.ones_like(cost), where=cost > 0), 0, 1)
+        return np.floor(order * scale[:, None]).astype(np.int64)
+
+    def production(self, workers, parts):
+        """Produktionsplan (K, B) bis zur Arbeitskapazität, anteilig gekürzt auf die Teile (K, P)"""
+        spec = self.spec
+        plan = mix_plan(self.params['production_mix'], workers * HOURS_PER_WORKER, spec.labour_hours)
+        required = plan @ spec.bom
+        with np.errstate(divide='ignore', invalid='ignore'):
+            coverage = np.where(required > 0, parts / required, np.inf).min(axis=1)
+        return np.floor(plan * np.clip(coverage, 0, 1)[:, None]).astype(np.int64)
+
+    def shipping(self, stock):
+        """Verteilung (K, M, B) der Fahrräder in den Lagern stock (K, B) auf die Märkte"""
+        split = self.params['shipping_split']
+        totals = split.sum(axis=0)
+        split = np.where(totals > 0, split / np.where(totals > 0, totals, 1), 1 / len(split))
+        stock = np.asarray(stock, dtype=np.int64)
+        quantity = np.floor(split * stock[:, None, :]).astype(np.int64)
+        # Rundungsreste gehen in den Markt mit dem größten Anteil
+        columns = np.arange(stock.shape[1])
+        quantity[:, split.argmax(axis=0), columns] += stock - quantity.sum(axis=1)
+        return quantity
+
+    def actions(self, parts, bikes, workers, balance):
+        """
+        Aktionen (K, action_size) für Zustände wie in VectorBicycleEnv: parts (K, 2, P),
+        bikes (K, Standorte, B), workers (K, 2), balance (K,)
+        """
+        spec = self.spec
+        hire = self.hiring(workers, balance)
+        workers = np.maximum(workers + hire, 0)
+        # Die Monatsgehälter (beim Monatsabschluss fällig) stehen nicht für den Einkauf zur Verfügung
+        balance = balance - workers @ spec.salaries
+        purchase = self.purchase(parts.sum(axis=1), balance)
+        production = self.production(workers, parts.sum(axis=1) + purchase)
+        distribution = self.shipping(bikes[:, :2].sum(axis=1) + production)
+        sections = {'purchase': purchase, 'production': production,
+                    'distribution': distribution.reshape(len(distribution), -1), 'hire': hire}
+        return np.concatenate([sections[name] for name in spec.action_slices], axis=1)
+
+    def act(self, env):
+        """Aktionen für eine VectorBicycleEnv (K, action_size) oder eine BicycleEnv (action_size,)"""
+        if np.ndim(env.balance) == 0:
+            return self.actions(env.parts[None], env.bikes[None], env.workers[None],
+                                np.array([env.balance]))[0]
+        return self.actions(env.parts, env.bikes, env.workers, env.balance)
+
+    def __call__(self, sim):
+        """Entscheidungen eines Monats in der Streamlit-Engine (Strategie im Sinne von strategies.py)"""
+        spec = self.spec
+
+        # Personal
+        hire = self.hiring(np.array([[sim.skilled_workers, sim.unskilled_workers]]), np.array([sim.balance]))[0]
+        if hire.any():
+            skilled, unskilled = hire.tolist()
+            sim.manage_workers(max(skilled, 0), max(-skilled, 0), max(unskilled, 0), max(-unskilled, 0))
+
+        # Einkauf nach Bestellpunkten; offene Bestellungen zählen zum Bestand
+        on_hand = np.array([[sim.item_count('germany', part) + sim.item_count('france', part) for part in spec.parts]])
+        on_order = np.zeros_like(on_hand)
+        for order in sim.open_orders():
+            for part, quantity in order['items'].items():
+                if part in spec.parts:
+                    on_order[0, spec.parts.index(part)] += quantity
+        purchase = self.purchase(on_hand + on_order, np.array([sim.balance]))[0]
+        order = {}
+        for part, supplier, quantity in zip(spec.parts, spec.part_suppliers, purchase.tolist()):
+            if quantity > 0 and supplier is not None:
+                order.setdefault(supplier, {})[part] = quantity
+        if order:
+            sim.purchase_materials(order)
+            on_hand = np.array([[sim.item_count('germany', part) + sim.item_count('france', part)
+                                 for part in spec.parts]])
+
+        # Produktion mit den vorhandenen Teilen
+        production = self.production(np.array([[sim.skilled_workers, sim.unskilled_workers]]), on_hand)[0]
+        plan = {bike_type: quantity for bike_type, quantity in zip(spec.bike_types, production.tolist()) if quantity > 0}
+        if plan:
+            sim.produce_bicycles(plan)
+
+        # Verteilung der Fahrräder in beiden Lagern
+        stock = np.array([[sim.item_count('germany', bike_type) + sim.item_count('france', bike_type)
+                           for bike_type in spec.bike_types]])
+        shipping = self.shipping(stock)[0]
+        distribution = {}
+        for m, market in enumerate(spec.markets):
+            bikes = {bike_type: quantity for bike_type, quantity in zip(spec.bike_types, shipping[m].tolist())
+                     if quantity > 0}
+            if bikes:
+                distribution[market] = bikes
+        if distribution:
+            sim.distribute_to_markets(distribution)
+
+    def to_dict(self):
+        return {name: value.tolist() for name, value in self.params.items()}
+
+
+def save_autopilot(entries, path=AUTOPILOT_FILE, **meta):
+    """
+    Schreibt Strategien in eine JSON-Datei. entries: Liste von (ParametricPolicy, Fitness),
+    beste zuerst; meta (z. B. Monate und Anzahl der Spiele der Suche) wird mitgespeichert.
+    """
+    data = dict(meta, policies=[{'fitness': float(fitness), 'parameters': policy.to_dict()}
+                                for policy, fitness in entries])
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def load_autopilot(path=AUTOPILOT_FILE, index=0, catalog=None):
+    """Lädt die Strategie an Position index (0 = beste) aus einer Autopilot-Datei"""
+    with open(path) as f:
+        data = json.load(f)
+    return ParametricPolicy(data['policies'][index]['parameters'], catalog)
+
+
+def autopilot_available(path=AUTOPILOT_FILE):
+    return os.path.exists(path)
@@ -0,0 +1,415 @@
+"""
+Benchmark suite for the simulation hot paths.
+
+Times the month-cycle operations of the Streamlit engine (simulation_engine.py), of the
+console game (BicycleSimulation.py) and of the training environment (bicycle_env.py) on
+synthetic game states of increasing size. Copy-on-write forking of a session (sim.fork) is
+timed next to copy.deepcopy of the same state:
+
+    skus     number of bicycle types (each with its own parts and supplier products)
+    history  number of already played months in the session statistics
+    markets  number of sales markets
+
+Every axis is varied on its own while the other two stay at their base value, so each
+operation gets one scaling curve per axis. Results are written as JSON and can be compared
+against a stored baseline:
+
+    python benchmarks.py --output bench.json
+    python benchmarks.py --baseline bench.json --threshold 0.25
+
+The comparison exits with status 1 if any median got slower than the threshold allows.
+"""
+
+import argparse
+import copy
+import json
+import os
+import pickle
+import platform
+import random
+import statistics
+import sys
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+
+from simulation_catalog import (SimulationCatalog, default_bicycle_recipes, default_item_storage_space,
+                                default_market_preferences, default_start_inventory, default_suppliers)
+from bicycle_env import BicycleEnv, VectorBicycleEnv
+from simulation_engine import BicycleSimulation
+
+BASE_SIZE = {'skus': 6, 'history': 12, 'markets': 2}
+AXES = {
+    'skus': [6, 24, 96, 384],
+    'history': [0, 12, 120, 1200],
+    'markets': [2, 8, 32, 128],
+}
+QUICK_AXES = {
+    'skus': [6, 24],
+    'history': [0, 120],
+    'markets': [2, 8],
+}
+
+STOCK_PER_ITEM = 1000
+VECTOR_GAMES = 256
+
+
+# ---------------------------------------------------------------------------
+# Synthetic game states
+# ---------------------------------------------------------------------------
+
+def synthetic_catalog(skus, markets):
+    """
+    Builds a catalog with `skus` bicycle types and `markets` markets by cloning the default
+    bicycle types with their parts. Prices, preferences and storage space stay realistic.
+    """
+    base_recipes = default_bicycle_recipes()
+    base_suppliers = default_suppliers()
+    base_space = default_item_storage_space()
+    base_start = default_start_inventory()
+    base_preferences = default_market_preferences()
+    base_prices = SimulationCatalog().bicycle_prices
+
+    base_types = sorted(base_recipes)
+    recipes, prices, item_space, start_inventory = {}, {}, {}, {}
+    suppliers = {name: dict(data, products={}) for name, data in base_suppliers.items()}
+    market_names = [f'market_{m}' for m in range(markets)]
+    preferences = {market: {} for market in market_names}
+
+    for index in range(skus):
+        copy_number, position = divmod(index, len(base_types))
+        base_type = base_types[position]
+        suffix = '' if copy_number == 0 else f'_{copy_number}'
+        bike_type = base_type + suffix
+
+        recipe = dict(base_recipes[base_type])
+        for component_type, part in base_recipes[base_type].items():
+            if component_type in ['skilled_hours', 'unskilled_hours'] or part is None:
+                continue
+            recipe[component_type] = part + suffix
+            item_space[part + suffix] = base_space.get(part, 0.1)
+            start_inventory[part + suffix] = base_start.get(part, 15)
+            for name, data in base_suppliers.items():
+                if part in data['products']:
+                    suppliers[name]['products'][part + suffix] = data['products'][part]
+
+        recipes[bike_type] = recipe
+        prices[bike_type] = base_prices[base_type]
+        item_space[bike_type] = base_space.get(base_type, 1.0)
+        start_inventory[bike_type] = 0
+
+        for m, market in enumerate(market_names):
+            template = base_preferences['muenster' if m % 2 == 0 else 'toulouse']
+            preferences[market][bike_type] = template.get(base_type, 0.05)
+
+    return SimulationCatalog(
+        suppliers=suppliers,
+        bicycle_recipes=recipes,
+        item_storage_space=item_space,
+        bicycle_prices=prices,
+        market_preferences=preferences,
+        market_warehouses={market: ('germany' if m % 2 == 0 else 'france')
+                           for m, market in enumerate(market_names)},
+        start_inventory=start_inventory,
+        initial_skilled_workers=max(1, skus),
+        initial_unskilled_workers=max(2, 4 * skus),
+    )
+
+
+def streamlit_state(skus, history, markets):
+    """A Streamlit-engine session with full warehouses and `history` played months"""
+    catalog = synthetic_catalog(skus, markets)
+    sim = BicycleSimulation(catalog=catalog, ui=None, seed=0)
+
+    for item in sim.inventory_germany:
+        sim.inventory_germany[item] = STOCK_PER_ITEM
+        sim.inventory_france[item] = STOCK_PER_ITEM // 2
+    standard = sim.quality_index['standard']
+    sim.bike_stock[sim.location_index['germany'], :, standard] = STOCK_PER_ITEM
+    sim.bike_stock[sim.location_index['france'], :, standard] = STOCK_PER_ITEM // 2
+    for market in sim.markets:
+        sim.bike_stock[sim.location_index[market], :, standard] = 50
+
+    # Statistics as they would look after `history` months
+    for month in range(1, history + 1):
+        for kind in ['material', 'shipping', 'salary']:
+            sim.expenses.append({'month': month, 'type': kind, 'amount': 1000})
+        sim.revenues.append({'month': month, 'type': 'sales', 'amount': 5000})
+        sim.sales_history.append({
+            'month': month,
+            'sales': {
+                'total_revenue': 5000,
+                'by_market': {market: {bike_type: {'quantity': 1, 'revenue': 600, 'demand': 2}
+                                       for bike_type in catalog.bike_types}
+                              for market in catalog.markets}
+            }
+        })
+        for market in catalog.markets:
+            for bike_type in catalog.bike_types:
+                sim.sales_totals.add(month, market, bike_type, 1, 600)
+        sim.monthly_reports.append({'month': month, 'balance': sim.balance})
+    sim.current_month = history + 1
+    return sim
+
+
+def purchase_order(sim):
+    """Ten of every product from every supplier"""
+    return {supplier: {item: 10 for item in data['products']} for supplier, data in sim.suppliers.items()}
+
+
+def production_plan(sim):
+    return {bike_type: 2 for bike_type in sim.bicycle_recipes}
+
+
+def distribution_plan(sim):
+    return {market: {bike_type: 3 for bike_type in sim.bicycle_recipes} for market in sim.markets}
+
+
+def env_state(skus, history, markets):
+    """A training environment (bicycle_env.py) with full warehouses; history does not apply"""
+    env = BicycleEnv(catalog=synthetic_catalog(skus, markets), max_months=10 ** 9)
+    env.reset(seed=0)
+    env.parts[:] = STOCK_PER_ITEM
+    env.bikes[:2] = STOCK_PER_ITEM
+    env.workers[:] = 4 * skus
+    env.balance = 10 ** 9
+    return env
+
+
+def vector_env_state(skus, history, markets):
+    """VECTOR_GAMES stacked environments with full warehouses"""
+    env = VectorBicycleEnv(VECTOR_GAMES, catalog=synthetic_catalog(skus, markets), max_months=10 ** 9)
+    env.reset(seed=0)
+    env.parts[:] = STOCK_PER_ITEM
+    env.bikes[:, :2] = STOCK_PER_ITEM
+    env.workers[:] = 4 * skus
+    env.balance[:] = 10 ** 9
+    return env
+
+
+def env_action(env):
+    """Buys, produces and distributes a little of everything"""
+    spec = env.spec
+    return env.make_action(purchase={part: 10 for part in spec.parts},
+                           production={bike_type: 2 for bike_type in spec.bike_types},
+                           distribution={market: {bike_type: 3 for bike_type in spec.bike_types}
+                                         for market in spec.markets})
+
+
+def cli_state(skus, history, markets):
+    """
+    A console-game session. The console game has two fixed markets, so only the SKU and
+    history axes change its state; extra models get the default market preference.
+    """
+    import BicycleSimulation as cli
+
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        game = cli.BicycleSimulation()
+    base_models = list(game.bicycles_in_market_muenster)
+    for inventory in [game.bicycles_in_market_muenster, game.bicycles_in_market_toulouse]:
+        inventory.clear()
+        for index in range(skus):
+            copy_number, position = divmod(index, len(base_models))
+            model = base_models[position]
+            name = model if copy_number == 0 else f'{model} {copy_number}'
+            inventory[name] = {'budget': 40, 'standard': 40, 'premium': 40}
+    for month in range(1, history + 1):
+        game.monthly_reports.append({'month': month, 'revenue': 5000, 'expenses': 4000, 'profit_loss': 1000})
+    game.current_month = history + 1
+    return game
+
+
+# ---------------------------------------------------------------------------
+# Benchmark definitions: name -> (state factory, operation, axes)
+# ---------------------------------------------------------------------------
+
+BENCHMARKS = {
+    'streamlit.purchase_materials': (
+        streamlit_state, lambda sim, args: sim.purchase_materials(args), purchase_order, ['skus', 'history']),
+    'streamlit.produce_bicycles': (
+        streamlit_state, lambda sim, args: sim.produce_bicycles(args), production_plan, ['skus', 'history']),
+    'streamlit.distribute_to_markets': (
+        streamlit_state, lambda sim, args: sim.distribute_to_markets(args), distribution_plan,
+        ['skus', 'history', 'markets']),
+    'streamlit.calculate_storage_usage': (
+        streamlit_state, lambda sim, args: sim.calculate_storage_usage(), None, ['skus']),
+    'streamlit.simulate_sales': (
+        streamlit_state, lambda sim, args: sim.simulate_sales(), None, ['skus', 'history', 'markets']),
+    'streamlit.generate_monthly_report': (
+        streamlit_state, lambda sim, args: sim.generate_monthly_report(), None, ['skus', 'history', 'markets']),
+    'streamlit.advance_month': (
+        streamlit_state, lambda sim, args: sim.close_month(), None, ['skus', 'history', 'markets']),
+    'streamlit.fork': (
+        streamlit_state, lambda sim, args: sim.fork(), None, ['skus', 'history', 'markets']),
+    'streamlit.fork_advance_month': (
+        streamlit_state, lambda sim, args: sim.fork().close_month(), None, ['skus', 'history', 'markets']),
+    'streamlit.deepcopy': (
+        streamlit_state, lambda sim, args: copy.deepcopy(sim), None, ['skus', 'history', 'markets']),
+    'env.step': (
+        env_state, lambda env, action: env.step(action), env_action, ['skus', 'markets']),
+    'env.vector_step': (
+        vector_env_state, lambda env, action: env.step(action), env_action, ['skus', 'markets']),
+    'cli.process_market_sales': (
+        cli_state, lambda game, args: game.process_market_sales('Muenster', game.bicycles_in_market_muenster,
+                                                                verbose=False), None, ['skus']),
+    'cli.advance_month': (
+        cli_state, lambda game, args: game.close_month(verbose=False), None, ['skus', 'history']),
+}
+
+
+def time_operation(base_state, operation, args, number, repeat):
+    """
+    Runs `operation` `number` times per repeat, every call on its own copy of the state.
+    Copies are made (via pickle, much faster than deepcopy) before the clock starts, so only
+    the operation itself is measured. Returns the per-call times of all repeats in seconds.
+    """
+    snapshot = pickle.dumps(base_state, pickle.HIGHEST_PROTOCOL)
+    timings = []
+    for _ in range(repeat):
+        states = [pickle.loads(snapshot) for _ in range(number)]
+        random.seed(0)
+        start = time.perf_counter()
+        for state in states:
+            operation(state, args)
+        timings.append((time.perf_counter() - start) / number)
+    return timings
+
+
+def calibrate(base_state, operation, args, target=0.02, limit=200):
+    """Picks a call count so that one repeat takes roughly `target` seconds"""
+    state = pickle.loads(pickle.dumps(base_state, pickle.HIGHEST_PROTOCOL))
+    start = time.perf_counter()
+    operation(state, args)
+    elapsed = max(time.perf_counter() - start, 1e-7)
+    return max(1, min(limit, int(target / elapsed)))
+
+
+def run_benchmarks(selected=None, axes=None, repeat=5, verbose=True):
+    """Runs all (or the selected) benchmarks over all sizes and returns the result records"""
+    axes = axes or AXES
+    results = []
+
+    for name, (factory, operation, make_args, bench_axes) in BENCHMARKS.items():
+        if selected and not any(pattern in name for pattern in selected):
+            continue
+
+        sizes = []
+        for axis in bench_axes:
+            for value in axes[axis]:
+                params = dict(BASE_SIZE, **{axis: value})
+                if params not in sizes:
+                    sizes.append(params)
+
+        for params in sizes:
+            state = factory(**params)
+            args = make_args(state) if make_args else None
+            number = calibrate(state, operation, args)
+            timings = time_operation(state, operation, args, number, repeat)
+
+            record = {
+                'name': name,
+                'params': params,
+                'number': number,
+                'repeat': repeat,
+                'min': min(timings),
+                'median': statistics.median(timings),
+                'mean': statistics.mean(timings),
+                'stdev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+            }
+            results.append(record)
+            if verbose:
+                print(f"{name:40} {format_params(params):32} {format_time(record['median']):>12}"
+                      f"  (min {format_time(record['min'])}, n={number}x{repeat})")
+
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Output and baseline comparison
+# ---------------------------------------------------------------------------
+
+def format_params(params):
+    return ' '.join(f'{key}={value}' for key, value in sorted(params.items()))
+
+
+def format_time(seconds):
+    if seconds < 1e-3:
+        return f'{seconds * 1e6:.1f} µs'
+    if seconds < 1:
+        return f'{seconds * 1e3:.2f} ms'
+    return f'{seconds:.3f} s'
+
+
+def result_key(record):
+    return record['name'], format_params(record['params'])
+
+
+def environment_info():
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+    }
+
+
+def write_results(path, results, repeat):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'meta': dict(environment_info(), repeat=repeat), 'results': results}, f, indent=2)
+
+
+def compare_with_baseline(results, baseline_path, threshold):
+    """
+    Compares the medians with a stored baseline. Returns the list of regressions, i.e.
+    results whose median grew by more than `threshold` (0.25 = 25 % slower).
+    """
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {result_key(record): record for record in json.load(f)['results']}
+
+    regressions = []
+    print(f"\nComparison with {baseline_path} (threshold +{threshold:.0%}):")
+    for record in results:
+        key = result_key(record)
+        if key not in baseline:
+            print(f"  {key[0]:40} {key[1]:32} new")
+            continue
+
+        ratio = record['median'] / baseline[key]['median'] if baseline[key]['median'] > 0 else float('inf')
+        status = 'REGRESSION' if ratio > 1 + threshold else ('faster' if ratio < 1 - threshold else 'ok')
+        print(f"  {key[0]:40} {key[1]:32} {ratio:6.2f}x  {status}")
+        if status == 'REGRESSION':
+            regressions.append(dict(record, baseline_median=baseline[key]['median'], ratio=ratio))
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks for the bicycle simulation hot paths')
+    parser.add_argument('--output', '-o', help='write the results as JSON to this file')
+    parser.add_argument('--baseline', '-b', help='compare against a previously written JSON file')
+    parser.add_argument('--threshold', '-t', type=float, default=0.25,
+                        help='allowed slowdown of the median before a result counts as regression (default 0.25)')
+    parser.add_argument('--repeat', '-r', type=int, default=5, help='repeats per benchmark (default 5)')
+    parser.add_argument('--quick', action='store_true', help='small sizes and 3 repeats, for a fast check')
+    parser.add_argument('--filter', '-k', action='append',
+                        help='only run benchmarks whose name contains this text (can be repeated)')
+    args = parser.parse_args(argv)
+
+    repeat = 3 if args.quick else args.repeat
+    results = run_benchmarks(selected=args.filter, axes=QUICK_AXES if args.quick else AXES, repeat=repeat)
+
+    if args.output:
+        write_results(args.output, results, repeat)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        regressions = compare_with_baseline(results, args.baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) found.")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
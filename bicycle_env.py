@@ -0,0 +1,470 @@
+"""
+Trainingsumgebung im Stil von Gym für automatische Spielstrategien.
+
+BicycleEnv bildet die Monatsregeln der Streamlit-Engine (simulation_engine.py) auf Arrays ab:
+Einkauf beim günstigsten Lieferanten inklusive Reklamationen, Produktion mit Arbeitszeit- und
+Materialgrenzen, Verteilung mit Transportkosten, Personalentscheidungen, Quartalsmieten und
+Verkäufe mit zufälliger Nachfrage. Nicht abgebildet sind Lieferzeiten, Kredite, Qualitätsstufen
+und Preisentscheidungen (verkauft wird Standardqualität zum Katalogpreis). step() baut keine
+Dictionaries und gibt nichts aus; eine vollständig machbare Aktion wird mit einer vorberechneten
+Matrix (EnvSpec.transition) in einem Schritt auf die Bestände angewendet:
+
+    env = BicycleEnv()
+    observation, info = env.reset(seed=0)
+    action = env.make_action(purchase={'rahmen_herren': 10}, production={'herrenrad': 5})
+    observation, reward, terminated, truncated, info = env.step(action)
+
+Eine Aktion ist ein ganzzahliger Vektor der Länge spec.action_size; spec.action_slices
+beschreibt die Abschnitte (Einkauf je Teil, Produktion je Fahrradtyp, Verteilung je Markt und
+Fahrradtyp, Einstellungen/Entlassungen je Arbeitergruppe). Die Beobachtung enthält die
+Teilebestände beider Lager, die Fahrräder je Standort, Guthaben, Arbeiter und Monat
+(Namen in spec.observation_names). Die Belohnung ist der Monatsgewinn (Änderung des Guthabens).
+
+VectorBicycleEnv(k) führt k Spiele als gestapelte Arrays und wendet k Aktionen mit einem
+step()-Aufruf an; das ist der schnelle Weg für Strategiesuchen mit vielen Spielen.
+"""
+
+import functools
+import math
+
+import numpy as np
+
+from simulation_catalog import load_catalog
+
+# Arbeitsstunden pro Arbeiter und Monat (wie in simulation_engine.py)
+HOURS_PER_WORKER = 150
+
+
+class EnvSpec:
+    """Die für die Umgebung benötigten Katalogdaten als Arrays (einmal pro Katalog)"""
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.parts = tuple(catalog.part_names)
+        self.bike_types = tuple(sorted(catalog.bike_types))
+        self.markets = tuple(catalog.markets)
+        self.locations = ('germany', 'france') + self.markets
+        part_index = {part: i for i, part in enumerate(self.parts)}
+        P, B, M = len(self.parts), len(self.bike_types), len(self.markets)
+
+        # Stückliste als Indizes der benötigten Teile je Fahrradtyp und als Matrix (B, P)
+        self.bom = np.zeros((B, P), dtype=np.int64)
+        self.bom_parts = []
+        for b, bike_type in enumerate(self.bike_types):
+            recipe = catalog.bicycle_recipes[bike_type]
+            parts = [part_index[part] for component, part in recipe.items()
+                     if component not in ('skilled_hours', 'unskilled_hours') and part is not None]
+            self.bom[b, parts] = 1
+            self.bom_parts.append(np.array(parts, dtype=np.int64))
+        self.labour_hours = np.array([[catalog.bicycle_recipes[bike_type]['skilled_hours'],
+                                       catalog.bicycle_recipes[bike_type]['unskilled_hours']]
+                                      for bike_type in self.bike_types])
+
+        # Jedes Teil wird beim günstigsten Lieferanten gekauft
+        self.part_suppliers = []
+        for part in self.parts:
+            offers = [(data['products'][part], supplier) for supplier, data in catalog.suppliers.items()
+                      if part in data['products']]
+            self.part_suppliers.append(min(offers)[1] if offers else None)
+        self.part_prices = np.array([catalog.suppliers[supplier]['products'][part] if supplier else 0.0
+                                     for part, supplier in zip(self.parts, self.part_suppliers)])
+        self.complaint_probability = np.array([catalog.suppliers[supplier]['complaint_probability'] if supplier
+                                               else 0.0 for supplier in self.part_suppliers])
+        self.complaint_percentage = np.array([catalog.suppliers[supplier]['complaint_percentage'] if supplier
+                                              else 0.0 for supplier in self.part_suppliers])
+
+        # Märkte: beliefernde Lager, erwartete Nachfrage und Verkaufspreise (M, B)
+        self.local_warehouse = np.array([0 if catalog.market_warehouses.get(market, 'germany') == 'germany' else 1
+                                         for market in self.markets])
+        self.shipping_local = catalog.shipping_costs['local']
+        self.shipping_distant = catalog.shipping_costs['distant']
+        self.demand_mean = np.array([[catalog.market_preferences[market].get(bike_type, 0.05) * 100
+                                      for bike_type in self.bike_types] for market in self.markets])
+        self.demand_std = 20.0
+        self.prices = np.broadcast_to(np.array([catalog.bicycle_prices[bike_type] for bike_type in self.bike_types],
+                                               dtype=float), (M, B)).copy()
+
+        self.salaries = np.array([catalog.worker_salaries['skilled'], catalog.worker_salaries['unskilled']], dtype=float)
+        self.quarterly_rent = float(sum(catalog.storage_rent.values()))
+
+        # Startzustand
+        self.initial_parts = np.zeros((2, P), dtype=np.int64)
+        self.initial_parts[0] = [catalog.start_inventory.get(part, 0) for part in self.parts]
+        self.initial_bikes = np.zeros((len(self.locations), B), dtype=np.int64)
+        self.initial_bikes[0] = [catalog.start_inventory.get(bike_type, 0) for bike_type in self.bike_types]
+        self.initial_workers = np.array([catalog.initial_skilled_workers, catalog.initial_unskilled_workers],
+                                        dtype=np.int64)
+        self.initial_balance = float(catalog.initial_balance)
+
+        # Aufbau von Aktion und Beobachtung
+        sizes = {'purchase': P, 'production': B, 'distribution': M * B, 'hire': 2}
+        self.action_slices, start = {}, 0
+        for name, size in sizes.items():
+            self.action_slices[name] = slice(start, start + size)
+            start += size
+        self.action_size = start
+
+        # Zuordnung der Aktion auf die Arrays, damit step() ohne Dictionaries auskommt.
+        # Bestände als ein Vektor: Teile (2, P), dann Fahrräder (Standorte, B)
+        self.purchase_slice = self.action_slices['purchase']
+        self.production_slice = self.action_slices['production']
+        self.distribution_slice = self.action_slices['distribution']
+        self.hire_slice = self.action_slices['hire']
+        self.distribution_shape = (M, B)
+        self.parts_size = 2 * P
+        self.initial_counts = np.concatenate((self.initial_parts.ravel(), self.initial_bikes.ravel()))
+
+        # Ist alles machbar (Teile aus Deutschland, Fahrräder aus dem Lager des Marktes), wirkt eine
+        # Aktion linear: Bestandsänderung transition @ Aktion, Arbeitsstunden Aktion @ action_hours
+        # und Kosten action_costs @ Aktion. transition ist float64 (BLAS statt Ganzzahl-Schleife,
+        # exakt für Mengen unter 2**53)
+        bikes_start = 2 * P
+        self.transition = np.zeros((len(self.initial_counts), self.action_size))
+        self.action_hours = np.zeros((self.action_size, 2))
+        self.action_costs = np.zeros(self.action_size)
+        purchase, production, distribution = self.purchase_slice, self.production_slice, self.distribution_slice
+        self.transition[np.arange(P), np.arange(purchase.start, purchase.stop)] = 1
+        self.action_costs[purchase] = self.part_prices
+        self.transition[:P, production] = -self.bom.T
+        self.transition[bikes_start + np.arange(B), np.arange(production.start, production.stop)] = 1
+        self.action_hours[production] = self.labour_hours
+        for m in range(M):
+            columns = np.arange(distribution.start + m * B, distribution.start + (m + 1) * B)
+            self.transition[bikes_start + self.local_warehouse[m] * B + np.arange(B), columns] = -1
+            self.transition[bikes_start + (2 + m) * B + np.arange(B), columns] = 1
+        self.action_costs[distribution] = self.shipping_local
+
+        # Für Aktionen, die nicht vollständig machbar sind: Bedarf je Fahrradtyp an Teilen und
+        # Arbeitsstunden (B, P + 2) und das beliefernde Lager je Markt (2, M)
+        self.requirements = np.concatenate((self.bom, self.labour_hours), axis=1).astype(float)
+        self.local_matrix = np.zeros((2, M), dtype=np.int64)
+        self.local_matrix[self.local_warehouse, np.arange(M)] = 1
+
+        self.observation_names = (
+            tuple(f'parts_{warehouse}_{part}' for warehouse in ('germany', 'france') for part in self.parts)
+            + tuple(f'bikes_{location}_{bike_type}' for location in self.locations for bike_type in self.bike_types)
+            + ('balance', 'skilled_workers', 'unskilled_workers', 'month'))
+        self.observation_size = len(self.observation_names)
+
+    def make_action(self, purchase=None, production=None, distribution=None, hire=None):
+        """
+        Baut einen Aktionsvektor aus Dictionaries (nur für Aufrufer, nicht im step-Pfad):
+        purchase {Teil: Menge}, production {Fahrradtyp: Menge},
+        distribution {Markt: {Fahrradtyp: Menge}}, hire {'skilled'/'unskilled': +/- Anzahl}
+        """
+        action = np.zeros(self.action_size, dtype=np.int64)
+        for part, quantity in (purchase or {}).items():
+            action[self.action_slices['purchase'].start + self.parts.index(part)] = quantity
+        for bike_type, quantity in (production or {}).items():
+            action[self.action_slices['production'].start + self.bike_types.index(bike_type)] = quantity
+        for market, bikes in (distribution or {}).items():
+            offset = self.action_slices['distribution'].start + self.markets.index(market) * len(self.bike_types)
+            for bike_type, quantity in bikes.items():
+                action[offset + self.bike_types.index(bike_type)] = quantity
+        for group, change in (hire or {}).items():
+            action[self.action_slices['hire'].start + ('skilled', 'unskilled').index(group)] = change
+        return action
+
+
+# Begrenzt: Kataloge werden beim Entpickeln und je Sweep-Punkt neu gebaut und wären sonst dauerhaft gehalten
+@functools.lru_cache(maxsize=8)
+def env_spec(catalog):
+    """Gemeinsame EnvSpec je Katalog"""
+    return EnvSpec(catalog)
+
+
+class BicycleEnv:
+    """
+    Ein Spiel als Umgebung mit reset(seed) und step(action).
+    Eine Episode endet mit der Insolvenz (terminated) oder nach max_months Monaten (truncated).
+    """
+
+    def __init__(self, catalog=None, max_months=60):
+        self.spec = env_spec(catalog if catalog is not None else load_catalog())
+        self.max_months = max_months
+        self._info = {}
+        self.reset()
+
+    def reset(self, seed=None):
+        spec = self.spec
+        self.np_random = np.random.default_rng(seed)
+        self.counts = spec.initial_counts.copy()
+        self.workers = spec.initial_workers.copy()
+        self.balance = spec.initial_balance
+        self.month = 1
+        return self._observe(), self._info
+
+    @property
+    def parts(self):
+        """Teilebestände (2, P) als Sicht auf den Bestandsvektor counts"""
+        initial_parts = self.spec.initial_parts
+        return self.counts[:initial_parts.size].reshape(initial_parts.shape)
+
+    @property
+    def bikes(self):
+        """Fahrräder je Standort (Standorte, B) als Sicht auf den Bestandsvektor counts"""
+        initial_parts, initial_bikes = self.spec.initial_parts, self.spec.initial_bikes
+        return self.counts[initial_parts.size:].reshape(initial_bikes.shape)
+
+    def make_action(self, purchase=None, production=None, distribution=None, hire=None):
+        """Aktionsvektor aus Dictionaries (siehe EnvSpec.make_action)"""
+        return self.spec.make_action(purchase, production, distribution, hire)
+
+    def _observe(self):
+        skilled, unskilled = self.workers.tolist()
+        return np.concatenate((self.counts, (self.balance, skilled, unskilled, self.month)), dtype=float)
+
+    def step(self, action):
+        """Spielt einen Monat; gibt (Beobachtung, Belohnung, terminated, truncated, info) zurück"""
+        spec = self.spec
+        action = np.asarray(action)
+        quantities = np.maximum(action, 0)
+        bikes, workers = self.bikes, self.workers
+        balance = self.balance
+
+        # Personal; die Gehälter fallen beim Monatsabschluss an
+        np.maximum(workers + action[spec.hire_slice], 0, out=workers)
+
+        # Einkauf mit Reklamationen: je Teil wird mit complaint_probability ein Anteil aussortiert
+        purchase = quantities[spec.purchase_slice]
+        if purchase.any():
+            complaints = self.np_random.random(len(purchase)) < spec.complaint_probability
+            purchase -= (purchase * (complaints * spec.complaint_percentage)).astype(np.int64)
+
+        # Einkauf, Produktion und Verteilung in einem Schritt, wenn die Teile in Deutschland, die
+        # Fahrräder im Lager des jeweiligen Marktes und die Arbeitsstunden reichen
+        counts = self.counts + (spec.transition @ quantities).astype(np.int64)
+        labour_ok = (quantities @ spec.action_hours <= workers * HOURS_PER_WORKER).all()
+        if labour_ok and (counts >= 0).all():
+            self.counts[:] = counts
+            balance -= float(spec.action_costs @ quantities)
+        elif labour_ok and (counts[:spec.parts_size] >= 0).all():
+            # Einkauf und Produktion sind machbar, nur die Verteilung reicht nicht aus den lokalen Lagern
+            self.counts[:spec.parts_size] = counts[:spec.parts_size]
+            bikes[0] += quantities[spec.production_slice]
+            balance -= float(spec.action_costs[spec.purchase_slice] @ quantities[spec.purchase_slice])
+            balance -= self._distribute(quantities[spec.distribution_slice].reshape(spec.distribution_shape))
+        else:
+            balance -= self._apply_sequentially(quantities)
+
+        # Monatsabschluss: Gehälter, Quartalsmiete und Verkäufe
+        balance -= float(workers @ spec.salaries)
+        if self.month % 3 == 0:
+            balance -= spec.quarterly_rent
+        market_stock = bikes[2:]
+        demand = self.np_random.normal(spec.demand_mean, spec.demand_std)
+        sold = np.minimum(market_stock, np.maximum(demand, 0, out=demand).astype(np.int64))  # astype schneidet ab wie trunc
+        market_stock -= sold
+        balance += float(np.vdot(sold, spec.prices))
+
+        reward = balance - self.balance
+        self.balance = balance
+        self.month += 1
+        terminated = balance <= 0
+        truncated = self.month > self.max_months
+        return self._observe(), reward, terminated, truncated, self._info
+
+    def _apply_sequentially(self, quantities):
+        """
+        Einkauf, Produktion und Verteilung wie in der Engine nacheinander, wenn die Aktion nicht
+        vollständig machbar ist. Gibt die Kosten zurück.
+        """
+        spec = self.spec
+        parts, bikes, workers = self.parts, self.bikes, self.workers
+        purchase = quantities[spec.purchase_slice]
+        parts[0] += purchase
+        cost = float(purchase @ spec.part_prices)
+
+        # Produktion in der Reihenfolge der Fahrradtypen; Teile zuerst aus Deutschland
+        production = quantities[spec.production_slice]
+        if production.any():
+            available = np.concatenate((parts.sum(axis=0), workers * HOURS_PER_WORKER))
+            if not (production @ spec.requirements <= available).all():
+                production = self._feasible_production(production, available)
+            required = production @ spec.bom
+            from_germany = np.minimum(parts[0], required)
+            parts[0] -= from_germany
+            parts[1] -= required - from_germany
+            bikes[0] += production
+
+        cost += self._distribute(quantities[spec.distribution_slice].reshape(spec.distribution_shape))
+        return cost
+
+    def _feasible_production(self, production, available):
+        """Begrenzt den Plan Typ für Typ auf die verbleibenden Teile und Arbeitsstunden (available, P + 2)"""
+        requirements = self.spec.requirements
+        available = available.astype(float)
+        produced = np.zeros_like(production)
+        for b in np.flatnonzero(production).tolist():
+            needed = requirements[b]
+            used = needed > 0
+            quantity = min(int(production[b]), int(np.floor(available[used] / needed[used]).min())) if used.any() \
+                else int(production[b])
+            if quantity > 0:
+                available -= quantity * needed
+                produced[b] = quantity
+        return produced
+
+    def _distribute(self, distribution):
+        """
+        Verteilung (M, B): zuerst aus dem Lager des Marktes, der Rest aus dem anderen Lager.
+        Gibt die Transportkosten zurück.
+        """
+        spec, bikes = self.spec, self.bikes
+        if not distribution.any():
+            return 0.0
+        from_local = spec.local_matrix @ distribution
+        if (from_local <= bikes[:2]).all():
+            # Jedes Lager deckt seine Märkte: alle Märkte in einem Schritt
+            bikes[:2] -= from_local
+            bikes[2:] += distribution
+            return float(distribution.sum()) * spec.shipping_local
+
+        # Sonst Markt für Markt in der Reihenfolge der Märkte
+        stock = bikes[:2]
+        shipped = np.zeros(distribution.shape[1], dtype=np.int64)
+        distant = np.zeros_like(shipped)
+        for m, local in enumerate(spec.local_warehouse.tolist()):
+            quantity = np.minimum(distribution[m], stock[0] + stock[1])
+            from_distant = quantity - np.minimum(quantity, stock[local])
+            stock[local] -= quantity - from_distant
+            stock[1 - local] -= from_distant
+            bikes[2 + m] += quantity
+            shipped += quantity
+            distant += from_distant
+        distant_total = int(distant.sum())
+        return (int(shipped.sum()) - distant_total) * spec.shipping_local + distant_total * spec.shipping_distant
+
+
+class VectorBicycleEnv:
+    """
+    K Spiele als gestapelte Arrays, die mit einem Aufruf von step(actions) gemeinsam einen Monat
+    weiterlaufen. Es gelten die Regeln von BicycleEnv; Einkauf, Stücklistenverbrauch,
+    Kapazitätsprüfungen, Verkäufe sowie Gehälter und Mieten sind Array-Operationen über alle
+    Spiele. Bankrotte Spiele werden über die Maske `alive` eingefroren: ihre Aktionen wirken
+    nicht mehr, die Belohnung ist 0 und terminated bleibt True.
+    Die Zufallszahlen stammen aus einem gemeinsamen Generator; ein Spiel verläuft daher nicht
+    identisch zu einer BicycleEnv mit gleichem Seed.
+    """
+
+    def __init__(self, k, catalog=None, max_months=60):
+        self.k = k
+        self.spec = env_spec(catalog if catalog is not None else load_catalog())
+        self.max_months = max_months
+        self._info = {}
+        self.reset()
+
+    def reset(self, seed=None):
+        spec, k = self.spec, self.k
+        self.np_random = np.random.default_rng(seed)
+        self.parts = np.repeat(spec.initial_parts[None], k, axis=0)
+        self.bikes = np.repeat(spec.initial_bikes[None], k, axis=0)
+        self.workers = np.repeat(spec.initial_workers[None], k, axis=0)
+        self.balance = np.full(k, spec.initial_balance)
+        self.alive = np.ones(k, dtype=bool)
+        self.month = 1
+        return self._observe(), self._info
+
+    def make_action(self, purchase=None, production=None, distribution=None, hire=None):
+        """Aktionsvektor für ein Spiel (siehe EnvSpec.make_action); wird in step() auf alle Spiele übertragen"""
+        return self.spec.make_action(purchase, production, distribution, hire)
+
+    def _observe(self):
+        k = self.k
+        return np.concatenate((self.parts.reshape(k, -1), self.bikes.reshape(k, -1), self.balance[:, None],
+                               self.workers, np.full((k, 1), self.month)), axis=1, dtype=float)
+
+    def step(self, actions):
+        """
+        actions: Array der Form (K, action_size) oder (action_size,) für alle Spiele.
+        Gibt (Beobachtungen (K, observation_size), Belohnungen (K,), terminated (K,),
+        truncated (K,), info) zurück.
+        """
+        spec = self.spec
+        slices = spec.action_slices
+        parts, bikes, workers = self.parts, self.bikes, self.workers
+        alive = self.alive
+        # Bankrotte Spiele erhalten eine leere Aktion
+        actions = np.where(alive[:, None], np.broadcast_to(actions, (self.k, spec.action_size)), 0)
+        balance = self.balance.copy()
+
+        # Personal; die Gehälter fallen beim Monatsabschluss an
+        hire = actions[:, slices['hire']]
+        np.maximum(workers + hire, 0, out=workers)
+
+        # Einkauf mit Reklamationen
+        purchase = np.maximum(actions[:, slices['purchase']], 0)
+        complaints = self.np_random.random(purchase.shape) < spec.complaint_probability
+        purchase -= np.where(complaints, (purchase * spec.complaint_percentage).astype(np.int64), 0)
+        balance -= purchase @ spec.part_prices
+        parts[:, 0] += purchase
+
+        # Produktion: machbare Pläne in einem Schritt, die übrigen Spiele je Fahrradtyp nacheinander
+        production = np.maximum(actions[:, slices['production']], 0)
+        capacity = workers * HOURS_PER_WORKER
+        available = parts.sum(axis=1)
+        required = production @ spec.bom
+        feasible = (required <= available).all(axis=1) & (production @ spec.labour_hours <= capacity).all(axis=1)
+        required[~feasible] = 0
+        from_germany = np.minimum(parts[:, 0], required)
+        parts[:, 0] -= from_germany
+        parts[:, 1] -= required - from_germany
+        bikes[:, 0] += np.where(feasible[:, None], production, 0)
+
+        limited = np.flatnonzero(~feasible)
+        if len(limited):
+            self._produce_sequentially(limited, production[limited], capacity[limited])
+
+        # Verteilung je Markt: zuerst aus dem Lager des Marktes, der Rest aus dem anderen Lager
+        distribution = np.maximum(actions[:, slices['distribution']], 0).reshape(self.k, len(spec.markets), -1)
+        for m in range(len(spec.markets)):
+            local = spec.local_warehouse[m]
+            quantity = np.minimum(distribution[:, m], bikes[:, 0] + bikes[:, 1])
+            from_local = np.minimum(quantity, bikes[:, local])
+            from_distant = quantity - from_local
+            bikes[:, local] -= from_local
+            bikes[:, 1 - local] -= from_distant
+            bikes[:, 2 + m] += quantity
+            balance -= from_local.sum(axis=1) * spec.shipping_local + from_distant.sum(axis=1) * spec.shipping_distant
+
+        # Monatsabschluss: Gehälter, Quartalsmiete und Verkäufe (nur laufende Spiele)
+        balance -= np.where(alive, workers @ spec.salaries, 0.0)
+        if self.month % 3 == 0:
+            balance -= np.where(alive, spec.quarterly_rent, 0.0)
+        market_stock = bikes[:, 2:]
+        demand = self.np_random.normal(spec.demand_mean, spec.demand_std, size=market_stock.shape)
+        sold = np.minimum(market_stock, np.maximum(demand, 0).astype(np.int64)) * alive[:, None, None]
+        market_stock -= sold
+        balance += (sold * spec.prices).sum(axis=(1, 2))
+
+        reward = balance - self.balance
+        self.balance = balance
+        self.alive = alive & (balance > 0)
+        self.month += 1
+        terminated = ~self.alive
+        truncated = np.full(self.k, self.month > self.max_months)
+        return self._observe(), reward, terminated, truncated, self._info
+
+    def _produce_sequentially(self, games, production, capacity):
+        """Produktion wie in der Engine Typ für Typ für Spiele, deren Plan nicht vollständig machbar ist"""
+        spec = self.spec
+        parts = self.parts[games]
+        available = parts.sum(axis=1)
+        produced = np.zeros_like(production)
+        left = capacity.astype(float)
+        for b, needed in enumerate(spec.bom_parts):
+            quantity = production[:, b]
+            if len(needed):
+                quantity = np.minimum(quantity, available[:, needed].min(axis=1))
+            hours = spec.labour_hours[b]
+            with np.errstate(divide='ignore'):
+                by_labour = np.where(hours > 0, np.floor(left / np.where(hours > 0, hours, 1)), np.inf).min(axis=1)
+            quantity = np.maximum(np.minimum(quantity, by_labour), 0).astype(np.int64)
+            from_germany = np.minimum(parts[:, 0, needed], quantity[:, None])
+            parts[:, 0, needed] -= from_germany
+            parts[:, 1, needed] -= quantity[:, None] - from_germany
+            available[:, needed] -= quantity[:, None]
+            left -= quantity[:, None] * hours
+            produced[:, b] = quantity
+        self.parts[games] = parts
+        self.bikes[games, 0] += produced
@@ -0,0 +1,321 @@
+"""
+Performance dashboards of the console game (financial, sales and market comparison).
+
+All three dashboards are drawn from one shared DataFrame built from the monthly reports.
+Drawing uses the object-oriented Figure API, so the batch renderer never touches pyplot's
+global figure registry and can run headless; interactive display goes through pyplot and
+closes its figure afterwards.
+
+    from dashboards import render_dashboards
+    paths = render_dashboards(game.monthly_reports, output_dir='graphs', formats=('png', 'svg'))
+"""
+
+import functools
+import io
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+
+GUI_BACKENDS = ['Qt5Agg', 'TkAgg', 'GTK3Agg', 'wxAgg', 'MacOSX']
+DASHBOARDS = ('financial', 'sales', 'market')
+QUALITIES = ('budget', 'standard', 'premium')
+MARKET_LABELS = {'Muenster': 'Münster', 'muenster': 'Münster', 'toulouse': 'Toulouse'}
+FIGURE_SIZE = (15, 10)
+
+
+@functools.lru_cache(maxsize=None)
+def select_backend():
+    """
+    Chooses the matplotlib backend once per process and returns (backend, is_interactive).
+    Keeps an already active GUI backend, otherwise tries the GUI backends in order and
+    falls back to the non-interactive Agg backend.
+    """
+    import matplotlib
+
+    current_backend = matplotlib.get_backend()
+    if current_backend in GUI_BACKENDS:
+        return current_backend, True
+
+    # Without a display no GUI backend can work, so skip the probing entirely
+    has_display = sys.platform in ('win32', 'darwin') or os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY')
+    if has_display:
+        for backend in GUI_BACKENDS:
+            try:
+                matplotlib.use(backend, force=True)
+                return backend, True
+            except (ImportError, ValueError, RuntimeError):
+                continue
+
+    matplotlib.use('Agg', force=True)
+    return 'Agg', False
+
+
+def report_row(report):
+    """One row of reports_frame for a single monthly report"""
+    row = {
+        'month': report['month'],
+        'revenue': report.get('revenue', 0),
+        'expenses': report.get('expenses', 0),
+        'profit_loss': report.get('profit_loss', 0),
+        'bikes_sold': report.get('bikes_sold', 0),
+    }
+    for model, sold in report.get('sales_by_model', {}).items():
+        row[f'model.{model}'] = sold
+    for quality, sold in report.get('sales_by_quality', {}).items():
+        row[f'quality.{quality}'] = sold
+    for market, revenue in report.get('sales_by_market', {}).items():
+        row[f'market.{market}'] = revenue
+    return row
+
+
+def reports_frame(monthly_reports):
+    """
+    Flattens the monthly reports into one DataFrame: month, revenue, expenses, profit_loss,
+    bikes_sold plus one column per bicycle model ('model.<name>'), quality ('quality.<name>')
+    and market ('market.<name>'). Missing values are 0.
+    """
+    return _frame([report_row(report) for report in monthly_reports])
+
+
+def _frame(rows):
+    frame = pd.DataFrame(rows)
+    return frame.fillna(0) if not frame.empty else frame
+
+
+class ReportsTable:
+    """
+    reports_frame of a running game, kept up to date as months are closed. Each report is
+    flattened once, when it is added; frame() returns the cached DataFrame and only rebuilds
+    it after new months have been added.
+    """
+
+    def __init__(self):
+        self.rows = []
+        self._frame = None
+
+    def update(self, monthly_reports):
+        """Adds the reports that are not in the table yet (the list only ever grows)"""
+        if len(monthly_reports) > len(self.rows):
+            self.rows.extend(report_row(report) for report in monthly_reports[len(self.rows):])
+            self._frame = None
+        return self
+
+    def frame(self):
+        if self._frame is None:
+            self._frame = _frame(self.rows)
+        return self._frame
+
+
+def _columns(frame, prefix):
+    """Column suffixes with the given prefix, e.g. the model names for 'model.'"""
+    return [column[len(prefix):] for column in frame.columns if column.startswith(prefix)]
+
+
+def draw_financial(fig, frame):
+    """Financial performance: profit/loss, cumulative result, revenue vs. expenses, margin"""
+    months = frame['month']
+    axes = fig.subplots(2, 2)
+
+    ax = axes[0, 0]
+    ax.plot(months, frame['revenue'], 'g-', label='Revenue')
+    ax.plot(months, frame['expenses'], 'r-', label='Expenses')
+    ax.plot(months, frame['profit_loss'], 'b-', label='Profit/Loss')
+    ax.set(title='Monthly Financial Performance', xlabel='Month', ylabel='Amount (€)')
+    ax.grid(True)
+    ax.legend()
+
+    ax = axes[0, 1]
+    ax.plot(months, frame['profit_loss'].cumsum(), 'b-')
+    ax.set(title='Cumulative Profit/Loss', xlabel='Month', ylabel='Amount (€)')
+    ax.grid(True)
+
+    ax = axes[1, 0]
+    bar_width = 0.35
+    ax.bar(months - bar_width / 2, frame['revenue'], bar_width, label='Revenue', color='g')
+    ax.bar(months + bar_width / 2, frame['expenses'], bar_width, label='Expenses', color='r')
+    ax.set(title='Revenue vs Expenses Comparison', xlabel='Month', ylabel='Amount (€)')
+    ax.grid(True)
+    ax.legend()
+
+    ax = axes[1, 1]
+    margin_pct = (frame['profit_loss'] / frame['revenue'].replace(0, np.nan) * 100).fillna(0)
+    ax.plot(months, margin_pct, 'purple')
+    ax.set(title='Monthly Profit Margin', xlabel='Month', ylabel='Profit Margin (%)')
+    ax.grid(True)
+
+    fig.tight_layout()
+
+
+def draw_sales(fig, frame):
+    """Sales analysis: total units, units per model, units per quality, latest model split"""
+    months = frame['month']
+    axes = fig.subplots(2, 2)
+
+    ax = axes[0, 0]
+    ax.plot(months, frame['bikes_sold'], 'b-o')
+    ax.set(title='Total Bicycle Sales Per Month', xlabel='Month', ylabel='Number of Bicycles')
+    ax.grid(True)
+
+    ax = axes[0, 1]
+    for model in _columns(frame, 'model.'):
+        sales = frame[f'model.{model}']
+        if sales.any():
+            ax.plot(months, sales, marker='o', label=model)
+    ax.set(title='Sales by Bicycle Model', xlabel='Month', ylabel='Number of Bicycles')
+    ax.grid(True)
+    if ax.get_legend_handles_labels()[0]:
+        ax.legend()
+
+    ax = axes[1, 0]
+    x = np.arange(len(months))
+    bottom = np.zeros(len(months))
+    for quality in QUALITIES:
+        column = f'quality.{quality}'
+        if column in frame and frame[column].any():
+            ax.bar(x, frame[column], bottom=bottom, label=quality.capitalize())
+            bottom += frame[column].to_numpy(dtype=float)
+    ax.set(title='Sales by Quality Level', xlabel='Month', ylabel='Number of Bicycles')
+    ax.set_xticks(x, months)
+    if ax.get_legend_handles_labels()[0]:
+        ax.legend()
+
+    ax = axes[1, 1]
+    if not frame.empty:
+        latest = frame.iloc[-1]
+        models = [model for model in _columns(frame, 'model.') if latest[f'model.{model}'] > 0]
+        if models:
+            ax.pie([latest[f'model.{model}'] for model in models], labels=models, autopct='%1.1f%%',
+                   shadow=True, startangle=90)
+            ax.set_title(f"Sales Distribution (Month {int(latest['month'])})")
+
+    fig.tight_layout()
+
+
+def draw_market(fig, frame, market_preferences=None):
+    """
+    Market comparison: revenue per market, revenue share, revenue over time and the average
+    revenue per bicycle. Units per market are not recorded, so they are estimated by
+    splitting the model sales according to `market_preferences` ({market: {model: share}}).
+    """
+    months = frame['month']
+    markets = _columns(frame, 'market.')
+    labels = [MARKET_LABELS.get(market, market) for market in markets]
+    axes = fig.subplots(2, 2)
+
+    ax = axes[0, 0]
+    if markets:
+        x = np.arange(len(months))
+        width = 0.8 / len(markets)
+        for i, (market, label) in enumerate(zip(markets, labels)):
+            offset = (i - (len(markets) - 1) / 2) * width
+            ax.bar(x + offset, frame[f'market.{market}'], width, label=label)
+        ax.set(title='Revenue Comparison Between Markets', xlabel='Month', ylabel='Revenue (€)')
+        ax.set_xticks(x, months)
+        ax.legend()
+
+    ax = axes[0, 1]
+    totals = [frame[f'market.{market}'].sum() for market in markets]
+    if any(total > 0 for total in totals):
+        ax.pie(totals, labels=labels, autopct='%1.1f%%', shadow=True, startangle=90)
+        ax.set_title('Total Market Share by Revenue')
+
+    ax = axes[1, 0]
+    for market, label, style in zip(markets, labels, ['b-o', 'r-o', 'g-o', 'm-o', 'c-o']):
+        ax.plot(months, frame[f'market.{market}'], style, label=label)
+    if markets:
+        ax.set(title='Market Revenue Over Time', xlabel='Month', ylabel='Revenue (€)')
+        ax.grid(True)
+        ax.legend()
+
+    ax = axes[1, 1]
+    models = _columns(frame, 'model.')
+    if markets and models and market_preferences:
+        # Preference matrix (markets x models), normalised per model to estimate the split
+        preferences = np.array([[market_preferences.get(market, {}).get(model, 0) for model in models]
+                                for market in markets], dtype=float)
+        totals = preferences.sum(axis=0)
+        split = np.divide(preferences, totals, out=np.zeros_like(preferences), where=totals > 0)
+        units = frame[[f'model.{model}' for model in models]].to_numpy(dtype=float) @ split.T
+
+        for m, (market, label, style) in enumerate(zip(markets, labels, ['b-o', 'r-o', 'g-o', 'm-o', 'c-o'])):
+            revenue = frame[f'market.{market}'].to_numpy(dtype=float)
+            average = np.divide(revenue, units[:, m], out=np.zeros_like(revenue), where=units[:, m] > 0)
+            ax.plot(months, average, style, label=label)
+        ax.set(title='Average Revenue per Bicycle by Market', xlabel='Month', ylabel='Average Revenue (€)')
+        ax.grid(True)
+        ax.legend()
+
+    fig.tight_layout()
+
+
+def draw_dashboard(fig, name, frame, market_preferences=None):
+    if name == 'financial':
+        draw_financial(fig, frame)
+    elif name == 'sales':
+        draw_sales(fig, frame)
+    elif name == 'market':
+        draw_market(fig, frame, market_preferences)
+    else:
+        raise ValueError(f"Unknown dashboard: {name} (expected one of {', '.join(DASHBOARDS)})")
+
+
+def render_dashboards(monthly_reports, market_preferences=None, output_dir='.', formats=('png',),
+                      dashboards=DASHBOARDS, prefix='bicycle_sim', dpi=100, frame=None):
+    """
+    Draws the requested dashboards off-screen and saves each in every format.
+    Returns {dashboard: [paths]}. The figures are plain Figure objects that are never
+    registered with pyplot and are cleared after saving.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    def target(name, fmt):
+        return os.path.join(output_dir, f'{prefix}_{name}_graphs.{fmt}')
+
+    rendered = _render(monthly_reports, market_preferences, formats, dashboards, dpi, frame, target)
+    return {name: list(by_format.values()) for name, by_format in rendered.items()}
+
+
+def render_dashboard_bytes(monthly_reports, market_preferences=None, formats=('png',), dashboards=DASHBOARDS,
+                           dpi=100, frame=None):
+    """Like render_dashboards, but returns the encoded images as {dashboard: {format: bytes}}"""
+    return _render(monthly_reports, market_preferences, formats, dashboards, dpi, frame, lambda name, fmt: None)
+
+
+def _render(monthly_reports, market_preferences, formats, dashboards, dpi, frame, target):
+    """Draws each dashboard once and saves it per format to target(name, fmt) or, if None, to bytes"""
+    frame = frame if frame is not None else reports_frame(monthly_reports)
+
+    rendered = {}
+    for name in dashboards:
+        fig = Figure(figsize=FIGURE_SIZE)
+        try:
+            draw_dashboard(fig, name, frame, market_preferences)
+            rendered[name] = {}
+            for fmt in formats:
+                path = target(name, fmt)
+                if path is None:
+                    buffer = io.BytesIO()
+                    fig.savefig(buffer, format=fmt, dpi=dpi)
+                    rendered[name][fmt] = buffer.getvalue()
+                else:
+                    fig.savefig(path, format=fmt, dpi=dpi)
+                    rendered[name][fmt] = path
+        finally:
+            fig.clear()
+    return rendered
+
+
+def show_dashboard(name, monthly_reports, market_preferences=None, frame=None):
+    """Shows one dashboard in a window of the interactive backend and closes it afterwards"""
+    import matplotlib.pyplot as plt
+
+    frame = frame if frame is not None else reports_frame(monthly_reports)
+    fig = plt.figure(figsize=FIGURE_SIZE)
+    try:
+        draw_dashboard(fig, name, frame, market_preferences)
+        plt.show()
+    finally:
+        plt.close(fig)
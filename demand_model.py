@@ -0,0 +1,141 @@
+"""
+Preisabhängige Nachfrage.
+
+Ein DemandModel beschreibt, wie die Nachfrage in jedem Markt auf den Verkaufspreis reagiert.
+Preise, Nachfrage und Bestände sind Arrays der Form (Märkte, Fahrradtypen, Qualitäten);
+beliebige führende Achsen werden mitgeführt. Ein Optimierer kann so tausende Preisvektoren
+der Form (Kandidaten, Märkte, Fahrradtypen, Qualitäten) in einem Aufruf bewerten:
+
+    model = catalog_demand_model(load_catalog())
+    revenue = model.total_revenue(candidate_prices, stock)   # ein Wert je Kandidat
+
+Eigene Modelle leiten von DemandModel ab und überschreiben price_factor().
+"""
+
+import functools
+
+import numpy as np
+
+QUALITIES = ('budget', 'standard', 'premium')
+
+# Günstige Räder werden preisbewusster gekauft als Premium-Räder
+QUALITY_ELASTICITY = {'budget': 1.3, 'standard': 1.0, 'premium': 0.7}
+
+
+class DemandModel:
+    """
+    Grundmodell: Nachfrage = Basisnachfrage * price_factor(Preise).
+    reference_prices und base_demand werden auf die Form (Märkte, Fahrradtypen, Qualitäten)
+    gebracht; beim Referenzpreis ist der Faktor 1.
+    """
+
+    def __init__(self, markets, bike_types, qualities, reference_prices, base_demand=None):
+        self.markets = tuple(markets)
+        self.bike_types = tuple(bike_types)
+        self.qualities = tuple(qualities)
+        self.shape = (len(self.markets), len(self.bike_types), len(self.qualities))
+
+        self.market_index = {market: i for i, market in enumerate(self.markets)}
+        self.bike_index = {bike_type: i for i, bike_type in enumerate(self.bike_types)}
+        self.quality_index = {quality: i for i, quality in enumerate(self.qualities)}
+
+        self.reference_prices = np.broadcast_to(np.asarray(reference_prices, dtype=float), self.shape).copy()
+        self.base_demand = (np.ones(self.shape) if base_demand is None
+                            else np.broadcast_to(np.asarray(base_demand, dtype=float), self.shape).copy())
+
+    def price_factor(self, prices):
+        """Multiplikator der Nachfrage für die gegebenen Preise (1 beim Referenzpreis)"""
+        raise NotImplementedError
+
+    def demand(self, prices, base=None):
+        """Erwartete Nachfrage; base ersetzt die Basisnachfrage (z. B. bestandsabhängig)"""
+        base = self.base_demand if base is None else base
+        return base * self.price_factor(prices)
+
+    def expected_sales(self, prices, stock, base=None):
+        """Erwarteter Absatz: Minimum aus Nachfrage und Bestand"""
+        return np.minimum(self.demand(prices, base), stock)
+
+    def revenue(self, prices, stock, base=None):
+        """Erwarteter Umsatz je Markt, Fahrradtyp und Qualität"""
+        prices = np.asarray(prices, dtype=float)
+        return prices * self.expected_sales(prices, stock, base)
+
+    def total_revenue(self, prices, stock, base=None):
+        """Erwarteter Gesamtumsatz; summiert nur über die drei Modellachsen"""
+        return self.revenue(prices, stock, base).sum(axis=(-3, -2, -1))
+
+    def margin(self, prices, stock, unit_costs, base=None):
+        """Erwarteter Deckungsbeitrag (Preis - Stückkosten) * Absatz"""
+        prices = np.asarray(prices, dtype=float)
+        return ((prices - unit_costs) * self.expected_sales(prices, stock, base)).sum(axis=(-3, -2, -1))
+
+    def price_array(self, prices):
+        """
+        Wandelt {Markt: {Fahrradtyp: Preis}} oder {Markt: {Fahrradtyp: {Qualität: Preis}}} in ein
+        Array um. Fehlende Einträge erhalten den Referenzpreis.
+        """
+        array = self.reference_prices.copy()
+        for market, by_type in prices.items():
+            m = self.market_index[market]
+            for bike_type, price in by_type.items():
+                b = self.bike_index[bike_type]
+                if isinstance(price, dict):
+                    for quality, quality_price in price.items():
+                        array[m, b, self.quality_index[quality]] = quality_price
+                else:
+                    array[m, b, :] = price
+        return array
+
+    def market_factors(self, market, prices):
+        """
+        Nachfragefaktoren eines Marktes als {Fahrradtyp: {Qualität: Faktor}}
+        für Preise im Format {Fahrradtyp: Preis} bzw. {Fahrradtyp: {Qualität: Preis}}
+        """
+        m = self.market_index[market]
+        factors = self.price_factor(self.price_array({market: prices}))[m].tolist()
+        return {bike_type: dict(zip(self.qualities, factors[b])) for bike_type, b in self.bike_index.items()}
+
+
+class ElasticDemandModel(DemandModel):
+    """
+    Nachfrage mit konstanter Semi-Elastizität: Faktor = exp(-e * (p / p_ref - 1)).
+    e ist die Preiselastizität der Nachfrage am Referenzpreis (1 % teurer -> etwa e % weniger
+    Nachfrage); der Umsatz ohne Bestandsgrenze ist bei p_ref / e maximal.
+    """
+
+    def __init__(self, markets, bike_types, qualities, reference_prices, elasticity, base_demand=None):
+        super().__init__(markets, bike_types, qualities, reference_prices, base_demand)
+        self.elasticity = np.broadcast_to(np.asarray(elasticity, dtype=float), self.shape).copy()
+
+    def price_factor(self, prices):
+        relative_price = np.asarray(prices, dtype=float) / self.reference_prices
+        return np.exp(-self.elasticity * (relative_price - 1))
+
+
+# Begrenzt: Kataloge werden beim Entpickeln und je Sweep-Punkt neu gebaut und wären sonst dauerhaft gehalten
+@functools.lru_cache(maxsize=8)
+def catalog_demand_model(catalog):
+    """
+    Nachfragemodell eines Katalogs (einmal pro Katalog) über alle Qualitätsstufen:
+    Referenzpreise aus bicycle_prices mal Preisfaktor der Qualität, Basisnachfrage
+    Präferenz * 100 mal Qualitätsanteil des Marktes und Elastizitäten aus
+    price_elasticities, je Qualität mit QUALITY_ELASTICITY gewichtet.
+    """
+    markets = catalog.markets
+    bike_types = sorted(catalog.bike_types)
+    qualities = catalog.qualities
+
+    price_factors = np.array([catalog.quality_levels[quality]['price_factor'] for quality in qualities])
+    quality_weights = np.array([QUALITY_ELASTICITY.get(quality, 1.0) for quality in qualities])
+    quality_shares = np.array([[catalog.quality_preferences.get(market, {}).get(quality, 1 / len(qualities))
+                                for quality in qualities] for market in markets])
+
+    reference_prices = np.array([catalog.bicycle_prices[bike_type] for bike_type in bike_types],
+                                dtype=float)[None, :, None] * price_factors
+    base_demand = np.array([[catalog.market_preferences[market].get(bike_type, 0.05) * 100
+                             for bike_type in bike_types] for market in markets])[:, :, None] * quality_shares[:, None, :]
+    elasticity = np.array([[catalog.price_elasticities.get(market, {}).get(bike_type, 1.0)
+                            for bike_type in bike_types] for market in markets])[:, :, None] * quality_weights
+
+    return ElasticDemandModel(markets, bike_types, qualities, reference_prices, elasticity, base_demand)
@@ -0,0 +1,112 @@
+"""
+Ereigniswarteschlange für die zeitdiskrete Simulation.
+
+Ereignisse (Lieferungen, Zahlungen, ...) werden mit ihrem Fälligkeitstag in einem binären
+Heap abgelegt. Einplanen und Entnehmen kosten O(log n), die Abfrage des nächsten Termins
+O(1); auch zehntausende offene Bestellungen verlangsamen einen Monatsabschluss daher kaum.
+
+Die Zeit wird in Tagen seit Spielbeginn gezählt, ein Monat hat 30 Tage:
+Monat m umfasst die Tage (m - 1) * 30 bis m * 30.
+"""
+
+import heapq
+import itertools
+
+DAYS_PER_MONTH = 30
+
+
+def month_start(month):
+    """Erster Tag eines Monats"""
+    return (month - 1) * DAYS_PER_MONTH
+
+
+def month_end(month):
+    """Letzter Tag eines Monats (zugleich der Monatsabschluss)"""
+    return month * DAYS_PER_MONTH
+
+
+def month_of_day(day):
+    """Monat, zu dem ein Tag gehört (der Abschlusstag zählt zum ablaufenden Monat)"""
+    return max(1, -(-int(day) // DAYS_PER_MONTH))
+
+
+class Event:
+    """Ein eingeplantes Ereignis: Fälligkeitstag, Art und Nutzdaten"""
+    __slots__ = ('day', 'kind', 'payload')
+
+    def __init__(self, day, kind, payload):
+        self.day = day
+        self.kind = kind
+        self.payload = payload
+
+    def __repr__(self):
+        return f"Event(day={self.day}, kind={self.kind!r}, payload={self.payload!r})"
+
+
+class EventScheduler:
+    """
+    Binärer Heap von Ereignissen, sortiert nach Tag und bei gleichem Tag nach Einplanung.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()
+        self._pending_by_kind = {}
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __bool__(self):
+        return bool(self._heap)
+
+    def __getstate__(self):
+        # itertools.count lässt sich nicht kopieren; der Zähler wird beim Laden fortgesetzt
+        state = self.__dict__.copy()
+        state['_counter'] = max((entry[1] for entry in self._heap), default=-1) + 1
+        return state
+
+    def __setstate__(self, state):
+        state['_counter'] = itertools.count(state['_counter'])
+        self.__dict__.update(state)
+
+    def copy(self):
+        """Unabhängige Kopie (O(n)); die Ereignisse selbst ändern sich nach dem Einplanen nicht und werden geteilt"""
+        clone = EventScheduler.__new__(EventScheduler)
+        start = next(self._counter)
+        self._counter = itertools.count(start)
+        clone._heap = list(self._heap)
+        clone._counter = itertools.count(start)
+        clone._pending_by_kind = dict(self._pending_by_kind)
+        return clone
+
+    def schedule(self, day, kind, payload=None):
+        """Plant ein Ereignis für `day` ein (O(log n)) und gibt es zurück"""
+        event = Event(day, kind, payload)
+        heapq.heappush(self._heap, (day, next(self._counter), event))
+        self._pending_by_kind[kind] = self._pending_by_kind.get(kind, 0) + 1
+        return event
+
+    def next_day(self):
+        """Tag des nächsten Ereignisses oder None (O(1))"""
+        return self._heap[0][0] if self._heap else None
+
+    def pop(self):
+        """Entnimmt das früheste Ereignis (O(log n))"""
+        event = heapq.heappop(self._heap)[2]
+        self._pending_by_kind[event.kind] -= 1
+        return event
+
+    def pop_due(self, until_day):
+        """Entnimmt nacheinander alle Ereignisse bis einschließlich `until_day`"""
+        heap = self._heap
+        while heap and heap[0][0] <= until_day:
+            yield self.pop()
+
+    def pending(self, kind=None):
+        """Alle offenen Ereignisse (optional nur einer Art), nach Fälligkeit sortiert"""
+        events = [entry[2] for entry in sorted(self._heap)]
+        return events if kind is None else [event for event in events if event.kind == kind]
+
+    def count(self, kind):
+        """Anzahl offener Ereignisse einer Art (O(1))"""
+        return self._pending_by_kind.get(kind, 0)
@@ -0,0 +1,194 @@
+"""
+Kredite mit Annuitätentilgung.
+
+Beim Abschluss eines Kredits wird der komplette Tilgungsplan als Arrays berechnet
+(Rate, Zinsanteil, Tilgungsanteil, Restschuld je Monat) und in ein Kassenbuch nach
+Monaten eingetragen. Die Verbuchung am Monatsende ist danach ein einzelner Arrayzugriff,
+unabhängig von der Anzahl laufender Kredite.
+
+Für Monte-Carlo-Läufe berechnet portfolio_cashflows() die Zahlungsströme vieler
+Kreditportfolios gleichzeitig als Arrays der Form (Portfolios, Monate); risk_analysis.financing_risk
+verrechnet sie mit den Guthabenverläufen aller Läufe.
+"""
+
+import numpy as np
+
+
+def annuity_payment(principal, annual_interest, duration_months):
+    """Monatliche Rate eines Annuitätendarlehens (funktioniert auch elementweise auf Arrays)"""
+    principal = np.asarray(principal, dtype=float)
+    rate = np.asarray(annual_interest, dtype=float) / 12
+    n = np.asarray(duration_months, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        payment = principal * rate / (1 - (1 + rate) ** -n)
+    return np.where(rate == 0, principal / np.maximum(n, 1), payment)
+
+
+def amortization_schedule(principal, annual_interest, duration_months):
+    """
+    Tilgungsplan als Dictionary von Arrays der Länge duration_months:
+    'payment' (Rate), 'interest' (Zinsanteil), 'principal' (Tilgung), 'balance' (Restschuld danach)
+    """
+    rate = annual_interest / 12
+    k = np.arange(1, duration_months + 1)
+    payment = float(annuity_payment(principal, annual_interest, duration_months))
+
+    # Restschuld nach k Raten in geschlossener Form
+    if rate == 0:
+        balance = principal - payment * k
+    else:
+        growth = (1 + rate) ** k
+        balance = principal * growth - payment * (growth - 1) / rate
+    balance = np.maximum(balance, 0.0)
+    balance[-1] = 0.0
+
+    previous_balance = np.concatenate(([principal], balance[:-1]))
+    interest = previous_balance * rate
+    principal_part = previous_balance - balance
+    return {
+        'payment': interest + principal_part,
+        'interest': interest,
+        'principal': principal_part,
+        'balance': balance,
+    }
+
+
+class Loan:
+    """Ein laufender Kredit mit vorab berechnetem Tilgungsplan"""
+
+    def __init__(self, option, amount, start_month, schedule):
+        self.option = option
+        self.amount = amount
+        self.start_month = start_month
+        self.schedule = schedule
+
+    @property
+    def first_payment_month(self):
+        return self.start_month + 1
+
+    @property
+    def last_payment_month(self):
+        return self.start_month + len(self.schedule['payment'])
+
+    def remaining_balance(self, month):
+        """Restschuld nach den Raten bis einschließlich `month`"""
+        paid = month - self.start_month
+        if paid <= 0:
+            return self.amount
+        if paid >= len(self.schedule['balance']):
+            return 0.0
+        return float(self.schedule['balance'][paid - 1])
+
+    def to_dict(self, month):
+        return {
+            'option': self.option,
+            'amount': self.amount,
+            'start_month': self.start_month,
+            'monthly_payment': float(self.schedule['payment'][0]),
+            'remaining': self.remaining_balance(month),
+            'last_payment_month': self.last_payment_month,
+        }
+
+
+class LoanBook:
+    """
+    Alle Kredite eines Unternehmens. Raten, Zinsen und Tilgungen aller Kredite werden je
+    Monat summiert vorgehalten; due(month) ist daher O(1).
+    """
+
+    def __init__(self):
+        self.loans = []
+        self._payment = np.zeros(0)
+        self._interest = np.zeros(0)
+        self._principal = np.zeros(0)
+
+    def _ensure_capacity(self, months):
+        if months > len(self._payment):
+            size = max(months, 2 * len(self._payment))
+            for name in ('_payment', '_interest', '_principal'):
+                column = np.zeros(size)
+                old = getattr(self, name)
+                column[:len(old)] = old
+                setattr(self, name, column)
+
+    def add(self, option, amount, annual_interest, duration_months, start_month):
+        """Legt einen Kredit an; die Raten sind jeweils am Ende der Folgemonate fällig"""
+        schedule = amortization_schedule(amount, annual_interest, duration_months)
+        loan = Loan(option, amount, start_month, schedule)
+        self.loans.append(loan)
+
+        first, last = loan.first_payment_month, loan.last_payment_month
+        self._ensure_capacity(last + 1)
+        self._payment[first:last + 1] += schedule['payment']
+        self._interest[first:last + 1] += schedule['interest']
+        self._principal[first:last + 1] += schedule['principal']
+        return loan
+
+    def copy(self):
+        """Unabhängige Kopie; die Kredite selbst sind unveränderlich und werden geteilt"""
+        clone = LoanBook.__new__(LoanBook)
+        clone.loans = list(self.loans)
+        clone._payment, clone._interest, clone._principal = self._payment.copy(), self._interest.copy(), self._principal.copy()
+        return clone
+
+    def due(self, month):
+        """(Rate, Zinsanteil, Tilgung) aller Kredite im Monat `month`"""
+        if month >= len(self._payment):
+            return 0.0, 0.0, 0.0
+        return float(self._payment[month]), float(self._interest[month]), float(self._principal[month])
+
+    def outstanding(self, month):
+        """Summe der Restschulden nach den Raten bis einschließlich `month`"""
+        return sum(loan.remaining_balance(month) for loan in self.loans)
+
+    def active(self, month):
+        """Kredite, die nach `month` noch Raten offen haben"""
+        return [loan for loan in self.loans if loan.last_payment_month > month]
+
+
+def portfolio_cashflows(principal, annual_interest, duration_months, start_month, horizon):
+    """
+    Zahlungsströme vieler Kreditportfolios auf einmal.
+    Alle Eingaben haben die Form (Portfolios, Kredite) oder lassen sich dorthin broadcasten;
+    ein Kredit mit Betrag 0 ist ein leerer Platz. Die Raten eines in Monat s aufgenommenen
+    Kredits fallen in den Monaten s + 1 bis s + Laufzeit an (Monate 1 bis horizon).
+    Gibt Arrays der Form (Portfolios, horizon) für 'payment', 'interest', 'principal' und
+    'balance' (Restschuld am Monatsende) zurück.
+    """
+    principal, annual_interest, duration_months, start_month = np.broadcast_arrays(
+        np.atleast_2d(np.asarray(principal, dtype=float)),
+        np.atleast_2d(np.asarray(annual_interest, dtype=float)),
+        np.atleast_2d(np.asarray(duration_months, dtype=float)),
+        np.atleast_2d(np.asarray(start_month, dtype=float)))
+
+    rate = annual_interest[..., None] / 12
+    n = duration_months[..., None]
+    P = principal[..., None]
+    payment = annuity_payment(principal, annual_interest, duration_months)[..., None]
+
+    # Anzahl gezahlter Raten am Ende jedes Monats, Form (Portfolios, Kredite, Monate)
+    months = np.arange(1, horizon + 1)
+    paid = np.clip(months - start_month[..., None], 0, n)
+
+    def balance_after(k):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            growth = (1 + rate) ** k
+            annuity_balance = P * growth - payment * (growth - 1) / np.where(rate == 0, 1, rate)
+        linear_balance = P - payment * k
+        return np.where(k >= n, 0.0, np.maximum(np.where(rate == 0, linear_balance, annuity_balance), 0.0))
+
+    balance = balance_after(paid)
+    previous = balance_after(np.maximum(paid - 1, 0))
+    due = (months > start_month[..., None]) & (months <= start_month[..., None] + n)
+    # Noch nicht ausgezahlte Kredite zählen nicht zur Restschuld; im Monat der Aufnahme zählt
+    # der volle Betrag (wie LoanBook.outstanding)
+    balance = np.where(months >= start_month[..., None], balance, 0.0)
+
+    interest = np.where(due, previous * rate, 0.0)
+    principal_part = np.where(due, previous - balance, 0.0)
+    return {
+        'payment': (interest + principal_part).sum(axis=1),
+        'interest': interest.sum(axis=1),
+        'principal': principal_part.sum(axis=1),
+        'balance': balance.sum(axis=1),
+    }
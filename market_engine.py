@@ -0,0 +1,229 @@
+"""
+Gemeinsamer Absatzmarkt für mehrere konkurrierende Unternehmen.
+
+Alle Marktbestände der Unternehmen werden als ein Array der Form
+(Unternehmen, Märkte, Fahrradtypen, Qualitäten) verarbeitet. Die Nachfrage eines Marktes wird
+einmal pro Monat je Fahrradtyp gezogen und nach Preis und Qualitätswunsch auf die Angebote
+aller Unternehmen und Qualitätsstufen aufgeteilt; alle Schritte sind Array-Operationen statt
+einer Schleife über die Unternehmen.
+"""
+
+import numpy as np
+
+from simulation_catalog import load_catalog
+
+
+class ClearingResult:
+    """Ergebnis einer Marktbereinigung, alle Arrays in der Form (Unternehmen, Märkte, Fahrradtypen, Qualitäten)"""
+
+    def __init__(self, sold, revenue, demand, market_demand):
+        self.sold = sold
+        self.revenue = revenue
+        self.demand = demand
+        self.market_demand = market_demand
+
+    @property
+    def total_revenue(self):
+        """Umsatz pro Unternehmen"""
+        return self.revenue.sum(axis=(1, 2, 3))
+
+
+class MarketClearingEngine:
+    """
+    Teilt die Marktnachfrage auf alle Unternehmen auf.
+
+    Die Gesamtnachfrage je Markt und Fahrradtyp entspricht der Summe der Einzelnachfragen,
+    die simulate_sales für jedes Unternehmen ziehen würde (Mittelwert Präferenz * 100,
+    Standardabweichung 20 pro Unternehmen). Mit nur einem Unternehmen verhält sich der Markt
+    daher wie bisher. Jedes Unternehmen bietet je Qualitätsstufe zu seinem eigenen Preis an;
+    die Anteile richten sich nach dem Qualitätswunsch des Marktes und dem Preis relativ zum
+    Referenzpreis der Qualität (Katalogpreis mal Preisfaktor). Nicht bediente Nachfrage
+    ausverkaufter Angebote wird in weiteren Runden auf die übrigen Anbieter verteilt.
+    """
+
+    def __init__(self, catalog=None, price_weight=2.0, demand_per_firm=100, demand_std=20,
+                 reallocation_rounds=3, seed=None):
+        self.catalog = catalog if catalog is not None else load_catalog()
+        self.price_weight = price_weight
+        self.demand_per_firm = demand_per_firm
+        self.demand_std = demand_std
+        self.reallocation_rounds = reallocation_rounds
+        self.rng = np.random.default_rng(seed)
+
+        self.markets = list(self.catalog.markets)
+        self.bike_types = sorted(self.catalog.bike_types)
+        self.qualities = list(self.catalog.qualities)
+
+        # Präferenzen (Märkte, Fahrradtypen), Qualitätswünsche (Märkte, Qualitäten) und
+        # Referenzpreise (Fahrradtypen, Qualitäten)
+        self.preferences = np.array([
+            [self.catalog.market_preferences[market].get(bike_type, 0.05) for bike_type in self.bike_types]
+            for market in self.markets
+        ])
+        self.quality_preferences = np.array([
+            [self.catalog.quality_preferences.get(market, {}).get(quality, 1 / len(self.qualities))
+             for quality in self.qualities]
+            for market in self.markets
+        ])
+        price_factors = np.array([self.catalog.quality_levels[quality]['price_factor'] for quality in self.qualities])
+        self.reference_prices = np.array([self.catalog.bicycle_prices[bike_type] for bike_type in self.bike_types],
+                                         dtype=float)[:, None] * price_factors
+
+    def draw_market_demand(self, n_firms):
+        """Zieht die Gesamtnachfrage je Markt und Fahrradtyp für n_firms Unternehmen"""
+        mean = self.preferences * self.demand_per_firm * n_firms
+        std = self.demand_std * np.sqrt(n_firms)
+        return np.maximum(0, np.rint(self.rng.normal(mean, std))).astype(np.int64)
+
+    def attractiveness(self, prices, quality):
+        """Attraktivität jedes Angebots: Qualitätsgewicht geteilt durch den relativen Preis hoch price_weight"""
+        relative_price = prices / self.reference_prices
+        return quality * np.power(relative_price, -self.price_weight)
+
+    def _round_offers(self, target, total):
+        """
+        Rundet die Anteile (Unternehmen, Märkte, Fahrradtypen) auf ganze Fahrräder, sodass jede
+        Spalte genau `total` ergibt. Systematische Stichprobe: ein Zufallsversatz je Spalte über
+        die kumulierten Anteile; jedes Unternehmen erhält seinen Anteil ab- oder aufgerundet,
+        im Mittel unverzerrt.
+        """
+        cumulative = np.minimum(np.cumsum(target, axis=0), total)
+        cumulative[-1] = total
+        offset = self.rng.random(total.shape)
+        edges = np.floor(cumulative + offset)
+        return np.diff(edges, axis=0, prepend=np.floor(offset)[None]).astype(np.int64)
+
+    def clear(self, inventory, prices=None, quality=None, market_demand=None):
+        """
+        Bereinigt alle Märkte in einem Durchgang.
+        inventory: Array (Unternehmen, Märkte, Fahrradtypen, Qualitäten) mit den Marktbeständen
+        prices: Verkaufspreise in derselben Form (Standard: Referenzpreise je Qualität)
+        quality: Qualitätsgewichte in derselben Form (Standard: Qualitätswunsch des Marktes)
+        market_demand: optionale Gesamtnachfrage (Märkte, Fahrradtypen), sonst gezogen
+        """
+        inventory = np.asarray(inventory, dtype=np.int64)
+        n_firms, n_markets, n_bike_types, n_qualities = inventory.shape
+
+        if prices is None:
+            prices = np.broadcast_to(self.reference_prices, inventory.shape)
+        prices = np.asarray(prices, dtype=float)
+        if quality is None:
+            quality = np.broadcast_to(self.quality_preferences[:, None, :], inventory.shape)
+        quality = np.asarray(quality, dtype=float)
+
+        if market_demand is None:
+            market_demand = self.draw_market_demand(n_firms)
+
+        # Jede Kombination aus Unternehmen und Qualität ist ein eigenes Angebot:
+        # (Unternehmen, Märkte, Fahrradtypen, Qualitäten) -> (Angebote, Märkte, Fahrradtypen)
+        def offers(array):
+            return np.moveaxis(array, 3, 1).reshape(n_firms * n_qualities, n_markets, n_bike_types)
+
+        weights = offers(self.attractiveness(prices, quality))
+        remaining_stock = offers(inventory).copy()
+        remaining_demand = market_demand.astype(float)
+        allocated = np.zeros(remaining_stock.shape)
+        sold = np.zeros(remaining_stock.shape, dtype=np.int64)
+
+        for _ in range(1 + self.reallocation_rounds):
+            # Nur Unternehmen mit Restbestand nehmen an der Verteilung teil
+            active_weights = np.where(remaining_stock > 0, weights, 0.0)
+            weight_sum = active_weights.sum(axis=0)
+            share = np.divide(active_weights, weight_sum, out=np.zeros_like(active_weights),
+                              where=weight_sum > 0)
+
+            offer = self._round_offers(share * remaining_demand, np.where(weight_sum > 0, remaining_demand, 0.0))
+            round_sold = np.minimum(offer, remaining_stock)
+
+            allocated += offer
+            sold += round_sold
+            remaining_stock -= round_sold
+            remaining_demand = np.maximum(0.0, remaining_demand - round_sold.sum(axis=0))
+
+            if not (remaining_demand > 0).any() or not (remaining_stock > 0).any():
+                break
+
+        # Kein Markt verkauft mehr Fahrräder, als nachgefragt werden
+        if (sold.sum(axis=0) > market_demand).any():
+            raise RuntimeError("Marktbereinigung hat mehr Fahrräder verkauft als nachgefragt")
+
+        # Zurück in die Form (Unternehmen, Märkte, Fahrradtypen, Qualitäten)
+        def by_firm(array):
+            return np.moveaxis(array.reshape(n_firms, n_qualities, n_markets, n_bike_types), 1, 3)
+
+        sold = by_firm(sold)
+        revenue = sold * prices
+        return ClearingResult(sold, revenue, by_firm(allocated).astype(np.int64), market_demand)
+
+    def collect_inventory(self, simulations):
+        """Sammelt die Marktbestände je Qualität mehrerer Simulationen in einem Array"""
+        inventory = np.zeros((len(simulations), len(self.markets), len(self.bike_types), len(self.qualities)),
+                             dtype=np.int64)
+        for i, sim in enumerate(simulations):
+            rows = [sim.location_index[market] for market in self.markets]
+            columns = [sim.bike_index[bike_type] for bike_type in self.bike_types]
+            levels = [sim.quality_index[quality] for quality in self.qualities]
+            inventory[i] = sim.bike_stock[np.ix_(rows, columns, levels)]
+        return inventory
+
+    def collect_prices(self, simulations):
+        """Sammelt die Verkaufspreise (sim.prices) mehrerer Simulationen in einem Array wie collect_inventory"""
+        return np.array([
+            [[[sim.prices[market][bike_type][quality] for quality in self.qualities]
+              for bike_type in self.bike_types]
+             for market in self.markets]
+            for sim in simulations
+        ], dtype=float)
+
+    def clear_month(self, simulations, prices=None, quality=None):
+        """
+        Führt den Monatsverkauf für alle Simulationen gemeinsam durch und bucht die
+        Ergebnisse wie simulate_sales (Guthaben, Einnahmen, Verkaufshistorie).
+        Ohne `prices` gelten die Verkaufspreise der Simulationen (sim.prices).
+        Gibt das ClearingResult zurück.
+        """
+        inventory = self.collect_inventory(simulations)
+        if prices is None:
+            prices = self.collect_prices(simulations)
+        result = self.clear(inventory, prices=prices, quality=quality)
+
+        sold = result.sold.tolist()
+        unit_prices = np.broadcast_to(np.asarray(prices, dtype=float), inventory.shape).tolist()
+        demand = result.demand.sum(axis=3).tolist()
+        stock = inventory.sum(axis=3).tolist()
+
+        for i, sim in enumerate(simulations):
+            # Über die Engine-Zugriffe, damit Forks (sim.fork) ihre Historie nicht teilen
+            month = sim.current_month
+            sales_data = sim._sales_entry(month)
+            totals = sim._own('sales_totals')
+            total_revenue = 0
+            for m, market in enumerate(self.markets):
+                market_sales = sales_data['by_market'].setdefault(market, {})
+                for b, bike_type in enumerate(self.bike_types):
+                    if stock[i][m][b] <= 0:
+                        continue
+                    entry = market_sales.setdefault(bike_type, {'quantity': 0, 'revenue': 0, 'demand': 0,
+                                                                'by_quality': dict.fromkeys(sim.qualities, 0)})
+                    # Umsatz aus den tatsächlich entnommenen Fahrrädern je Qualität und ihrem Preis
+                    quantity_sold = 0
+                    revenue = 0
+                    for q, quality in enumerate(self.qualities):
+                        if sold[i][m][b][q] <= 0:
+                            continue
+                        taken = int(sim.remove_bikes(market, bike_type, sold[i][m][b][q], quality)[sim.quality_index[quality]])
+                        entry['by_quality'][quality] += taken
+                        quantity_sold += taken
+                        revenue += taken * unit_prices[i][m][b][q]
+                    entry['quantity'] += quantity_sold
+                    entry['revenue'] += revenue
+                    entry['demand'] += demand[i][m][b]
+                    totals.add(month, market, bike_type, quantity_sold, revenue)
+                    total_revenue += revenue
+
+            sales_data['total_revenue'] += total_revenue
+            sim.balance += total_revenue
+            if total_revenue > 0:
+                sim._own('revenues').append({'month': month, 'type': 'sales', 'amount': total_revenue})
+
+        return result
@@ -0,0 +1,262 @@
+"""
+Kennzahlen im Prometheus-Textformat, ohne externe Abhängigkeiten.
+
+Engine und Streamlit-App melden ihre Kennzahlen an die prozessweite REGISTRY. Diese kann als
+Text gerendert, über einen lokalen HTTP-Endpunkt ausgeliefert oder in eine Datei geschrieben
+werden (z. B. für den Textfile-Collector des node_exporter):
+
+    from metrics import REGISTRY, start_http_server
+    start_http_server(9464)          # http://127.0.0.1:9464/metrics
+    REGISTRY.write_textfile('bikesim.prom')
+    print(REGISTRY.render())
+"""
+
+import math
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Standard-Bucketgrenzen in Sekunden
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if value == -math.inf:
+        return '-Inf'
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class _Metric:
+    """Gemeinsame Basis: Name, Hilfetext, Labelnamen und eine Sperre für mehrere Sitzungs-Threads"""
+    metric_type = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} erwartet die Labels {self.labelnames}, erhalten: {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def remove(self, **labels):
+        """Entfernt die Zeitreihe mit diesen Labelwerten (z. B. einer beendeten Sitzung)"""
+        with self._lock:
+            self._values.pop(self._key(labels), None)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def label_values(self):
+        with self._lock:
+            return list(self._values)
+
+    def collect(self):
+        """Zeilen im Textformat ohne HELP/TYPE"""
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}' for key, value in items]
+
+
+class Counter(_Metric):
+    """Monoton steigender Zähler"""
+    metric_type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError("Ein Counter kann nur erhöht werden")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(Counter):
+    """Momentanwert, der steigen und fallen kann"""
+    metric_type = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Verteilung von Messwerten in kumulativen Buckets, mit Summe und Anzahl"""
+    metric_type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['counts'][i] += 1
+                    break
+            state['sum'] += value
+            state['count'] += 1
+
+    def snapshot(self, **labels):
+        """Kopie von Bucket-Zählern (nicht kumulativ), Summe und Anzahl"""
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            if state is None:
+                return {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            return {'counts': list(state['counts']), 'sum': state['sum'], 'count': state['count']}
+
+    def collect(self):
+        with self._lock:
+            items = sorted((key, dict(state, counts=list(state['counts']))) for key, state in self._values.items())
+
+        lines = []
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state['counts']):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ('le', _format_value(float(bound))))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labelnames, key, ('le', '+Inf'))
+            lines.append(f'{self.name}_bucket{labels} {state["count"]}')
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(state["sum"])}')
+            lines.append(f'{self.name}_count{labels} {state["count"]}')
+        return lines
+
+
+class MetricsRegistry:
+    """Sammlung von Kennzahlen, die gemeinsam ausgegeben werden"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                # Erneutes Anlegen (z. B. bei Streamlit-Reruns) liefert die bestehende Kennzahl
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Kennzahl {metric.name} ist bereits mit anderem Typ registriert")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def render(self):
+        """Alle Kennzahlen im Prometheus-Textformat (Version 0.0.4)"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.metric_type}')
+            lines.extend(metric.collect())
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path):
+        """Schreibt alle Kennzahlen atomar in eine Datei (erst temporär, dann umbenannt)"""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.metrics-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(self.render())
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def start_http_server(port, host='127.0.0.1', registry=None):
+    """
+    Startet einen lokalen HTTP-Endpunkt (/metrics) in einem Hintergrund-Thread.
+    port=0 wählt einen freien Port; der Server steht über server.server_address bereit.
+    """
+    registry = registry if registry is not None else REGISTRY
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/', '/metrics'):
+                self.send_error(404)
+                return
+            body = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True)
+    thread.start()
+    return server
+
+
+# Prozessweite Registry und die Kennzahlen von Engine und App
+REGISTRY = MetricsRegistry()
+
+MONTHS_SIMULATED = REGISTRY.counter(
+    'bikesim_months_simulated_total', 'Anzahl abgeschlossener Spielmonate der Sitzungen (ohne Hintergrundläufe)')
+REPORT_SECONDS = REGISTRY.histogram(
+    'bikesim_report_generation_seconds', 'Dauer von generate_monthly_report im Spiel einer Sitzung in Sekunden')
+RERUN_SECONDS = REGISTRY.histogram(
+    'bikesim_rerun_seconds', 'Dauer eines vollständigen Streamlit-Skriptlaufs in Sekunden')
+ACTIVE_SESSIONS = REGISTRY.gauge(
+    'bikesim_active_sessions', 'Anzahl der Streamlit-Sitzungen mit Aktivität in den letzten Minuten')
+SESSION_MEMORY_BYTES = REGISTRY.gauge(
+    'bikesim_session_memory_bytes', 'Geschätzter Speicherbedarf des Spielstands (Pickle-Größe, einmal je Spielmonat gemessen)', ['session'])
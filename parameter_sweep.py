@@ -0,0 +1,367 @@
+"""
+Parameterstudien über die Spielkonstanten für das Balancing.
+
+Eine Konfigurationsdatei (JSON oder TOML) legt Engine, Strategie, Laufzeit und die zu
+variierenden Parameter fest. Jeder Parameter ist eine Liste von Werten oder ein Bereich:
+
+    engine = "streamlit"          # "streamlit", "env" oder "console"
+    strategy = "produce_to_capacity"
+    months = 24
+    runs = 20                     # Läufe (Seeds) je Parameterkombination
+    sampling = "lhs"              # "grid" (kartesisches Produkt) oder "lhs" (Latin Hypercube)
+    samples = 50                  # Anzahl der Punkte bei "lhs"
+
+    [parameters]
+    initial_balance = [60000, 70000, 80000]
+    "worker_salaries.skilled" = {min = 2800, max = 3800, steps = 5}
+
+Bereiche werden im Gitter in `steps` gleich große Schritte geteilt (oder mit `step`) und bei
+"lhs" stetig gezogen; ganzzahlige Grenzen ergeben ganzzahlige Werte. Die Parameternamen sind
+die Katalogfelder aus SimulationCatalog.to_dict(), verschachtelte Felder mit Punkt.
+
+Engines:
+- streamlit: simulation_engine.BicycleSimulation mit einer Strategie aus strategies.py,
+  "default" (ParametricPolicy.default) oder "autopilot" (beste Strategie der Autopilot-Datei).
+- env: VectorBicycleEnv (alle Läufe eines Punktes gemeinsam), Strategie "default" oder "autopilot".
+- console: das Kommandozeilenspiel BicycleSimulation.py mit apply_autopilot. Statt Katalogfeldern
+  werden dessen Modulkonstanten gesetzt; die Katalognamen aus CONSOLE_CONSTANTS werden
+  übersetzt, Konstanten können auch direkt (z. B. WAREHOUSE_DE_RENT) angegeben werden.
+  Die Mieten sind dort monatlich und je Lager, im Katalog quartalsweise.
+
+Die Punkte laufen auf Wunsch parallel in Worker-Prozessen. Ergebnisse werden im Ergebnis-Cache
+(result_cache.py) abgelegt; eine wiederholte oder überlappende Studie rechnet nur neue Punkte.
+Je Punkt entsteht eine Zeile mit den Parametern und den Kennzahlen der Läufe (Endguthaben,
+Quantile, Insolvenzquote). Die Ausgabe ist spaltenorientiert: Parquet oder Feather (beides benötigt pyarrow), alternativ CSV:
+
+    python parameter_sweep.py sweep.toml --workers 4 --output sweep.parquet
+"""
+
+import argparse
+import contextlib
+import itertools
+import json
+import multiprocessing
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from autopilot import AUTOPILOT_FILE, ParametricPolicy, load_autopilot
+from bicycle_env import VectorBicycleEnv
+from result_cache import DEFAULT_CACHE_DIR, ENGINE_MODULES, ResultCache, cache_key, engine_version, strategy_key
+from risk_analysis import run_strategy
+from simulation_catalog import SimulationCatalog, load_catalog
+from strategies import STRATEGIES
+
+ENGINES = ('streamlit', 'env', 'console')
+
+# Katalogfelder und die entsprechenden Konstanten des Kommandozeilenspiels
+CONSOLE_CONSTANTS = {
+    'initial_balance': 'INITIAL_BALANCE',
+    'worker_salaries.skilled': 'SKILLED_WORKER_MONTHLY_SALARY',
+    'worker_salaries.unskilled': 'UNSKILLED_WORKER_MONTHLY_SALARY',
+    'storage_rent.germany': 'WAREHOUSE_DE_RENT',
+    'storage_rent.france': 'WAREHOUSE_FR_RENT',
+    'shipping_costs.local': 'TRANSPORT_COST_LOCAL',
+    'shipping_costs.distant': 'TRANSPORT_COST_DISTANT',
+}
+
+QUANTILES = (0.05, 0.5, 0.95)
+
+DEFAULTS = {
+    'engine': 'streamlit',
+    'strategy': 'produce_to_capacity',
+    'months': 24,
+    'runs': 20,
+    'seed': 0,
+    'sampling': 'grid',
+    'samples': 20,
+    'autopilot': AUTOPILOT_FILE,
+}
+
+
+def load_config(path):
+    """Liest eine Konfiguration aus JSON oder TOML (Endung .toml) und ergänzt Standardwerte"""
+    if path.endswith('.toml'):
+        import tomllib
+        with open(path, 'rb') as f:
+            config = tomllib.load(f)
+    else:
+        with open(path) as f:
+            config = json.load(f)
+    config = dict(DEFAULTS, **config)
+    if config['engine'] not in ENGINES:
+        raise ValueError(f"Unbekannte Engine: {config['engine']} (erlaubt: {', '.join(ENGINES)})")
+    if config['sampling'] not in ('grid', 'lhs'):
+        raise ValueError(f"Unbekanntes Sampling: {config['sampling']} (erlaubt: grid, lhs)")
+    if not config.get('parameters'):
+        raise ValueError("Die Konfiguration enthält keine Parameter")
+    for name in config['parameters']:
+        check_parameter(config['engine'], name)
+    return config
+
+
+def check_parameter(engine, name):
+    """Prüft, ob eine Engine den Parameter kennt"""
+    if engine == 'console':
+        import BicycleSimulation as console
+        if CONSOLE_CONSTANTS.get(name, name) not in vars(console):
+            raise ValueError(f"Unbekannter Parameter für das Kommandozeilenspiel: {name}")
+        return
+    data = load_catalog().to_dict()
+    *path, field = name.split('.')
+    for key in path:
+        data = data.get(key) if isinstance(data, dict) else None
+    if not isinstance(data, dict) or field not in data:
+        raise ValueError(f"Unbekannter Katalogparameter: {name}")
+
+
+def _is_integer(spec):
+    return spec.get('integer', isinstance(spec['min'], int) and isinstance(spec['max'], int))
+
+
+def grid_values(spec):
+    """Werte eines Parameters im Gitter: Liste unverändert, Bereich mit steps oder step"""
+    if isinstance(spec, list):
+        return spec
+    low, high = spec['min'], spec['max']
+    if 'step' in spec:
+        values = np.arange(low, high + spec['step'] / 2, spec['step'])
+    else:
+        values = np.linspace(low, high, spec.get('steps', 5))
+    if _is_integer(spec):
+        return sorted(set(int(round(value)) for value in values))
+    return values.tolist()
+
+
+def grid_points(parameters):
+    """Kartesisches Produkt aller Parameterwerte als Liste von Dictionaries"""
+    names = list(parameters)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid_values(parameters[n]) for n in names))]
+
+
+def latin_hypercube(parameters, samples, seed=0):
+    """
+    Latin-Hypercube-Stichprobe: jeder Parameter wird in `samples` gleich große Schichten geteilt,
+    aus jeder Schicht genau ein Wert gezogen und die Schichten je Parameter zufällig kombiniert.
+    Listen werden als gleichwahrscheinliche Kategorien behandelt.
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, spec in parameters.items():
+        units = (rng.permutation(samples) + rng.random(samples)) / samples
+        if isinstance(spec, list):
+            columns[name] = [spec[int(unit * len(spec))] for unit in units]
+        else:
+            values = spec['min'] + units * (spec['max'] - spec['min'])
+            columns[name] = [int(round(v)) for v in values] if _is_integer(spec) else values.tolist()
+    return [{name: columns[name][i] for name in parameters} for i in range(samples)]
+
+
+def sweep_points(config):
+    if config['sampling'] == 'lhs':
+        return latin_hypercube(config['parameters'], config['samples'], config['seed'])
+    return grid_points(config['parameters'])
+
+
+def make_catalog(overrides):
+    """Standardkatalog mit geänderten Feldern (verschachtelte Felder mit Punkt, z. B. storage_rent.germany)"""
+    data = load_catalog().to_dict()
+    for name, value in overrides.items():
+        *path, field = name.split('.')
+        target = data
+        for key in path:
+            target = target[key]
+        target[field] = value
+    return SimulationCatalog(**data)
+
+
+@contextlib.contextmanager
+def console_constants(overrides):
+    """Setzt Modulkonstanten des Kommandozeilenspiels für die Dauer eines Punktes"""
+    import BicycleSimulation as console
+    constants = {CONSOLE_CONSTANTS.get(name, name): value for name, value in overrides.items()}
+    saved = {name: getattr(console, name) for name in constants}
+    try:
+        for name, value in constants.items():
+            setattr(console, name, value)
+        yield console
+    finally:
+        for name, value in saved.items():
+            setattr(console, name, value)
+
+
+def make_policy(name, catalog, autopilot_file=AUTOPILOT_FILE):
+    """Strategie nach Namen: 'default', 'autopilot' oder (nur streamlit) ein Eintrag aus STRATEGIES"""
+    if name == 'default':
+        return ParametricPolicy.default(catalog)
+    if name == 'autopilot':
+        return load_autopilot(autopilot_file, catalog=catalog)
+    if name in STRATEGIES:
+        return STRATEGIES[name]
+    raise ValueError(f"Unbekannte Strategie: {name}")
+
+
+def run_point(config, overrides):
+    """
+    Spielt config['runs'] Läufe mit den Parametern `overrides`.
+    Gibt (Endguthaben je Lauf, bankrott je Lauf, Startguthaben) zurück.
+    """
+    engine, months, runs, seed = config['engine'], config['months'], config['runs'], config['seed']
+
+    if engine == 'console':
+        with console_constants(overrides) as console:
+            policy = make_policy(config['strategy'], load_catalog(), config['autopilot'])
+            if not isinstance(policy, ParametricPolicy):
+                raise ValueError("Das Kommandozeilenspiel unterstützt nur die Strategien 'default' und 'autopilot'")
+            balances, ruined = np.zeros(runs), np.zeros(runs, dtype=bool)
+            for run in range(runs):
+                random.seed(seed + run)
+                game = console.BicycleSimulation()
+                for _ in range(months):
+                    game.apply_autopilot(policy)
+                    game.close_month(verbose=False)
+                    if game.game_over:
+                        break
+                balances[run], ruined[run] = game.balance, game.game_over
+            return balances, ruined, console.INITIAL_BALANCE
+
+    catalog = make_catalog(overrides)
+    policy = make_policy(config['strategy'], catalog, config['autopilot'])
+
+    if engine == 'env':
+        if not isinstance(policy, ParametricPolicy):
+            raise ValueError("Die Trainingsumgebung unterstützt nur die Strategien 'default' und 'autopilot'")
+        env = VectorBicycleEnv(runs, catalog, max_months=months)
+        env.reset(seed)
+        for _ in range(months):
+            env.step(policy.act(env))
+        return env.balance.copy(), ~env.alive, catalog.initial_balance
+
+    balances, ruined = np.zeros(runs), np.zeros(runs, dtype=bool)
+    for run in range(runs):
+        series, ruin_month = run_strategy(policy, months, seed + run, catalog=catalog)
+        balances[run], ruined[run] = series['balance'][-1], ruin_month is not None
+    return balances, ruined, catalog.initial_balance
+
+
+def summarize(overrides, balances, ruined, initial_balance):
+    """Eine Ergebniszeile: Parameter und Kennzahlen über alle Läufe eines Punktes"""
+    row = dict(overrides)
+    row.update({
+        'runs': len(balances),
+        'start_balance': initial_balance,
+        'balance_mean': float(balances.mean()),
+        'balance_std': float(balances.std(ddof=1)) if len(balances) > 1 else 0.0,
+        'profit_mean': float(balances.mean() - initial_balance),
+        'bankruptcy_rate': float(ruined.mean()),
+    })
+    for q, value in zip(QUANTILES, np.quantile(balances, QUANTILES)):
+        row[f'balance_p{round(q * 100):02d}'] = float(value)
+    return row
+
+
+def point_key(config, overrides):
+    """Cache-Schlüssel eines Punktes; die Autopilot-Strategie geht mit ihren Parametern ein"""
+    engine = config['engine']
+    strategy = config['strategy']
+    if strategy == 'autopilot':
+        strategy = strategy_key(load_autopilot(config['autopilot']))
+    return cache_key(kind='parameter_sweep.run_point',
+                     engine=engine_version(ENGINE_MODULES[engine] + ('parameter_sweep', 'risk_analysis')),
+                     engine_name=engine, overrides=overrides, strategy=strategy,
+                     seed=config['seed'], runs=config['runs'], months=config['months'])
+
+
+def _run_points(config, points):
+    return [run_point(config, point) for point in points]
+
+
+def run_sweep(config, workers=None, chunk_size=4, progress=None, cache=None):
+    """
+    Führt die Parameterstudie aus und gibt ein DataFrame mit einer Zeile je Punkt zurück.
+    Alle Punkte spielen dieselben Seeds. progress(fertig, gesamt) wird nach jedem Paket aufgerufen.
+    cache: ResultCache; bereits gespielte Punkte werden daraus gelesen, nur neue werden gerechnet.
+    """
+    points = sweep_points(config)
+    results, keys = {}, {}
+    if cache is not None:
+        for index, point in enumerate(points):
+            keys[index] = point_key(config, point)
+            cached = cache.get(keys[index])
+            if cached is not None:
+                results[index] = cached
+
+    missing = [index for index in range(len(points)) if index not in results]
+    chunks = [missing[i:i + chunk_size] for i in range(0, len(missing), chunk_size)]
+    if progress is not None and results:
+        progress(len(results), len(points))
+
+    def store(indices, outcomes):
+        for index, outcome in zip(indices, outcomes):
+            results[index] = outcome
+            if cache is not None:
+                cache.put(keys[index], outcome)
+        if progress is not None:
+            progress(len(results), len(points))
+
+    if not workers or workers <= 1:
+        for chunk in chunks:
+            store(chunk, _run_points(config, [points[i] for i in chunk]))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            outcomes = executor.map(_run_points, [config] * len(chunks), [[points[i] for i in chunk] for chunk in chunks])
+            for chunk, outcome in zip(chunks, outcomes):
+                store(chunk, outcome)
+    return pd.DataFrame([summarize(point, *results[index]) for index, point in enumerate(points)])
+
+
+def write_results(frame, path):
+    """Schreibt die Ergebnisse je nach Endung als Parquet, Feather oder CSV"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        frame.to_csv(path, index=False)
+        return
+    if extension not in ('.parquet', '.feather'):
+        raise ValueError(f"Unbekanntes Ausgabeformat: {extension} (erlaubt: .parquet, .feather, .csv)")
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise SystemExit(f"{extension} benötigt pyarrow (pip install pyarrow) oder eine Ausgabe als .csv")
+    if extension == '.parquet':
+        frame.to_parquet(path, index=False)
+    else:
+        frame.to_feather(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Parameterstudie über die Spielkonstanten')
+    parser.add_argument('config', help='Konfigurationsdatei (JSON oder TOML)')
+    parser.add_argument('--output', '-o', default='sweep.parquet',
+                        help='Ausgabedatei: .parquet, .feather oder .csv (Standard sweep.parquet)')
+    parser.add_argument('--workers', '-w', type=int, default=None, help='Anzahl der Worker-Prozesse')
+    parser.add_argument('--sampling', choices=('grid', 'lhs'), help='überschreibt das Sampling der Konfiguration')
+    parser.add_argument('--samples', type=int, help='überschreibt die Anzahl der Punkte bei lhs')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f'Verzeichnis des Ergebnis-Caches (Standard {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--no-cache', action='store_true', help='alle Punkte neu rechnen, nichts speichern')
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    if args.sampling:
+        config['sampling'] = args.sampling
+    if args.samples:
+        config['samples'] = args.samples
+
+    cache = None if args.no_cache else ResultCache(args.cache_dir)
+    frame = run_sweep(config, args.workers, cache=cache,
+                      progress=lambda done, total: print(f"\r{done}/{total} Punkte", end='', flush=True))
+    print()
+    write_results(frame, args.output)
+    print(f"{len(frame)} Punkte mit je {config['runs']} Läufen gespeichert in {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""
+Evolutionäre Suche nach guten Parametern für den Autopiloten (autopilot.py).
+
+Ein genetischer Algorithmus variiert die Parameter einer ParametricPolicy (Bestellpunkte und
+-mengen je Teil, Produktionsmix, Verteilung auf die Märkte, Einstellungs- und
+Entlassungsschwellen). Jeder Kandidat spielt dieselben Spiele in einer VectorBicycleEnv:
+Alle Kandidaten einer Generation erhalten denselben Seed und damit dieselben Reklamationen
+und dieselbe Nachfrage (gemeinsame Zufallszahlen), sodass Unterschiede in der Fitness von
+der Strategie und nicht vom Zufall stammen. Fitness ist das mittlere Guthaben nach `months`
+Monaten; bankrotte Spiele zählen mit ihrem Guthaben bei der Insolvenz.
+
+Mit workers > 1 werden die Kandidaten einer Generation auf Worker-Prozesse verteilt. Am Ende
+werden die Kandidaten der letzten Generation auf neuen Seeds nachbewertet und die besten in
+die Autopilot-Datei geschrieben, die Kommandozeilenspiel und Streamlit-Oberfläche laden.
+Bewertungen werden im Ergebnis-Cache (result_cache.py) abgelegt:
+
+    python policy_search.py --generations 40 --workers 4 --output autopilot.json
+"""
+
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from autopilot import AUTOPILOT_FILE, ParametricPolicy, parameter_bounds, save_autopilot
+from bicycle_env import VectorBicycleEnv, env_spec
+from result_cache import DEFAULT_CACHE_DIR, ENGINE_MODULES, ResultCache, cache_key, engine_version
+from simulation_catalog import load_catalog
+
+
+def evaluate(vectors, games=64, months=24, seed=0):
+    """Fitness je Parametervektor: mittleres Endguthaben über `games` Spiele mit demselben Seed"""
+    fitness = []
+    for vector in vectors:
+        policy = ParametricPolicy.from_vector(vector)
+        env = VectorBicycleEnv(games, max_months=months)
+        env.reset(seed)
+        for _ in range(months):
+            env.step(policy.act(env))
+        fitness.append(float(env.balance.mean()))
+    return fitness
+
+
+class GeneticSearch:
+    """
+    Reellwertiger genetischer Algorithmus im auf [0, 1] normierten Parameterraum:
+    Turnierauswahl, Blend-Crossover (BLX-alpha), gaußsche Mutation und Elitismus.
+    """
+
+    def __init__(self, population=32, elite=2, tournament=3, alpha=0.3, mutation_rate=0.1, sigma=0.1,
+                 seed=0, catalog=None):
+        self.catalog = catalog if catalog is not None else load_catalog()
+        self.lower, self.upper = parameter_bounds(env_spec(self.catalog))
+        self.population_size = population
+        self.elite = elite
+        self.tournament = tournament
+        self.alpha = alpha
+        self.mutation_rate = mutation_rate
+        self.sigma = sigma
+        self.rng = np.random.default_rng(seed)
+
+        # Startpopulation: die Standardstrategie und zufällige Kandidaten
+        start = self.normalize(ParametricPolicy.default(self.catalog).clip().to_vector())
+        self.population = self.rng.random((population, len(start)))
+        self.population[0] = start
+
+    def normalize(self, vectors):
+        return (vectors - self.lower) / (self.upper - self.lower)
+
+    def denormalize(self, units):
+        return self.lower + units * (self.upper - self.lower)
+
+    def _select(self, fitness):
+        contestants = self.rng.integers(len(fitness), size=self.tournament)
+        return self.population[contestants[np.argmax(fitness[contestants])]]
+
+    def next_generation(self, fitness):
+        """Bildet aus der bewerteten Population die nächste Generation"""
+        fitness = np.asarray(fitness)
+        order = np.argsort(fitness)[::-1]
+        children = [self.population[i] for i in order[:self.elite]]
+        while len(children) < self.population_size:
+            first, second = self._select(fitness), self._select(fitness)
+            low, high = np.minimum(first, second), np.maximum(first, second)
+            spread = self.alpha * (high - low)
+            child = self.rng.uniform(low - spread, high + spread)
+            mutate = self.rng.random(len(child)) < self.mutation_rate
+            child = child + mutate * self.rng.normal(0, self.sigma, len(child))
+            children.append(np.clip(child, 0, 1))
+        self.population = np.array(children)
+
+
+def candidate_key(vector, games, months, seed):
+    """Cache-Schlüssel der Fitness eines Parametervektors"""
+    return cache_key(kind='policy_search.evaluate', engine=engine_version(ENGINE_MODULES['env'] + ('policy_search',)),
+                     parameters=np.asarray(vector, dtype=float), games=games, months=months, seed=seed)
+
+
+def search(generations=30, population=32, games=64, months=24, seed=0, workers=None, keep=5,
+           validation_games=256, progress=None, cache=None):
+    """
+    Führt die Suche aus und gibt die besten `keep` Kandidaten als Liste von
+    (ParametricPolicy, Fitness) zurück, beste zuerst. Die Fitness stammt aus der Nachbewertung
+    mit validation_games Spielen auf Seeds, die in der Suche nicht vorkamen.
+    progress(generation, fitness) wird nach jeder Generation mit den Fitnesswerten aufgerufen.
+    cache: ResultCache für die Fitness einzelner Kandidaten; eine wiederholte Suche mit gleichem
+    Seed rechnet dann nichts neu.
+    """
+    ga = GeneticSearch(population, seed=seed)
+    executor = None
+    if workers and workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+    def evaluate_population(vectors, games, eval_seed):
+        keys = [candidate_key(vector, games, months, eval_seed) for vector in vectors] if cache is not None else []
+        fitness = [cache.get(key) for key in keys] if cache is not None else [None] * len(vectors)
+        missing = [i for i, value in enumerate(fitness) if value is None]
+        if not missing:
+            return fitness
+        if executor is None:
+            computed = evaluate(vectors[missing], games, months, eval_seed)
+        else:
+            chunks = np.array_split(vectors[missing], min(workers, len(missing)))
+            results = executor.map(evaluate, chunks, [games] * len(chunks), [months] * len(chunks),
+                                   [eval_seed] * len(chunks))
+            computed = [value for chunk in results for value in chunk]
+        for i, value in zip(missing, computed):
+            fitness[i] = value
+            if cache is not None:
+                cache.put(keys[i], value)
+        return fitness
+
+    try:
+        # Jede Generation spielt neue Seeds, damit sich keine Strategie an einen Verlauf anpasst
+        for generation in range(generations):
+            fitness = evaluate_population(ga.denormalize(ga.population), games, seed * 100003 + generation)
+            if progress is not None:
+                progress(generation, fitness)
+            if generation < generations - 1:
+                ga.next_generation(fitness)
+
+        vectors = ga.denormalize(ga.population)
+        fitness = evaluate_population(vectors, validation_games, seed * 100003 + generations)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    order = np.argsort(fitness)[::-1][:keep]
+    return [(ParametricPolicy.from_vector(vectors[i], ga.catalog), fitness[i]) for i in order]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Evolutionäre Suche nach Parametern für den Autopiloten')
+    parser.add_argument('--generations', '-g', type=int, default=30, help='Anzahl der Generationen (Standard 30)')
+    parser.add_argument('--population', '-p', type=int, default=32, help='Kandidaten je Generation (Standard 32)')
+    parser.add_argument('--games', type=int, default=64, help='Spiele je Kandidat und Generation (Standard 64)')
+    parser.add_argument('--months', '-m', type=int, default=24, help='Monate je Spiel (Standard 24)')
+    parser.add_argument('--seed', '-s', type=int, default=0, help='Seed für Suche und Spiele')
+    parser.add_argument('--workers', '-w', type=int, default=None, help='Anzahl der Worker-Prozesse')
+    parser.add_argument('--keep', '-k', type=int, default=5, help='Anzahl gespeicherter Strategien (Standard 5)')
+    parser.add_argument('--output', '-o', default=AUTOPILOT_FILE,
+                        help=f'Autopilot-Datei (Standard {AUTOPILOT_FILE})')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f'Verzeichnis des Ergebnis-Caches (Standard {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--no-cache', action='store_true', help='alle Kandidaten neu bewerten, nichts speichern')
+    args = parser.parse_args(argv)
+
+    def report(generation, fitness):
+        print(f"Generation {generation + 1:3d}/{args.generations}: beste {max(fitness):12,.0f} €"
+              f"  Mittel {np.mean(fitness):12,.0f} €")
+
+    cache = None if args.no_cache else ResultCache(args.cache_dir)
+    best = search(args.generations, args.population, args.games, args.months, args.seed, args.workers,
+                  args.keep, progress=report, cache=cache)
+    save_autopilot(best, args.output, months=args.months, games=args.games, generations=args.generations,
+                   population=args.population, seed=args.seed)
+    print(f"\nBeste Strategie: {best[0][1]:,.0f} € nach {args.months} Monaten (Nachbewertung)")
+    print(f"{len(best)} Strategien gespeichert in {args.output}")
+
+
+if __name__ == '__main__':
+    main()
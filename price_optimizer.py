@@ -0,0 +1,118 @@
+"""
+Preisempfehlungen auf Basis eines Nachfragemodells (siehe demand_model.py).
+
+Umsatz und Deckungsbeitrag hängen je Fahrradtyp und Qualität nur vom eigenen Preis ab.
+Die Suche bewertet deshalb ein Raster von Preisen für alle Typen und Qualitäten eines
+Marktes in einem Array-Aufruf und verfeinert anschließend um das beste Rasterfeld.
+Ergebnisse werden nach Markt, Beständen und Zielgröße zwischengespeichert, sodass eine
+Oberfläche die Empfehlung bei jedem Neuladen ohne spürbare Wartezeit anzeigen kann.
+"""
+
+import functools
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Grobes Suchraster als Vielfache des Referenzpreises
+DEFAULT_GRID = np.linspace(0.5, 2.0, 61)
+OBJECTIVES = ('revenue', 'margin')
+
+
+class PriceOptimizer:
+    """Raster- und Verfeinerungssuche optimaler Preise je Markt mit LRU-Zwischenspeicher"""
+
+    def __init__(self, model, grid=DEFAULT_GRID, refine_points=21, cache_size=256):
+        self.model = model
+        self.grid = np.asarray(grid, dtype=float)
+        self.refine_points = refine_points
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def optimize(self, market, stock, unit_costs=None, objective='revenue', base=None):
+        """
+        Empfohlene Preise für einen Markt.
+        stock: Bestände (Fahrradtypen, Qualitäten) im Markt
+        unit_costs: Stückkosten in derselben Form (nur für objective='margin')
+        base: Nachfrage zum Referenzpreis in derselben Form (Standard: Basisnachfrage des Modells)
+        Gibt ein Dictionary mit den Arrays 'prices', 'expected_sales', 'expected_revenue' und
+        'expected_margin' (je Typ und Qualität) zurück; das Ergebnis ist schreibgeschützt.
+        """
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Unbekannte Zielgröße: {objective} (erwartet: {', '.join(OBJECTIVES)})")
+
+        m = self.model.market_index[market]
+        cell_shape = self.model.shape[1:]
+        stock = np.broadcast_to(np.asarray(stock, dtype=float), cell_shape)
+        unit_costs = np.broadcast_to(np.asarray(0.0 if unit_costs is None else unit_costs, dtype=float), cell_shape)
+        if objective == 'revenue':
+            unit_costs = np.zeros(cell_shape)
+        base = self.model.base_demand[m] if base is None else np.broadcast_to(np.asarray(base, dtype=float), cell_shape)
+
+        key = (market, objective, stock.tobytes(), unit_costs.tobytes(), base.tobytes())
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+
+        result = self._search(m, stock, unit_costs, base)
+        with self._lock:
+            self._cache[key] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def _evaluate(self, m, prices, stock, unit_costs, base):
+        """Absatz und Zielwert für Preiskandidaten der Form (Kandidaten, Typen, Qualitäten)"""
+        full = np.broadcast_to(self.model.reference_prices, (len(prices),) + self.model.shape).copy()
+        full[:, m] = prices
+        sales = np.minimum(base * self.model.price_factor(full)[:, m], stock)
+        return sales, (prices - unit_costs) * sales
+
+    def _search(self, m, stock, unit_costs, base):
+        reference = self.model.reference_prices[m]
+        cells = np.indices(reference.shape)
+
+        # 1. Grobes Raster für alle Typen und Qualitäten gleichzeitig
+        candidates = self.grid[:, None, None] * reference
+        _, value = self._evaluate(m, candidates, stock, unit_costs, base)
+        best = np.argmax(value, axis=0)
+        best_factor = self.grid[best]
+
+        # 2. Verfeinerung zwischen den Nachbarpunkten des besten Rasterfeldes
+        step = self.grid[1] - self.grid[0] if len(self.grid) > 1 else 0.0
+        offsets = np.linspace(-step, step, self.refine_points)
+        factors = np.clip(best_factor + offsets[:, None, None], self.grid[0], self.grid[-1])
+        candidates = factors * reference
+        sales, value = self._evaluate(m, candidates, stock, unit_costs, base)
+        best = np.argmax(value, axis=0)
+
+        # Auf ganze Euro runden; ohne Bestand ist der Preis bedeutungslos (Referenzpreis)
+        prices = np.where(stock > 0, np.round(candidates[best, cells[0], cells[1]]), reference)
+        sales = self._evaluate(m, prices[None], stock, unit_costs, base)[0][0]
+
+        result = {
+            'prices': prices,
+            'expected_sales': sales,
+            'expected_revenue': prices * sales,
+            'expected_margin': (prices - unit_costs) * sales,
+        }
+        for array in result.values():
+            array.setflags(write=False)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+# Begrenzt: je Katalog entsteht ein eigenes Nachfragemodell (siehe demand_model.catalog_demand_model)
+@functools.lru_cache(maxsize=8)
+def get_price_optimizer(model):
+    """Gemeinsamer PriceOptimizer je Nachfragemodell (Zwischenspeicher über Sitzungen hinweg)"""
+    return PriceOptimizer(model)
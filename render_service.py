@@ -0,0 +1,137 @@
+"""
+Rendering of the performance dashboards in a process pool.
+
+The dashboards (see dashboards.py) are CPU-heavy to draw. A RenderService takes a snapshot
+of the monthly reports, renders the requested dashboards in worker processes and returns a
+Future, so the console menu and the Streamlit page stay responsive:
+
+    service = get_service()
+    future = service.submit(game.monthly_reports, formats=('png',))   # bytes
+    future = service.submit(game.monthly_reports, output_dir='graphs')  # file paths
+    images = future.result()
+
+render_batch() renders the dashboards of many scenario runs (e.g. parameter sweeps) in
+parallel, with several scenarios per task to keep the inter-process overhead low.
+"""
+
+import multiprocessing
+import os
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from dashboards import DASHBOARDS
+
+
+def _init_worker():
+    """Workers always render off-screen"""
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+
+
+def _render_job(snapshot, dashboards, formats, output_dir, prefix, dpi):
+    """Renders one snapshot in a worker: {dashboard: {format: path or bytes}}"""
+    from dashboards import render_dashboard_bytes, render_dashboards
+
+    monthly_reports, market_preferences = pickle.loads(snapshot)
+    if output_dir is None:
+        return render_dashboard_bytes(monthly_reports, market_preferences, formats=formats,
+                                      dashboards=dashboards, dpi=dpi)
+
+    paths = render_dashboards(monthly_reports, market_preferences, output_dir=output_dir, formats=formats,
+                              dashboards=dashboards, prefix=prefix, dpi=dpi)
+    return {name: dict(zip(formats, files)) for name, files in paths.items()}
+
+
+def _render_batch_chunk(jobs, dashboards, formats, dpi):
+    """Renders several scenarios in one task: [(scenario, {dashboard: {format: path}})]"""
+    return [(scenario, _render_job(snapshot, dashboards, formats, output_dir, 'bicycle_sim', dpi))
+            for scenario, snapshot, output_dir in jobs]
+
+
+def snapshot(monthly_reports, market_preferences=None):
+    """
+    Serialises the reports immediately, so later changes to the running game do not leak
+    into a render that is still waiting in the queue.
+    """
+    return pickle.dumps((list(monthly_reports), market_preferences), pickle.HIGHEST_PROTOCOL)
+
+
+class RenderService:
+    """
+    Process pool for dashboard rendering. The pool is started on first use and uses the
+    'spawn' start method, which is safe in multi-threaded hosts such as Streamlit.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                     mp_context=multiprocessing.get_context('spawn'),
+                                                     initializer=_init_worker)
+            return self._executor
+
+    def submit(self, monthly_reports, market_preferences=None, dashboards=DASHBOARDS, formats=('png',),
+               output_dir=None, prefix='bicycle_sim', dpi=100):
+        """
+        Renders the dashboards of one game in the background. Returns a Future whose result is
+        {dashboard: {format: bytes}}, or file paths instead of bytes if output_dir is given.
+        """
+        return self._pool().submit(_render_job, snapshot(monthly_reports, market_preferences), tuple(dashboards),
+                                   tuple(formats), output_dir, prefix, dpi)
+
+    def render_batch(self, scenarios, output_dir, market_preferences=None, dashboards=DASHBOARDS,
+                     formats=('png',), dpi=100, chunksize=None):
+        """
+        Renders the dashboards of many scenario runs into output_dir/<scenario>/.
+        scenarios: {scenario name: monthly reports}.
+        Returns {scenario: {dashboard: {format: path}}}; blocks until all are done.
+        """
+        jobs = [(str(name), snapshot(reports, market_preferences), os.path.join(output_dir, str(name)))
+                for name, reports in scenarios.items()]
+        if not jobs:
+            return {}
+
+        if chunksize is None:
+            # About four tasks per worker balance the load without paying per-scenario overhead
+            chunksize = max(1, len(jobs) // (self.max_workers * 4))
+        chunks = [jobs[i:i + chunksize] for i in range(0, len(jobs), chunksize)]
+
+        pool = self._pool()
+        futures = [pool.submit(_render_batch_chunk, chunk, tuple(dashboards), tuple(formats), dpi)
+                   for chunk in chunks]
+
+        results = {}
+        for future in futures:
+            results.update(future.result())
+        return results
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=not wait)
+                self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_service():
+    """The shared RenderService of this process"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = RenderService()
+        return _service
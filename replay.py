@@ -0,0 +1,160 @@
+"""
+Nachspielen von Aktionsprotokollen (action_log.py) mit Prüfung Monat für Monat.
+
+Das Spiel wird aus der Kopfzeile des Protokolls neu aufgebaut (Seed, Katalog, Modi bzw.
+gespeicherter Stand) und jede Aktion ohne Oberfläche erneut ausgeführt, einschließlich
+Rückgängig und Wiederholen (undo_stack.py). Vor jeder Aktion
+werden Spieltag und Position im Zufallsstrom verglichen, nach jedem Monatsabschluss der Hash
+des Spielstands. Die erste Abweichung wird mit Aktion und Monat gemeldet. Da nur die Engine
+läuft, misst das Nachspielen zugleich den Durchsatz eines echten Spielverlaufs:
+
+    python replay.py record --strategy produce_to_capacity --months 24 --seed 3 -o spiel.jsonl
+    python replay.py check spiel.jsonl --repeat 5
+
+Bei begrenzter Protokolllänge (ActionLog max_entries) ist jeder Abschnitt für sich
+nachspielbar; Spielstand und Rückgängig-Stapel stehen dann in der Kopfzeile.
+
+Protokolle mit gespeichertem Spielstand enthalten Pickle-Daten und sollten nur aus
+vertrauenswürdiger Quelle nachgespielt werden.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+
+from action_log import RECORDED_ACTIONS, ActionLog, decode_snapshot, read_log, rng_position, state_hash
+from autopilot import AUTOPILOT_FILE
+from parameter_sweep import make_policy
+from result_cache import ENGINE_MODULES, engine_version
+from simulation_catalog import SimulationCatalog, load_catalog
+from simulation_engine import BicycleSimulation
+from undo_stack import UNDO_ACTIONS, UndoStack
+
+
+def start_state(header):
+    """Spiel im Zustand zu Beginn des Protokolls"""
+    if header['snapshot'] is not None:
+        return decode_snapshot(header['snapshot'])
+    catalog = SimulationCatalog(**header['catalog']) if header['catalog'] is not None else load_catalog()
+    return BicycleSimulation(catalog=catalog, ui=None, seed=header['seed'], lead_times=header['lead_times'],
+                             daily=header['daily'])
+
+
+def undo_state(header):
+    """Rückgängig-Stapel zu Beginn des Protokolls (bei späteren Abschnitten aus der Kopfzeile)"""
+    if header.get('undo') is None:
+        return UndoStack(levels=None)
+    return UndoStack.restore(*decode_snapshot(header['undo']), levels=None)
+
+
+def replay(header, entries, verify=True):
+    """
+    Spielt die Aktionen nach. Gibt {'simulation', 'actions', 'months', 'seconds', 'mismatch'}
+    zurück; mismatch beschreibt die erste Abweichung (dann endet das Nachspielen) oder ist None.
+    seconds misst nur die Aktionen, nicht den Aufbau des Startzustands.
+    """
+    sim = start_state(header)
+    # Ohne Begrenzung: das Protokoll enthält nur Rücknahmen, die im Spiel möglich waren
+    undo = undo_state(header)
+    actions = months = 0
+    mismatch = None
+    started = time.perf_counter()
+
+    for index, entry in enumerate(entries):
+        action = entry['a']
+        if action not in RECORDED_ACTIONS and action not in UNDO_ACTIONS:
+            raise ValueError(f"Unbekannte Aktion in Zeile {index + 2}: {action}")
+        if 'daily' in entry:
+            sim.daily = entry['daily']
+
+        if verify:
+            checks = (('month', entry['m'], sim.current_month), ('day', entry['d'], sim.day),
+                      ('rng', entry['r'], rng_position(sim.rng)))
+            mismatch = next(({'index': index, 'month': entry['m'], 'action': action, 'field': field,
+                              'expected': expected, 'actual': actual}
+                             for field, expected, actual in checks if expected != actual), None)
+            if mismatch is not None:
+                break
+
+        if action == 'checkpoint':
+            undo.push(sim)
+        elif action == 'discard':
+            undo.discard(sim)
+        elif action in UNDO_ACTIONS:
+            sim = getattr(undo, action)(sim)
+        else:
+            getattr(sim, action)(*entry.get('p', ()), **entry.get('k', {}))
+        actions += 1
+
+        if action == 'close_month':
+            months += 1
+            if verify and state_hash(sim) != entry['h']:
+                mismatch = {'index': index, 'month': entry['m'], 'action': action, 'field': 'state',
+                            'expected': entry['h'], 'actual': state_hash(sim)}
+                break
+
+    return {'simulation': sim, 'actions': actions, 'months': months,
+            'seconds': time.perf_counter() - started, 'mismatch': mismatch}
+
+
+def record_game(strategy, months, seed, path=None, catalog=None):
+    """Spielt `months` Monate mit einer Strategie und schreibt dabei ein Protokoll; gibt das ActionLog zurück"""
+    sim = BicycleSimulation(catalog=catalog, ui=None, seed=seed)
+    log = ActionLog.attach(sim, path)
+    for _ in range(months):
+        strategy(sim)
+        sim.close_month()
+        if sim.is_bankrupt():
+            break
+    return log
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Aktionsprotokolle aufzeichnen, nachspielen und prüfen')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    record = commands.add_parser('record', help='ein Spiel mit einer Strategie aufzeichnen')
+    record.add_argument('--strategy', default='produce_to_capacity',
+                        help="Strategie aus strategies.py, 'default' oder 'autopilot' (Standard produce_to_capacity)")
+    record.add_argument('--months', '-m', type=int, default=24, help='Anzahl der Monate (Standard 24)')
+    record.add_argument('--seed', '-s', type=int, default=0, help='Seed des Spiels')
+    record.add_argument('--autopilot', default=AUTOPILOT_FILE, help=f'Autopilot-Datei (Standard {AUTOPILOT_FILE})')
+    record.add_argument('--output', '-o', required=True, help='Zieldatei des Protokolls (JSON-Zeilen)')
+
+    check = commands.add_parser('check', help='ein Protokoll nachspielen und die Spielstände prüfen')
+    check.add_argument('log', help='Protokolldatei')
+    check.add_argument('--repeat', '-r', type=int, default=1, help='Wiederholungen für die Durchsatzmessung')
+    check.add_argument('--no-verify', action='store_true', help='nur nachspielen, nichts vergleichen')
+    args = parser.parse_args(argv)
+
+    if args.command == 'record':
+        catalog = load_catalog()
+        log = record_game(make_policy(args.strategy, catalog, args.autopilot), args.months, args.seed,
+                          args.output, catalog)
+        print(f"{len(log)} Aktionen aufgezeichnet in {args.output}")
+        return 0
+
+    header, entries = read_log(args.log)
+    if header['engine'] != engine_version(ENGINE_MODULES['streamlit'])[:16]:
+        print("Hinweis: Das Protokoll stammt von einem anderen Stand der Engine; Abweichungen sind möglich")
+
+    runs = [replay(header, entries, verify=not args.no_verify) for _ in range(args.repeat)]
+    result = runs[0]
+    if result['mismatch'] is not None:
+        m = result['mismatch']
+        print(f"Abweichung in Monat {m['month']} bei Aktion {m['index'] + 1} ({m['action']}): "
+              f"{m['field']} erwartet {m['expected']}, erhalten {m['actual']}")
+        return 1
+
+    seconds = statistics.median(run['seconds'] for run in runs)
+    print(f"{result['actions']} Aktionen, {result['months']} Monate nachgespielt"
+          + ("" if args.no_verify else ", alle Spielstände stimmen überein"))
+    print(f"Dauer (Median aus {len(runs)}): {seconds * 1000:.1f} ms  "
+          f"= {result['months'] / seconds:,.0f} Monate/s, {result['actions'] / seconds:,.0f} Aktionen/s")
+    print(f"Endguthaben: {result['simulation'].balance:,.2f} €")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
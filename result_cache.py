@@ -0,0 +1,205 @@
+"""
+Inhaltsadressierter Ergebnis-Cache für Simulationsläufe auf der Festplatte.
+
+Ein Eintrag wird über den SHA-256-Hash seiner Eingaben gefunden: Engine-Version (Hash des
+Quelltextes der beteiligten Module), Konfiguration (Katalog bzw. Konstanten), Strategie,
+Seed und Laufzeit. Ändert sich eine davon, entsteht ein neuer Schlüssel; alte Einträge werden
+nie fälschlich wiederverwendet, sondern nur irgendwann verdrängt. Gespeichert werden eine
+Zusammenfassung und optional der vollständige Verlauf eines Laufs.
+
+Die Einträge liegen in einer SQLite-Datei, die mehrere Prozesse gleichzeitig nutzen können
+(Worker-Prozesse der Stapel-APIs schreiben direkt). Überschreitet der Cache max_bytes, werden
+die am längsten nicht gelesenen Einträge gelöscht (LRU):
+
+    cache = ResultCache()
+    key = cache_key(engine=engine_version(ENGINE_MODULES['env']), config=..., seed=3, months=24)
+    summary = cache.get(key)
+    if summary is None:
+        summary = run(...)
+        cache.put(key, summary)
+
+Stapel-APIs (risk_analysis, parameter_sweep, policy_search) nehmen einen ResultCache über den
+Parameter `cache` entgegen; None schaltet den Cache ab.
+"""
+
+import functools
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+# Standardverzeichnis, änderbar über BIKESIM_CACHE_DIR
+DEFAULT_CACHE_DIR = os.environ.get("BIKESIM_CACHE_DIR",
+                                   os.path.join(os.path.expanduser("~"), ".cache", "fahrradsimulator"))
+
+# Standardgröße des Caches (Summe der gespeicherten Daten)
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Attribute einer Simulation, die nicht zum Spielstand gehören (Oberfläche, Zeitmessung,
+# Aktionsprotokoll, Metriken und Verwaltung der Forks)
+NON_GAME_ATTRIBUTES = ('ui', 'timer', 'action_log', 'record_metrics', '_shared')
+
+# Module, deren Quelltext das Ergebnis eines Laufs je Engine bestimmt
+ENGINE_MODULES = {
+    'streamlit': ('simulation_engine', 'simulation_catalog', 'demand_model', 'event_scheduler', 'loans',
+                  'sales_totals', 'price_optimizer', 'strategies', 'autopilot', 'bicycle_env'),
+    'env': ('bicycle_env', 'simulation_catalog', 'autopilot'),
+    'console': ('BicycleSimulation', 'demand_model', 'price_optimizer', 'autopilot', 'bicycle_env',
+                'simulation_catalog'),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def engine_version(modules):
+    """Hash des Quelltextes der Module (Tupel von Modulnamen); ändert sich mit jeder Codeänderung"""
+    digest = hashlib.sha256()
+    for name in modules:
+        with open(importlib.util.find_spec(name).origin, 'rb') as f:
+            digest.update(name.encode() + b'\0' + f.read())
+    return digest.hexdigest()
+
+
+def _canonical(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if hasattr(value, 'to_dict'):
+        return value.to_dict()
+    raise TypeError(f"Nicht hashbarer Wert im Cache-Schlüssel: {type(value).__name__}")
+
+
+def cache_key(**parts):
+    """SHA-256 über die kanonische JSON-Darstellung der Schlüsselteile"""
+    text = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=_canonical)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def strategy_key(strategy):
+    """Identität einer Strategie: Parameter einer ParametricPolicy oder Name der Funktion"""
+    if hasattr(strategy, 'to_dict'):
+        return {'parameters': strategy.to_dict()}
+    return f"{strategy.__module__}.{strategy.__qualname__}"
+
+
+def state_digest(sim):
+    """Hash eines Spielstands (z. B. Startpunkt einer Risikoanalyse); nur Katalog und Spielfelder (NON_GAME_ATTRIBUTES zählen nicht)"""
+    state = {name: value for name, value in sim.__dict__.items() if name not in NON_GAME_ATTRIBUTES}
+    # Ohne Memo (fast) hängen die Bytes nur vom Inhalt ab, nicht davon, welche Objekte geteilt werden
+    buffer = io.BytesIO()
+    pickler = pickle.Pickler(buffer, pickle.HIGHEST_PROTOCOL)
+    pickler.fast = True
+    pickler.dump(state)
+    return hashlib.sha256(buffer.getvalue()).hexdigest()
+
+
+class ResultCache:
+    """
+    Zusammenfassungen und optionale Verläufe von Läufen in einer SQLite-Datei mit LRU-Verdrängung.
+    Die Verbindung wird je Prozess geöffnet und ist threadsicher (z. B. für alle Streamlit-Sitzungen);
+    ein ResultCache lässt sich an Worker-Prozesse übergeben.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._connection = None
+        self._lock = threading.RLock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_connection'], state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state, _connection=None, _lock=threading.RLock())
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, 'results.sqlite')
+
+    def _db(self):
+        if self._connection is None:
+            os.makedirs(self.directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=60, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("""CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY, summary BLOB NOT NULL, history BLOB,
+                size INTEGER NOT NULL, accessed REAL NOT NULL)""")
+            connection.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+            self._connection = connection
+        return self._connection
+
+    def get(self, key, history=False):
+        """
+        Zusammenfassung zu key oder None. Mit history=True wird (Zusammenfassung, Verlauf)
+        zurückgegeben; ein Eintrag ohne gespeicherten Verlauf gilt dann als nicht vorhanden.
+        """
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT summary, history FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None or (history and row[1] is None):
+                self.misses += 1
+                return None
+            self.hits += 1
+            db.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+        summary = pickle.loads(row[0])
+        return (summary, pickle.loads(row[1])) if history else summary
+
+    def put(self, key, summary, history=None):
+        """Speichert einen Lauf und verdrängt bei Bedarf die ältesten Einträge"""
+        summary_blob = pickle.dumps(summary, pickle.HIGHEST_PROTOCOL)
+        history_blob = pickle.dumps(history, pickle.HIGHEST_PROTOCOL) if history is not None else None
+        size = len(summary_blob) + (len(history_blob) if history_blob is not None else 0)
+        with self._lock:
+            self._db().execute(
+                "INSERT OR REPLACE INTO results (key, summary, history, size, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, summary_blob, history_blob, size, time.time()))
+            self.evict()
+
+    def evict(self, max_bytes=None):
+        """Löscht die am längsten nicht gelesenen Einträge, bis der Cache höchstens max_bytes groß ist"""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        with self._lock:
+            db = self._db()
+            excess = self.size() - limit
+            if excess <= 0:
+                return 0
+            removed, freed = [], 0
+            for key, size in db.execute("SELECT key, size FROM results ORDER BY accessed"):
+                removed.append((key,))
+                freed += size
+                if freed >= excess:
+                    break
+            db.executemany("DELETE FROM results WHERE key = ?", removed)
+            return len(removed)
+
+    def size(self):
+        """Summe der gespeicherten Daten in Bytes"""
+        with self._lock:
+            return self._db().execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def __len__(self):
+        with self._lock:
+            return self._db().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._db().execute("DELETE FROM results")
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -0,0 +1,296 @@
+"""
+Monte-Carlo-Risikoanalyse einer Strategie (siehe strategies.py).
+
+run_batch() spielt eine Strategie in vielen Läufen mit unterschiedlichen Seeds und liefert
+die Guthabenverläufe Lauf für Lauf, sobald sie fertig sind (auf Wunsch in Worker-Prozessen).
+RiskAggregation wertet die Läufe im Durchlauf aus; gespeichert werden nur Zähler je Monat
+und Quantilskizzen (sketches.py) je Kennzahl und Monat, sodass der Speicherbedarf nicht mit
+der Anzahl der Läufe wächst. Teilergebnisse aus Worker-Prozessen werden mit merge()
+zusammengeführt:
+
+    report = risk_report(produce_to_capacity, runs=1000, months=24)
+    report['bankruptcy_probability']   # Anteil bankrotter Läufe bis Monat m
+    report['value_at_risk']            # Verlust gegenüber dem Startguthaben je Monat
+
+Ein bankrotter Lauf endet im Monat der Insolvenz; Guthaben und Schulden werden für die
+restlichen Monate fortgeschrieben, der Gewinn ist dort 0.
+
+financing_risk() bewertet zusätzlich mehrere Kreditportfolios auf einmal gegen dieselben Läufe
+(Zahlungsströme aus loans.portfolio_cashflows).
+
+Mit cache=ResultCache(...) (result_cache.py) werden einzelne Läufe samt Verlauf gespeichert und
+bei gleicher Strategie, gleichem Startstand, Seed und Laufzeit nicht neu gespielt.
+"""
+
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from loans import portfolio_cashflows
+from result_cache import ENGINE_MODULES, cache_key, engine_version, state_digest, strategy_key
+from simulation_catalog import load_catalog
+from simulation_engine import BicycleSimulation
+from sketches import SeriesSketch
+
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+# Kennzahlen aus dem Monatsbericht, die je Monat zusammengefasst werden
+TRACKED_METRICS = ('balance', 'profit', 'debt')
+
+
+def run_strategy(strategy, months, seed, start=None, catalog=None):
+    """
+    Ein Lauf über `months` Monate ab `start` (Standard: neues Spiel mit `catalog`).
+    Gibt ({Kennzahl: Werte je Monatsende}, Monat der Insolvenz oder None) zurück; Monate
+    zählen ab 1 relativ zum Start.
+    """
+    if start is None:
+        sim = BicycleSimulation(catalog=catalog, ui=None, seed=seed)
+    else:
+        sim = start.fork()
+        sim.rng = random.Random(seed)
+
+    series = {metric: np.zeros(months) for metric in TRACKED_METRICS}
+    for index in range(months):
+        strategy(sim)
+        report = sim.close_month()
+        for metric in TRACKED_METRICS:
+            series[metric][index] = report[metric]
+        if sim.is_bankrupt():
+            series['balance'][index:] = report['balance']
+            series['debt'][index:] = report['debt']
+            return series, index + 1
+    return series, None
+
+
+def run_key(strategy, months, start=None):
+    """Gemeinsame Teile der Cache-Schlüssel für Läufe einer Strategie (ohne Seed)"""
+    return {
+        'kind': 'risk_analysis.run_strategy',
+        'engine': engine_version(ENGINE_MODULES['streamlit'] + ('risk_analysis',)),
+        'start': state_digest(start) if start is not None else load_catalog().to_dict(),
+        'strategy': strategy_key(strategy),
+        'months': months,
+    }
+
+
+def run_cached(strategy, months, seed, start=None, cache=None, key=None):
+    """run_strategy mit Ergebnis-Cache; key: Ergebnis von run_key (sonst je Aufruf berechnet)"""
+    if cache is None:
+        return run_strategy(strategy, months, seed, start)
+    entry_key = cache_key(seed=seed, **(key or run_key(strategy, months, start)))
+    cached = cache.get(entry_key, history=True)
+    if cached is not None:
+        summary, series = cached
+        return series, summary['ruin_month']
+    series, ruin_month = run_strategy(strategy, months, seed, start)
+    summary = {'final': {metric: float(values[-1]) for metric, values in series.items()}, 'ruin_month': ruin_month}
+    cache.put(entry_key, summary, history=series)
+    return series, ruin_month
+
+
+def _run_chunk(strategy, months, seeds, start, cache=None, key=None):
+    return [run_cached(strategy, months, seed, start, cache, key) for seed in seeds]
+
+
+def _aggregate_chunk(strategy, months, seeds, start, initial_balance, cache=None, key=None):
+    """Teilauswertung eines Pakets von Läufen in einem Worker-Prozess"""
+    aggregation = RiskAggregation(months, initial_balance, seed=seeds[0])
+    for series, ruin_month in _run_chunk(strategy, months, seeds, start, cache, key):
+        aggregation.add(series, ruin_month)
+    return aggregation
+
+
+def _chunks(seed, runs, chunk_size):
+    seeds = range(seed, seed + runs)
+    return [seeds[i:i + chunk_size] for i in range(0, runs, chunk_size)]
+
+
+def run_batch(strategy, runs, months, seed=0, start=None, workers=None, chunk_size=50, cache=None):
+    """
+    Generator über `runs` Läufe mit den Seeds seed, seed + 1, ...; liefert die Ergebnisse
+    von run_strategy in der Reihenfolge ihrer Fertigstellung.
+    workers > 1 verteilt die Läufe in Paketen von chunk_size auf Worker-Prozesse; die
+    Strategie muss dann eine Funktion auf Modulebene sein.
+    cache: ResultCache für einzelne Läufe (None = ohne Cache).
+    """
+    key = run_key(strategy, months, start) if cache is not None else None
+    if not workers or workers <= 1:
+        for run_seed in range(seed, seed + runs):
+            yield run_cached(strategy, months, run_seed, start, cache, key)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = [executor.submit(_run_chunk, strategy, months, seeds, start, cache, key)
+                   for seeds in _chunks(seed, runs, chunk_size)]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+class RiskAggregation:
+    """
+    Laufende, zusammenführbare Auswertung von Läufen gleicher Länge.
+    Insolvenzen werden exakt gezählt; je Kennzahl und Monat führt eine SeriesSketch Mittelwert,
+    Streuung und Extremwerte exakt und Quantile als KLL-Schätzung (Rangfehler etwa 1/k).
+    """
+
+    def __init__(self, months, initial_balance, metrics=TRACKED_METRICS, k=200, seed=0):
+        self.months = months
+        self.initial_balance = initial_balance
+        self.runs = 0
+        self.ruined_in_month = np.zeros(months, dtype=np.int64)
+        self.ruin_month_sum = 0
+        self.metrics = {metric: SeriesSketch(months, k, seed=seed * len(metrics) + i)
+                        for i, metric in enumerate(metrics)}
+
+    def add(self, series, ruin_month=None):
+        """Nimmt einen Lauf auf (Ergebnis von run_strategy)"""
+        if ruin_month is not None:
+            self.ruined_in_month[ruin_month - 1] += 1
+            self.ruin_month_sum += ruin_month
+        for metric, sketch in self.metrics.items():
+            sketch.add(series[metric])
+        self.runs += 1
+
+    def merge(self, other):
+        """Nimmt die Läufe einer anderen RiskAggregation (z. B. aus einem Worker-Prozess) auf"""
+        if other.months != self.months or other.metrics.keys() != self.metrics.keys():
+            raise ValueError("Auswertungen mit unterschiedlichen Monaten oder Kennzahlen")
+        self.runs += other.runs
+        self.ruined_in_month += other.ruined_in_month
+        self.ruin_month_sum += other.ruin_month_sum
+        for metric, sketch in self.metrics.items():
+            sketch.merge(other.metrics[metric])
+        return self
+
+    def quantile_curves(self, metric='balance', quantiles=(0.05, 0.5, 0.95)):
+        """{q: Array je Monat} der geschätzten Quantile einer Kennzahl"""
+        return self.metrics[metric].quantiles(quantiles)
+
+    def report(self, quantiles=DEFAULT_QUANTILES, var_level=0.95):
+        """
+        Risikobericht je Monat:
+        bankruptcy_probability (kumuliert), balance_mean/std/min/max, balance_quantiles {q: Array},
+        cash_at_risk (Guthaben, das mit var_level nicht unterschritten wird), value_at_risk
+        (Startguthaben - cash_at_risk) sowie expected_time_to_ruin (Mittel über bankrotte Läufe,
+        None ohne Insolvenz) und ruin_probability über den ganzen Zeitraum.
+        'metrics' enthält mean, std und quantiles für jede erfasste Kennzahl.
+        """
+        if self.runs == 0:
+            raise ValueError("Keine Läufe vorhanden")
+
+        tail = round(1 - var_level, 10)
+        levels = sorted(set(quantiles) | {tail})
+        metrics = {
+            metric: {'mean': sketch.mean.copy(), 'std': sketch.std, 'quantiles': sketch.quantiles(levels)}
+            for metric, sketch in self.metrics.items()
+        }
+        balance = self.metrics['balance']
+        balance_quantiles = metrics['balance']['quantiles']
+        ruined = int(self.ruined_in_month.sum())
+        cash_at_risk = balance_quantiles[tail]
+
+        return {
+            'runs': self.runs,
+            'months': np.arange(1, self.months + 1),
+            'bankruptcy_probability': np.cumsum(self.ruined_in_month) / self.runs,
+            'ruin_probability': ruined / self.runs,
+            'expected_time_to_ruin': self.ruin_month_sum / ruined if ruined else None,
+            'balance_mean': balance.mean.copy(),
+            'balance_std': balance.std,
+            'balance_min': balance.moments.min.copy(),
+            'balance_max': balance.moments.max.copy(),
+            'balance_quantiles': {q: balance_quantiles[q] for q in quantiles},
+            'var_level': var_level,
+            'cash_at_risk': cash_at_risk,
+            'value_at_risk': self.initial_balance - cash_at_risk,
+            'metrics': {metric: dict(summary, quantiles={q: summary['quantiles'][q] for q in quantiles})
+                        for metric, summary in metrics.items()},
+        }
+
+
+def aggregate_runs(strategy, runs=1000, months=24, seed=0, start=None, workers=None, chunk_size=50,
+                   progress=None, cache=None):
+    """
+    Spielt eine Strategie `runs`-mal und gibt die RiskAggregation zurück.
+    Mit workers > 1 wertet jeder Worker sein Paket selbst aus; übertragen und zusammengeführt
+    werden nur die Skizzen, nicht die einzelnen Verläufe.
+    progress(fertige_läufe, runs) wird nach jedem Lauf bzw. Paket aufgerufen.
+    """
+    initial_balance = start.balance if start is not None else load_catalog().initial_balance
+    aggregation = RiskAggregation(months, initial_balance, seed=seed)
+
+    if not workers or workers <= 1:
+        for series, ruin_month in run_batch(strategy, runs, months, seed, start, cache=cache):
+            aggregation.add(series, ruin_month)
+            if progress is not None:
+                progress(aggregation.runs, runs)
+        return aggregation
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        key = run_key(strategy, months, start) if cache is not None else None
+        futures = [executor.submit(_aggregate_chunk, strategy, months, seeds, start, initial_balance, cache, key)
+                   for seeds in _chunks(seed, runs, chunk_size)]
+        for future in as_completed(futures):
+            aggregation.merge(future.result())
+            if progress is not None:
+                progress(aggregation.runs, runs)
+    return aggregation
+
+
+def risk_report(strategy, runs=1000, months=24, seed=0, start=None, workers=None,
+                quantiles=DEFAULT_QUANTILES, var_level=0.95, progress=None, cache=None):
+    """
+    Spielt eine Strategie `runs`-mal und gibt den Risikobericht von RiskAggregation zurück.
+    start: Ausgangsstand (z. B. der aktuelle Spielstand; wird je Lauf kopiert), sonst ein neues Spiel.
+    progress(fertige_läufe, runs) wird nach jedem Lauf bzw. Paket aufgerufen.
+    """
+    aggregation = aggregate_runs(strategy, runs, months, seed, start, workers, progress=progress, cache=cache)
+    return aggregation.report(quantiles, var_level)
+
+
+def financing_risk(strategy, portfolios, runs=1000, months=24, seed=0, start=None, workers=None, cache=None):
+    """
+    Bewertet Kreditportfolios gegen die Guthabenverläufe einer Strategie.
+    portfolios: {Name: [(Kreditart, Betrag, Monat)]}; Monat zählt ab 1 relativ zum Start, die
+    Raten sind ab dem Folgemonat fällig (wie take_loan). Die Zahlungsströme aller Portfolios
+    werden einmal als Arrays berechnet und mit jedem Lauf gemeinsam verrechnet (Guthaben +
+    Auszahlungen - Raten). Näherung: Die Strategie reagiert nicht auf das zusätzliche Geld,
+    ein ohne Kredit bankrotter Lauf behält sein Guthaben bei der Insolvenz.
+    Gibt {Name: {'ruin_probability', 'balance_mean' (je Monat), 'debt' (Restschuld je Monat),
+    'interest' (Zinsen im Zeitraum)}} zurück.
+    """
+    catalog = start.catalog if start is not None else load_catalog()
+    names = list(portfolios)
+    width = max([len(loans) for loans in portfolios.values()] + [1])
+    amount, interest, duration, month = (np.zeros((len(names), width)) for _ in range(4))
+    for i, name in enumerate(names):
+        for j, (option, loan_amount, loan_month) in enumerate(portfolios[name]):
+            if option not in catalog.credit_options:
+                raise ValueError(f"Unbekannte Kreditart: {option}")
+            terms = catalog.credit_options[option]
+            amount[i, j], month[i, j] = loan_amount, loan_month
+            interest[i, j], duration[i, j] = terms['annual_interest'], terms['duration_months']
+
+    flows = portfolio_cashflows(amount, interest, duration, month, months)
+    paid_out = (amount[..., None] * (np.arange(1, months + 1) >= month[..., None])).sum(axis=1)
+    cash_effect = paid_out - np.cumsum(flows['payment'], axis=1)   # (Portfolios, Monate)
+
+    ruined = np.zeros(len(names), dtype=np.int64)
+    balance_sum = np.zeros((len(names), months))
+    done = 0
+    for series, _ in run_batch(strategy, runs, months, seed, start, workers, cache=cache):
+        balance = series['balance'][None, :] + cash_effect
+        ruined += (balance <= 0).any(axis=1)
+        balance_sum += balance
+        done += 1
+    if done == 0:
+        raise ValueError("Keine Läufe vorhanden")
+
+    return {name: {'ruin_probability': ruined[i] / done,
+                   'balance_mean': balance_sum[i] / done,
+                   'debt': flows['balance'][i],
+                   'interest': float(flows['interest'][i].sum())}
+            for i, name in enumerate(names)}
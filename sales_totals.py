@@ -0,0 +1,49 @@
+"""
+Laufende Verkaufssummen der Streamlit-Engine (simulation_engine.py).
+
+Jeder Verkauf wird beim Verbuchen zusätzlich in Tabellen nach Monat, Quartal, Markt und
+Fahrradtyp aufaddiert. Berichte lesen diese fertigen Tabellen, statt die Verkaufshistorie
+bei jedem Aufruf erneut zu durchlaufen:
+
+    sim.sales_totals.by_quarter        # {Quartal: Umsatz}
+    sim.sales_totals.by_bike_type      # {Fahrradtyp: {'quantity': ..., 'revenue': ...}}
+"""
+
+
+def quarter_of(month):
+    """Quartal (1, 2, ...) eines Spielmonats"""
+    return (month - 1) // 3 + 1
+
+
+class SalesTotals:
+    """Verkaufssummen: by_month und by_quarter (Umsatz), by_market und by_bike_type (Stück und Umsatz)"""
+
+    def __init__(self):
+        self.by_month = {}
+        self.by_quarter = {}
+        self.by_market = {}
+        self.by_bike_type = {}
+
+    def open_month(self, month):
+        """Legt die Summen eines Monats an, auch wenn in ihm nichts verkauft wird"""
+        self.by_month.setdefault(month, 0)
+        self.by_quarter.setdefault(quarter_of(month), 0)
+
+    def add(self, month, market, bike_type, quantity, revenue):
+        """Verbucht einen Verkauf (O(1))"""
+        self.open_month(month)
+        self.by_month[month] += revenue
+        self.by_quarter[quarter_of(month)] += revenue
+        for table, key in ((self.by_market, market), (self.by_bike_type, bike_type)):
+            entry = table.setdefault(key, {'quantity': 0, 'revenue': 0})
+            entry['quantity'] += quantity
+            entry['revenue'] += revenue
+
+    def copy(self):
+        """Unabhängige Kopie (O(Monate + Märkte + Fahrradtypen))"""
+        clone = SalesTotals.__new__(SalesTotals)
+        clone.by_month = dict(self.by_month)
+        clone.by_quarter = dict(self.by_quarter)
+        clone.by_market = {market: dict(entry) for market, entry in self.by_market.items()}
+        clone.by_bike_type = {bike_type: dict(entry) for bike_type, entry in self.by_bike_type.items()}
+        return clone
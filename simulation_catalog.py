@@ -0,0 +1,512 @@
+"""
+Unveränderlicher Spielkatalog der Fahrrad-Geschäftssimulation.
+
+Lieferanten, Bauanleitungen, Lagerflächen, Preise, Löhne, Mieten und Marktpräferenzen
+ändern sich während eines Spiels nicht. Sie werden deshalb einmal pro Prozess geladen
+und von allen Sitzungen gemeinsam genutzt; jede Sitzung hält nur noch ihren
+veränderlichen Zustand (Bestände, Guthaben, Personal, Historie).
+"""
+
+
+class FrozenDict(dict):
+    """Schreibgeschütztes Dictionary für gemeinsam genutzte Katalogdaten"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Katalogdaten sind schreibgeschützt")
+
+    __setitem__ = _readonly
+    __delitem__ = _readonly
+    clear = _readonly
+    pop = _readonly
+    popitem = _readonly
+    setdefault = _readonly
+    update = _readonly
+    __ior__ = _readonly
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        # Gemeinsame Daten werden beim Kopieren einer Simulation nicht vervielfältigt
+        return self
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+
+def freeze(data):
+    """Wandelt verschachtelte Dictionaries rekursiv in FrozenDicts um"""
+    if isinstance(data, dict):
+        return FrozenDict({key: freeze(value) for key, value in data.items()})
+    return data
+
+
+def thaw(data):
+    """Wandelt FrozenDicts rekursiv in normale Dictionaries zurück"""
+    if isinstance(data, dict):
+        return {key: thaw(value) for key, value in data.items()}
+    return data
+
+
+BIKE_TYPES = ('damenrad', 'e_bike', 'e_mountainbike', 'herrenrad', 'mountainbike', 'rennrad')
+
+
+def default_suppliers():
+    # Lieferanten-Daten gemäß der Beschreibung
+    return {
+        'velotech_supplies': {
+            'payment_term': 30,  # Tage
+            'delivery_time': 30,  # Tage
+            'complaint_probability': 0.08,  # vorher 0.095
+            'complaint_percentage': 0.15,  # vorher 0.18
+            'products': {
+                'laufradsatz_alpin': 170,  # vorher 180
+                'laufradsatz_ampere': 200,  # vorher 220
+                'laufradsatz_speed': 220,  # vorher 250
+                'laufradsatz_standard': 140,  # vorher 150
+                'rahmen_herren': 100,  # vorher 104
+                'rahmen_damen': 100,  # vorher 107
+                'rahmen_mountain': 135,  # vorher 145
+                'rahmen_renn': 120,  # vorher 130
+                'lenker_comfort': 40,
+                'lenker_sport': 60,
+                'sattel_comfort': 50,
+                'sattel_sport': 70,
+                'schaltung_albatross': 130,
+                'schaltung_gepard': 180,
+                'motor_standard': 400,
+                'motor_mountain': 600
+            }
+        },
+        'bikeparts_pro': {
+            'payment_term': 30,
+            'delivery_time': 30,
+            'complaint_probability': 0.06,  # vorher 0.07
+            'complaint_percentage': 0.12,  # vorher 0.15
+            'products': {
+                # Preise entsprechend angepasst für Premium-Zuschlag
+                'laufradsatz_alpin': 190,  # vorher 200
+                'laufradsatz_ampere': 220,  # vorher 240
+                'laufradsatz_speed': 250,  # vorher 280
+                'laufradsatz_standard': 160,  # vorher 170
+                'rahmen_herren': 110,  # vorher 115
+                'rahmen_damen': 110,  # vorher 120
+                'rahmen_mountain': 150,  # vorher 160
+                'rahmen_renn': 135,  # vorher 145
+                'lenker_comfort': 50,
+                'lenker_sport': 70,
+                'sattel_comfort': 60,
+                'sattel_sport': 80,
+                'schaltung_albatross': 150,
+                'schaltung_gepard': 200,
+                'motor_standard': 450,
+                'motor_mountain': 650
+            }
+        },
+        'radxpert': {
+            'payment_term': 30,
+            'delivery_time': 30,
+            'complaint_probability': 0.10,  # vorher 0.12
+            'complaint_percentage': 0.22,  # vorher 0.25
+            'products': {
+                'laufradsatz_alpin': 160,  # vorher 170
+                'laufradsatz_ampere': 190,  # vorher 210
+                'laufradsatz_speed': 210,  # vorher 230
+                'laufradsatz_standard': 130,  # vorher 140
+                'rahmen_herren': 90,  # vorher 95
+                'rahmen_damen': 90,  # vorher 100
+                'rahmen_mountain': 125,  # vorher 135
+                'rahmen_renn': 110  # vorher 120
+            }
+        },
+        'cyclocomp': {
+            'payment_term': 30,
+            'delivery_time': 30,
+            'complaint_probability': 0.15,  # vorher 0.18
+            'complaint_percentage': 0.25,  # vorher 0.3
+            'products': {
+                # Entsprechende Anpassungen für CycloComp
+                'laufradsatz_alpin': 150,  # vorher 160
+                'laufradsatz_ampere': 180,  # vorher 200
+                'laufradsatz_speed': 200,  # vorher 220
+                'laufradsatz_standard': 120,  # vorher 130
+                'rahmen_herren': 85,  # vorher 90
+                'rahmen_damen': 85,  # vorher 95
+                'rahmen_mountain': 115,  # vorher 120
+                'rahmen_renn': 100,  # vorher 110
+                'lenker_comfort': 30,
+                'lenker_sport': 45,
+                'sattel_comfort': 40,
+                'sattel_sport': 55,
+                'schaltung_albatross': 110,
+                'schaltung_gepard': 150,
+                'motor_standard': 350,
+                'motor_mountain': 500
+            }
+        },
+        'pedal_power_parts': {
+            'payment_term': 30,
+            'delivery_time': 30,
+            'complaint_probability': 0.09,  # vorher 0.105
+            'complaint_percentage': 0.18,  # vorher 0.2
+            'products': {
+                'schaltung_albatross': 125,
+                'schaltung_gepard': 175,
+                'motor_standard': 390,
+                'motor_mountain': 580
+            }
+        },
+        'gearshift_wholesale': {
+            'payment_term': 30,
+            'delivery_time': 30,
+            'complaint_probability': 0.12,  # vorher 0.145
+            'complaint_percentage': 0.22,  # vorher 0.27
+            'products': {
+                'lenker_comfort': 35,
+                'lenker_sport': 55,
+                'sattel_comfort': 45,
+                'sattel_sport': 65
+            }
+        }
+    }
+
+
+def default_bicycle_recipes():
+    # Fahrrad-Bauanleitungen gemäß der Beschreibung
+    return {
+        'rennrad': {
+            'laufradsatz': 'laufradsatz_speed',
+            'lenker': 'lenker_sport',
+            'rahmen': 'rahmen_renn',
+            'sattel': 'sattel_sport',
+            'schaltung': 'schaltung_gepard',
+            'motor': None,
+            'skilled_hours': 0.4,  # vorher 0.5
+            'unskilled_hours': 1.2  # vorher 1.3
+        },
+        'herrenrad': {
+            'laufradsatz': 'laufradsatz_standard',
+            'lenker': 'lenker_comfort',
+            'rahmen': 'rahmen_herren',
+            'sattel': 'sattel_comfort',
+            'schaltung': 'schaltung_albatross',
+            'motor': None,
+            'skilled_hours': 0.3,
+            'unskilled_hours': 1.7  # vorher 2.0
+        },
+        'damenrad': {
+            'laufradsatz': 'laufradsatz_standard',
+            'lenker': 'lenker_comfort',
+            'rahmen': 'rahmen_damen',
+            'sattel': 'sattel_comfort',
+            'schaltung': 'schaltung_albatross',
+            'motor': None,
+            'skilled_hours': 0.3,
+            'unskilled_hours': 1.7  # vorher 2.0
+        },
+        'mountainbike': {
+            'laufradsatz': 'laufradsatz_alpin',
+            'lenker': 'lenker_sport',
+            'rahmen': 'rahmen_mountain',
+            'sattel': 'sattel_sport',
+            'schaltung': 'schaltung_gepard',
+            'motor': None,
+            'skilled_hours': 0.6,  # vorher 0.7
+            'unskilled_hours': 1.2  # vorher 1.3
+        },
+        'e_mountainbike': {
+            'laufradsatz': 'laufradsatz_alpin',
+            'lenker': 'lenker_sport',
+            'rahmen': 'rahmen_mountain',
+            'sattel': 'sattel_sport',
+            'schaltung': 'schaltung_gepard',
+            'motor': 'motor_standard',
+            'skilled_hours': 0.9,  # vorher 1.0
+            'unskilled_hours': 1.4  # vorher 1.5
+        },
+        'e_bike': {
+            'laufradsatz': 'laufradsatz_ampere',
+            'lenker': 'lenker_comfort',
+            'rahmen': 'rahmen_herren',
+            'sattel': 'sattel_comfort',
+            'schaltung': 'schaltung_albatross',
+            'motor': 'motor_standard',
+            'skilled_hours': 0.7,  # vorher 0.8
+            'unskilled_hours': 1.3  # vorher 1.5
+        }
+    }
+
+
+def default_item_storage_space():
+    # Lagerplatz pro Stück in Metern
+    return {
+        'damenrad': 0.5,
+        'e_bike': 0.6,
+        'e_mountainbike': 0.6,
+        'herrenrad': 0.5,
+        'mountainbike': 0.6,
+        'rennrad': 0.5,
+        'laufradsatz_alpin': 0.1,
+        'laufradsatz_ampere': 0.1,
+        'laufradsatz_speed': 0.1,
+        'laufradsatz_standard': 0.1,
+        'lenker_comfort': 0.005,
+        'lenker_sport': 0.005,
+        'motor_standard': 0.05,
+        'motor_mountain': 0.05,
+        'rahmen_herren': 0.2,
+        'rahmen_damen': 0.2,
+        'rahmen_mountain': 0.2,
+        'rahmen_renn': 0.2,
+        'sattel_comfort': 0.001,
+        'sattel_sport': 0.001,
+        'schaltung_albatross': 0.001,
+        'schaltung_gepard': 0.001
+    }
+
+
+def default_start_inventory():
+    # Startbestand im Lager Deutschland
+    inventory = {
+        'laufradsatz_alpin': 15,  # vorher 10
+        'laufradsatz_ampere': 15,  # vorher 10
+        'laufradsatz_speed': 15,  # vorher 10
+        'laufradsatz_standard': 15,  # vorher 10
+        'rahmen_herren': 15,  # vorher 10
+        'rahmen_damen': 15,  # vorher 10
+        'rahmen_mountain': 15,  # vorher 10
+        'rahmen_renn': 15,  # vorher 10
+        'lenker_comfort': 15,  # vorher 10
+        'lenker_sport': 15,  # vorher 10
+        'sattel_comfort': 15,  # vorher 10
+        'sattel_sport': 15,  # vorher 10
+        'schaltung_albatross': 15,  # vorher 10
+        'schaltung_gepard': 15,  # vorher 10
+        'motor_standard': 15,  # vorher 10
+        'motor_mountain': 15,  # vorher 10
+    }
+    for bike_type in BIKE_TYPES:
+        inventory[bike_type] = 0
+    return inventory
+
+
+def default_market_preferences():
+    # Marktpräferenzen je Fahrradtyp
+    return {
+        'muenster': {
+            'herrenrad': 0.3,
+            'damenrad': 0.3,
+            'e_bike': 0.2,
+            'e_mountainbike': 0.05,
+            'mountainbike': 0.05,
+            'rennrad': 0.1
+        },
+        'toulouse': {
+            'herrenrad': 0.05,
+            'damenrad': 0.05,
+            'e_bike': 0.1,
+            'e_mountainbike': 0.25,
+            'mountainbike': 0.3,
+            'rennrad': 0.35
+        }
+    }
+
+
+def default_quality_levels():
+    # Qualitätsstufen: Preisaufschlag und Arbeitszeit relativ zur Standardqualität
+    return {
+        'budget': {'display_name': 'Einfach', 'price_factor': 0.7, 'labour_factor': 0.8},
+        'standard': {'display_name': 'Standard', 'price_factor': 1.0, 'labour_factor': 1.0},
+        'premium': {'display_name': 'Premium', 'price_factor': 1.5, 'labour_factor': 1.4}
+    }
+
+
+def default_quality_preferences():
+    # Anteil der Kunden je Qualitätsstufe (wie price_sensitivity der Konsolenversion)
+    return {
+        'muenster': {'budget': 0.50, 'standard': 0.35, 'premium': 0.15},
+        'toulouse': {'budget': 0.40, 'standard': 0.40, 'premium': 0.20}
+    }
+
+
+def default_price_elasticities():
+    # Preiselastizität der Nachfrage je Markt und Fahrradtyp (am Katalogpreis)
+    return {
+        'muenster': {
+            'herrenrad': 1.6,
+            'damenrad': 1.6,
+            'e_bike': 1.2,
+            'e_mountainbike': 1.4,
+            'mountainbike': 1.5,
+            'rennrad': 1.5
+        },
+        'toulouse': {
+            'herrenrad': 1.7,
+            'damenrad': 1.7,
+            'e_bike': 1.4,
+            'e_mountainbike': 1.1,
+            'mountainbike': 1.2,
+            'rennrad': 1.1
+        }
+    }
+
+
+def default_credit_options():
+    # Kreditangebote der Bank (siehe CreditOption in neo4j_create.cypher)
+    return {
+        'short_term': {
+            'display_name': 'Kurzfristiger Kredit',
+            'annual_interest': 0.10,
+            'duration_months': 3
+        },
+        'medium_term': {
+            'display_name': 'Mittelfristiger Kredit',
+            'annual_interest': 0.08,
+            'duration_months': 6
+        },
+        'long_term': {
+            'display_name': 'Langfristiger Kredit',
+            'annual_interest': 0.06,
+            'duration_months': 12
+        }
+    }
+
+
+class SimulationCatalog:
+    """
+    Sammlung aller Spieldaten, die sich während eines Spiels nicht ändern.
+    Alle Tabellen sind schreibgeschützt und dürfen von mehreren Sitzungen gleichzeitig
+    gelesen werden.
+    """
+
+    def __init__(self, suppliers=None, bicycle_recipes=None, item_storage_space=None,
+                 bicycle_prices=None, market_preferences=None, storage_space=None,
+                 worker_salaries=None, storage_rent=None, market_warehouses=None, shipping_costs=None,
+                 start_inventory=None, initial_balance=80000, initial_skilled_workers=1,
+                 initial_unskilled_workers=2, credit_options=None, credit_limit=100000,
+                 price_elasticities=None, quality_levels=None, quality_preferences=None):
+        self.suppliers = freeze(suppliers if suppliers is not None else default_suppliers())
+        self.bicycle_recipes = freeze(bicycle_recipes if bicycle_recipes is not None
+                                      else default_bicycle_recipes())
+        self.item_storage_space = freeze(item_storage_space if item_storage_space is not None
+                                         else default_item_storage_space())
+
+        # Preise für verkaufte Fahrräder
+        self.bicycle_prices = freeze(bicycle_prices if bicycle_prices is not None else {
+            'damenrad': 620,
+            'e_bike': 1250,
+            'e_mountainbike': 1550,
+            'herrenrad': 620,
+            'mountainbike': 820,
+            'rennrad': 890
+        })
+
+        self.market_preferences = freeze(market_preferences if market_preferences is not None
+                                         else default_market_preferences())
+        self.price_elasticities = freeze(price_elasticities if price_elasticities is not None
+                                         else default_price_elasticities())
+
+        # Qualitätsstufen und Qualitätswünsche der Kunden je Markt
+        self.quality_levels = freeze(quality_levels if quality_levels is not None else default_quality_levels())
+        self.quality_preferences = freeze(quality_preferences if quality_preferences is not None
+                                          else default_quality_preferences())
+
+        # Lagerplatz-Informationen (Meter)
+        self.storage_space = freeze(storage_space if storage_space is not None else {
+            'germany': 1000,
+            'france': 500
+        })
+
+        # Löhne für Arbeiter (monatlich)
+        self.worker_salaries = freeze(worker_salaries if worker_salaries is not None else {
+            'skilled': 22 * 150,
+            'unskilled': 13 * 150
+        })
+
+        # Lagermieten (alle 3 Monate)
+        self.storage_rent = freeze(storage_rent if storage_rent is not None else {
+            'germany': 4500,
+            'france': 2250
+        })
+
+        # Nächstgelegenes Lager je Markt und Transportkosten pro Fahrrad
+        self.market_warehouses = freeze(market_warehouses if market_warehouses is not None else {
+            'muenster': 'germany',
+            'toulouse': 'france'
+        })
+        self.shipping_costs = freeze(shipping_costs if shipping_costs is not None else {
+            'local': 50,
+            'distant': 100
+        })
+
+        # Kreditangebote und Obergrenze für die gesamte offene Kreditsumme
+        self.credit_options = freeze(credit_options if credit_options is not None else default_credit_options())
+        self.credit_limit = credit_limit
+
+        # Startwerte einer neuen Sitzung
+        self.start_inventory = freeze(start_inventory if start_inventory is not None
+                                      else default_start_inventory())
+        self.initial_balance = initial_balance
+        self.initial_skilled_workers = initial_skilled_workers
+        self.initial_unskilled_workers = initial_unskilled_workers
+
+        # Abgeleitete Listen, die sonst bei jedem Bericht neu berechnet würden
+        self.bike_types = tuple(self.bicycle_recipes.keys())
+        self.part_names = tuple(item for item in self.start_inventory if item not in self.bicycle_recipes)
+        self.markets = tuple(self.market_preferences.keys())
+        self.qualities = tuple(self.quality_levels.keys())
+
+    def initial_inventory(self):
+        """Erzeugt den Startbestand an Teilen im Lager Deutschland für eine neue Sitzung"""
+        return {item: quantity for item, quantity in self.start_inventory.items() if item not in self.bicycle_recipes}
+
+    def __reduce__(self):
+        return _rebuild_catalog, (self.to_dict(),)
+
+    def to_dict(self):
+        """Gibt alle Katalogdaten als normales Dictionary zurück"""
+        return {
+            'suppliers': thaw(self.suppliers),
+            'bicycle_recipes': thaw(self.bicycle_recipes),
+            'item_storage_space': thaw(self.item_storage_space),
+            'bicycle_prices': thaw(self.bicycle_prices),
+            'market_preferences': thaw(self.market_preferences),
+            'storage_space': thaw(self.storage_space),
+            'worker_salaries': thaw(self.worker_salaries),
+            'storage_rent': thaw(self.storage_rent),
+            'market_warehouses': thaw(self.market_warehouses),
+            'shipping_costs': thaw(self.shipping_costs),
+            'start_inventory': thaw(self.start_inventory),
+            'initial_balance': self.initial_balance,
+            'initial_skilled_workers': self.initial_skilled_workers,
+            'initial_unskilled_workers': self.initial_unskilled_workers,
+            'credit_options': thaw(self.credit_options),
+            'credit_limit': self.credit_limit,
+            'price_elasticities': thaw(self.price_elasticities),
+            'quality_levels': thaw(self.quality_levels),
+            'quality_preferences': thaw(self.quality_preferences),
+        }
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def _rebuild_catalog(data):
+    return SimulationCatalog(**data)
+
+
+_DEFAULT_CATALOG = None
+
+
+def load_catalog():
+    """
+    Gibt den Standardkatalog zurück. Der Katalog wird nur beim ersten Aufruf
+    aufgebaut und danach im Prozess wiederverwendet.
+    """
+    global _DEFAULT_CATALOG
+    if _DEFAULT_CATALOG is None:
+        _DEFAULT_CATALOG = SimulationCatalog()
+    return _DEFAULT_CATALOG
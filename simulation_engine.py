@@ -0,0 +1,1090 @@
+"""
+Spiellogik der Fahrrad-Geschäftssimulation für die Streamlit-Oberfläche.
+
+Eine BicycleSimulation hält nur den veränderlichen Zustand einer Sitzung (Bestände,
+Guthaben, Personal und Historie). Alle unveränderlichen Spieldaten kommen aus dem
+gemeinsam genutzten SimulationCatalog.
+"""
+
+import copy
+import math
+import time
+
+import numpy as np
+
+from action_log import CountingRandom, recorded
+from demand_model import catalog_demand_model
+from event_scheduler import DAYS_PER_MONTH, EventScheduler, month_end, month_of_day, month_start
+from instrumentation import PhaseTimer
+from loans import LoanBook
+from metrics import MONTHS_SIMULATED, REPORT_SECONDS
+from price_optimizer import get_price_optimizer
+from sales_totals import SalesTotals
+from simulation_catalog import load_catalog
+
+try:
+    import streamlit as st
+except ImportError:
+    st = None
+
+
+# Datenstrukturen für die Simulation
+class BicycleSimulation:
+    # Markttage im Tagesmodus (Tag im Monat); jeder bedient einen gleichen Teil der Monatsnachfrage
+    MARKET_DAYS = (7, 14, 21, 28)
+
+    # Veränderliche Container, die sich ein Fork mit dem Original teilt, und wie sie vor dem
+    # ersten Schreiben kopiert werden. Historieneinträge ändern sich nach dem Anhängen nicht,
+    # bis auf den Verkaufseintrag des laufenden Monats (Tagesmodus), der mitkopiert wird.
+    COPY_ON_WRITE = {
+        'inventory_germany': dict,
+        'inventory_france': dict,
+        'bike_stock': np.copy,
+        'prices': lambda prices: {market: {bike_type: dict(by_quality) for bike_type, by_quality in by_type.items()}
+                                  for market, by_type in prices.items()},
+        'scheduler': EventScheduler.copy,
+        'loans': LoanBook.copy,
+        'expenses': list,
+        'revenues': list,
+        'production_history': list,
+        'sales_history': lambda history: history[:-1] + [copy.deepcopy(entry) for entry in history[-1:]],
+        'sales_totals': SalesTotals.copy,
+        'monthly_reports': list,
+    }
+
+    def __init__(self, catalog=None, ui=st, seed=None, lead_times=True, daily=False, demand_model=None):
+        # Gemeinsamer, unveränderlicher Spielkatalog
+        self.catalog = catalog if catalog is not None else load_catalog()
+
+        # Ausgabe für Fehler- und Warnmeldungen (None = keine Ausgabe)
+        self.ui = ui
+
+        # Zufallsquelle für Reklamationen und Nachfrage (seed für reproduzierbare Läufe);
+        # zählt ihre Position im Zufallsstrom für das Aktionsprotokoll
+        self.rng = CountingRandom(seed)
+
+        # Aktionsprotokoll (action_log.ActionLog) oder None
+        self.action_log = None
+
+        # Namen der mit einem Fork geteilten Container (siehe fork)
+        self._shared = set()
+
+        # Laufzeitmessung des Monatsabschlusses (standardmäßig ausgeschaltet)
+        self.timer = PhaseTimer()
+
+        # Meldet abgeschlossene Monate an die Kennzahlen (metrics.py); nur für das Spiel einer
+        # Sitzung, nicht für Hintergrundläufe wie Risikoanalyse, Empfehlung oder Forks
+        self.record_metrics = False
+
+        # Initialisierung der Simulation
+        self.current_month = 1
+        self.day = month_start(self.current_month)
+        self.balance = self.catalog.initial_balance
+
+        # Lieferungen und Rechnungen als Ereignisse; lead_times=False liefert und bezahlt sofort
+        self.lead_times = lead_times
+        self.scheduler = EventScheduler()
+
+        # Lagerbestände: Teile je Lager als Dictionary, Fahrräder als Array der Form
+        # (Standorte, Fahrradtypen, Qualitäten); Standorte sind die beiden Lager und die Märkte
+        self.inventory_germany = self.catalog.initial_inventory()
+        self.inventory_france = {key: 0 for key in self.inventory_germany.keys()}
+        self.bike_types = tuple(sorted(self.catalog.bike_types))
+        self.qualities = self.catalog.qualities
+        self.locations = ('germany', 'france') + tuple(self.catalog.markets)
+        self.location_index = {location: i for i, location in enumerate(self.locations)}
+        self.bike_index = {bike_type: i for i, bike_type in enumerate(self.bike_types)}
+        self.quality_index = {quality: i for i, quality in enumerate(self.qualities)}
+        self.bike_stock = np.zeros((len(self.locations), len(self.bike_types), len(self.qualities)), dtype=np.int64)
+        for bike_type, b in self.bike_index.items():
+            self.bike_stock[0, b, self.quality_index['standard']] = self.catalog.start_inventory.get(bike_type, 0)
+
+        # Kredite mit vorab berechneten Tilgungsplänen
+        self.loans = LoanBook()
+
+        # Personal
+        self.skilled_workers = self.catalog.initial_skilled_workers
+        self.unskilled_workers = self.catalog.initial_unskilled_workers
+
+        # Statistiken
+        self.expenses = []
+        self.revenues = []
+        self.production_history = []
+        self.sales_history = []
+        self.monthly_reports = []
+        # Laufende Summen der Verkäufe für die Berichte (nach Monat, Quartal, Markt, Fahrradtyp)
+        self.sales_totals = SalesTotals()
+
+        # Markt-Informationen: Präferenzen aus dem Katalog (die Bestände liegen in bike_stock)
+        self.markets = {
+            market: {
+                'preference': preferences,
+                'quality_preference': self.catalog.quality_preferences.get(market, {})
+            }
+            for market, preferences in self.catalog.market_preferences.items()
+        }
+
+        # Preisabhängige Nachfrage; Verkaufspreise je Markt, Typ und Qualität, anfangs die
+        # Referenzpreise des Nachfragemodells (Katalogpreis mal Preisfaktor der Qualität)
+        self.demand_model = demand_model if demand_model is not None else catalog_demand_model(self.catalog)
+        self.prices = {
+            market: {
+                bike_type: dict(zip(self.demand_model.qualities,
+                                    self.demand_model.reference_prices[self.demand_model.market_index[market],
+                                                                       self.demand_model.bike_index[bike_type]].tolist()))
+                for bike_type in self.bike_types
+            }
+            for market in self.markets
+        }
+
+        # Tagesmodus: Produktion und Verkäufe als Ereignisse an eigenen Tagen.
+        # Eine Änderung von self.daily wirkt ab dem nächsten Monat.
+        self.daily = daily
+        self._daily_sales_month = None
+        if daily:
+            self._schedule_market_days()
+
+    # Unveränderliche Spieldaten aus dem Katalog
+    @property
+    def suppliers(self):
+        return self.catalog.suppliers
+
+    @property
+    def bicycle_recipes(self):
+        return self.catalog.bicycle_recipes
+
+    @property
+    def storage_space(self):
+        return self.catalog.storage_space
+
+    @property
+    def item_storage_space(self):
+        return self.catalog.item_storage_space
+
+    @property
+    def bicycle_prices(self):
+        return self.catalog.bicycle_prices
+
+    @property
+    def worker_salaries(self):
+        return self.catalog.worker_salaries
+
+    @property
+    def storage_rent(self):
+        return self.catalog.storage_rent
+
+    def __getstate__(self):
+        # Oberfläche und Aktionsprotokoll gehören nicht zum Spielstand (Kopien laufen ohne Ausgabe)
+        state = self.__dict__.copy()
+        state['ui'] = None
+        state['action_log'] = None
+        state['record_metrics'] = False
+        # Eine Kopie teilt nichts mehr mit einem Fork
+        state['_shared'] = set()
+        return state
+
+    def fork(self, ui=None):
+        """
+        Günstige Kopie für Was-wäre-wenn-Zweige: Bestände, Preise, Ereignisse, Kredite und
+        Historie werden geteilt, bis eine der beiden Seiten sie ändert (copy-on-write).
+        Zufallsstrom und Skalare werden sofort kopiert; der Fork läuft ohne Protokoll und
+        standardmäßig ohne Ausgabe. Änderungen nur über die Methoden der Engine, direkte
+        Schreibzugriffe auf geteilte Container erreichen auch das Original.
+        """
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone.ui = ui
+        clone.action_log = None
+        clone.record_metrics = False
+        clone.timer = PhaseTimer()
+        clone.rng = copy.copy(self.rng)
+        clone._shared = set(self.COPY_ON_WRITE)
+        self._shared = set(self.COPY_ON_WRITE)
+        return clone
+
+    def _own(self, name):
+        """Container zum Schreiben; ist er mit einem Fork geteilt, wird er vorher kopiert"""
+        value = self.__dict__[name]
+        if name in self._shared:
+            value = self.COPY_ON_WRITE[name](value)
+            self.__dict__[name] = value
+            self._shared.discard(name)
+        return value
+
+    def _notify(self, level, message):
+        """Leitet Fehler- und Warnmeldungen an die Oberfläche weiter"""
+        if self.ui is not None:
+            getattr(self.ui, level)(message)
+
+    @recorded
+    def purchase_materials(self, order):
+        """
+        Bestellt Materialien von Lieferanten
+        order: Dictionary mit Lieferanten und bestellten Materialien
+        Mit Lieferzeiten wird die Ware nach delivery_time Tagen geliefert und die Rechnung
+        nach payment_term Tagen bezahlt (beides spätestens beim Monatsabschluss).
+        """
+        total_cost = 0
+        purchased_items = {}
+        defect_items = {}
+        deliveries = {}
+
+        for supplier, items in order.items():
+            if supplier not in self.suppliers:
+                self._notify('error', f"Unbekannter Lieferant: {supplier}")
+                continue
+
+            supplier_data = self.suppliers[supplier]
+            supplier_items = {}
+            supplier_cost = 0
+
+            for item, quantity in items.items():
+                if quantity <= 0:
+                    continue
+
+                # Überprüfen, ob der Artikel beim Lieferanten verfügbar ist
+                if item not in supplier_data['products']:
+                    self._notify('error', f"Artikel {item} ist bei {supplier} nicht verfügbar")
+                    continue
+
+                # Berechnen der Kosten
+                price = supplier_data['products'][item]
+                cost = price * quantity
+
+                # Zufällige Bestimmung, ob eine Reklamation auftritt
+                defects = 0
+                if self.rng.random() < supplier_data['complaint_probability']:
+                    # Anzahl defekter Teile bestimmen
+                    defects = int(quantity * supplier_data['complaint_percentage'])
+                    quantity -= defects
+                    cost = price * quantity
+                    if defects > 0:
+                        defect_items[item] = defect_items.get(item, 0) + defects
+
+                if quantity > 0:
+                    supplier_cost += cost
+                    supplier_items[item] = supplier_items.get(item, 0) + quantity
+                    purchased_items[item] = purchased_items.get(item, 0) + quantity
+
+            if not supplier_items:
+                continue
+            total_cost += supplier_cost
+
+            if self.lead_times:
+                # Lieferung und Rechnung als Ereignisse einplanen
+                delivery_day = self.day + supplier_data['delivery_time']
+                payment_day = self.day + supplier_data['payment_term']
+                self._own('scheduler').schedule(delivery_day, 'delivery', {'supplier': supplier, 'items': supplier_items})
+                self._own('scheduler').schedule(payment_day, 'payment', {'supplier': supplier, 'amount': supplier_cost})
+                deliveries[supplier] = {'delivery_day': delivery_day, 'payment_day': payment_day}
+            else:
+                # Füge die gekauften Materialien dem Lager Deutschland hinzu (Standard)
+                self._receive_delivery(supplier_items)
+                self._pay_invoice(supplier_cost, self.current_month)
+
+        # Sofort fällige Ereignisse (Lieferzeit bzw. Zahlungsziel 0) direkt verbuchen
+        self.process_events(self.day)
+
+        return {'cost': total_cost, 'items': purchased_items, 'defects': defect_items, 'deliveries': deliveries}
+
+    def _receive_delivery(self, items):
+        inventory = self._own('inventory_germany')
+        for item, quantity in items.items():
+            inventory[item] = inventory.get(item, 0) + quantity
+
+    def _pay_invoice(self, amount, month):
+        self.balance -= amount
+        if amount > 0:
+            self._own('expenses').append({'month': month, 'type': 'material', 'amount': amount})
+
+    # Verarbeitung der Ereignisse je Art
+    def _on_delivery(self, event):
+        self._receive_delivery(event.payload['items'])
+
+    def _on_payment(self, event):
+        self._pay_invoice(event.payload['amount'], month_of_day(event.day))
+
+    def _on_production(self, event):
+        self.add_bikes('germany', event.payload['bike_type'], event.payload['quantity'],
+                       event.payload.get('quality', 'standard'))
+
+    def _on_sales(self, event):
+        self._sell_in_market(event.payload['market'], event.payload['share'], month_of_day(event.day))
+
+    EVENT_HANDLERS = {
+        'delivery': _on_delivery,
+        'payment': _on_payment,
+        'production': _on_production,
+        'sales': _on_sales,
+    }
+
+    def process_events(self, until_day):
+        """Verbucht alle bis einschließlich until_day fälligen Ereignisse; gibt deren Anzahl zurück"""
+        processed = 0
+        for event in self._own('scheduler').pop_due(until_day):
+            self.day = max(self.day, event.day)
+            self.EVENT_HANDLERS[event.kind](self, event)
+            processed += 1
+        return processed
+
+    @property
+    def daily_active(self):
+        """Ob der laufende Monat tagesgenau simuliert wird"""
+        return self._daily_sales_month == self.current_month
+
+    @property
+    def day_of_month(self):
+        """Tag im laufenden Monat (0 = Monatsbeginn, 30 = Monatsende)"""
+        return self.day - month_start(self.current_month)
+
+    def next_event_day(self):
+        """Tag des nächsten eingeplanten Ereignisses oder None"""
+        return self.scheduler.next_day()
+
+    @recorded
+    def advance_to(self, day):
+        """
+        Spult im laufenden Monat bis zum Tag `day` vor (höchstens bis zum Monatsende) und
+        verbucht alle Ereignisse bis dahin. Tage ohne Ereignisse werden übersprungen.
+        """
+        day = min(day, month_end(self.current_month))
+        processed = self.process_events(day)
+        self.day = max(self.day, day)
+        return processed
+
+    def run_days(self, days):
+        """
+        Simuliert `days` Tage; an jedem Monatsende wird der Monat abgeschlossen.
+        Gibt die Monatsberichte der abgeschlossenen Monate zurück.
+        """
+        target = self.day + days
+        reports = []
+        while target >= month_end(self.current_month):
+            reports.append(self.close_month())
+        self.advance_to(target)
+        return reports
+
+    def _schedule_market_days(self):
+        """Plant die Markttage des laufenden Monats ein (Tagesmodus)"""
+        start = month_start(self.current_month)
+        share = 1 / len(self.MARKET_DAYS)
+        for day_of_month in self.MARKET_DAYS:
+            for market in self.markets:
+                self._own('scheduler').schedule(start + day_of_month, 'sales', {'market': market, 'share': share})
+        self._daily_sales_month = self.current_month
+
+    def _sales_entry(self, month):
+        """Eintrag der Verkaufshistorie für einen Monat (wird bei Bedarf angelegt)"""
+        sales_history = self._own('sales_history')
+        if sales_history and sales_history[-1]['month'] == month:
+            return sales_history[-1]['sales']
+        sales_data = {'total_revenue': 0, 'by_market': {market: {} for market in self.markets}}
+        sales_history.append({'month': month, 'sales': sales_data})
+        self._own('sales_totals').open_month(month)
+        return sales_data
+
+    def open_orders(self):
+        """Noch nicht gelieferte Bestellungen, nach Liefertag sortiert"""
+        return [{'day': event.day, 'supplier': event.payload['supplier'], 'items': event.payload['items']}
+                for event in self.scheduler.pending('delivery')]
+
+    def open_invoices(self):
+        """Noch nicht bezahlte Rechnungen, nach Zahlungstag sortiert"""
+        return [{'day': event.day, 'supplier': event.payload['supplier'], 'amount': event.payload['amount']}
+                for event in self.scheduler.pending('payment')]
+
+    @recorded
+    def take_loan(self, option, amount):
+        """
+        Nimmt einen Kredit auf. Der Betrag wird sofort gutgeschrieben (kein Umsatz), die Raten
+        werden ab dem Abschluss des Folgemonats fällig. Gibt den Kredit oder None zurück.
+        """
+        if option not in self.catalog.credit_options:
+            self._notify('error', f"Unbekannte Kreditart: {option}")
+            return None
+        if amount <= 0:
+            self._notify('error', "Der Kreditbetrag muss größer als 0 sein")
+            return None
+
+        available = self.catalog.credit_limit - self.debt
+        if amount > available:
+            self._notify('error', f"Kreditrahmen überschritten: höchstens {available:.2f} € verfügbar")
+            return None
+
+        terms = self.catalog.credit_options[option]
+        loan = self._own('loans').add(option, amount, terms['annual_interest'], terms['duration_months'], self.current_month)
+        self.balance += amount
+        return loan
+
+    @property
+    def debt(self):
+        """Offene Kreditsumme nach den bereits gezahlten Raten"""
+        return self.loans.outstanding(self.current_month - 1)
+
+    def active_loans(self):
+        """Laufende Kredite mit Rate und Restschuld"""
+        month = self.current_month - 1
+        return [loan.to_dict(month) for loan in self.loans.active(month)]
+
+    def pay_salaries(self):
+        """
+        Zahlt die Monatsgehälter der aktuellen Belegschaft
+        """
+        total_salary = (self.skilled_workers * self.worker_salaries['skilled']
+                        + self.unskilled_workers * self.worker_salaries['unskilled'])
+        if total_salary:
+            self.balance -= total_salary
+            self._own('expenses').append({'month': self.current_month, 'type': 'salary', 'amount': total_salary})
+        return {'total_salary': total_salary}
+
+    def pay_loan_installments(self):
+        """
+        Bucht die im aktuellen Monat fälligen Kreditraten ab (O(1) je Monat).
+        Nur der Zinsanteil ist Aufwand; die Tilgung senkt Guthaben und Restschuld.
+        """
+        payment, interest, principal = self.loans.due(self.current_month)
+        if payment:
+            self.balance -= payment
+            self._own('expenses').append({'month': self.current_month, 'type': 'interest', 'amount': interest})
+        return {'payment': payment, 'interest': interest, 'principal': principal}
+
+    # Fahrradbestände (Zugriff auf Zeilen von bike_stock)
+    def bike_counts(self, location):
+        """Fahrräder eines Standorts als {Fahrradtyp: Anzahl} über alle Qualitäten"""
+        return dict(zip(self.bike_types, self.bike_stock[self.location_index[location]].sum(axis=1).tolist()))
+
+    def bike_quality_counts(self, location):
+        """Fahrräder eines Standorts als {Fahrradtyp: {Qualität: Anzahl}}"""
+        rows = self.bike_stock[self.location_index[location]].tolist()
+        return {bike_type: dict(zip(self.qualities, row)) for bike_type, row in zip(self.bike_types, rows)}
+
+    def item_count(self, location, item, quality=None):
+        """Bestand eines Teils oder eines Fahrradtyps (optional nur einer Qualität) an einem Standort"""
+        if item in self.bike_index:
+            row = self.bike_stock[self.location_index[location], self.bike_index[item]]
+            return int(row.sum() if quality is None else row[self.quality_index[quality]])
+        inventory = self.inventory_germany if location == 'germany' else self.inventory_france
+        return inventory.get(item, 0)
+
+    def add_bikes(self, location, bike_type, quantity, quality='standard'):
+        self._own('bike_stock')[self.location_index[location], self.bike_index[bike_type], self.quality_index[quality]] += quantity
+
+    def remove_bikes(self, location, bike_type, quantity, quality=None):
+        """
+        Entnimmt bis zu `quantity` Fahrräder eines Typs; ohne Angabe der Qualität in der
+        Reihenfolge der Qualitätsstufen. Gibt die entnommenen Mengen je Qualität zurück.
+        """
+        row = self._own('bike_stock')[self.location_index[location], self.bike_index[bike_type]]
+        if quality is None:
+            # Vor jeder Qualität bereits entnommene Menge aus den kumulierten Beständen
+            taken_before = np.cumsum(row) - row
+            taken = np.minimum(row, np.maximum(0, quantity - taken_before))
+        else:
+            taken = np.zeros_like(row)
+            q = self.quality_index[quality]
+            taken[q] = min(row[q], quantity)
+        row -= taken
+        return taken
+
+    def _quality_weights(self, market, stock):
+        """
+        Anteile der Nachfrage je Qualität für Bestände (Fahrradtypen, Qualitäten): die Kundenwünsche
+        des Marktes, beschränkt auf vorrätige Qualitäten und je Fahrradtyp auf 1 normiert
+        """
+        preference = self.markets[market]['quality_preference']
+        shares = np.array([preference.get(quality, 1 / len(self.qualities)) for quality in self.qualities])
+        available = stock > 0
+        weights = shares * available
+        totals = weights.sum(axis=1, keepdims=True)
+        fallback = available / np.maximum(available.sum(axis=1, keepdims=True), 1)
+        return np.where(totals > 0, weights / np.where(totals > 0, totals, 1), fallback)
+
+    @recorded
+    def set_prices(self, market, prices):
+        """
+        Setzt Verkaufspreise eines Marktes: prices = {Fahrradtyp: {Qualität: Preis}}.
+        Ein einzelner Preis je Fahrradtyp gilt für die Standardqualität; die übrigen Qualitäten
+        werden mit ihrem Preisfaktor daraus abgeleitet.
+        """
+        for bike_type, price in prices.items():
+            if not isinstance(price, dict):
+                price = {quality: price * level['price_factor'] for quality, level in self.catalog.quality_levels.items()}
+            for quality, quality_price in price.items():
+                if quality_price <= 0:
+                    self._notify('error', f"Ungültiger Preis für {bike_type} ({quality}): {quality_price}")
+                    continue
+                self._own('prices')[market][bike_type][quality] = quality_price
+
+    def unit_costs(self):
+        """Materialkosten je Fahrradtyp beim jeweils günstigsten Lieferanten"""
+        costs = {}
+        for bike_type, recipe in self.bicycle_recipes.items():
+            cost = 0
+            for component_type, part in recipe.items():
+                if component_type in ['skilled_hours', 'unskilled_hours'] or part is None:
+                    continue
+                offers = [data['products'][part] for data in self.suppliers.values() if part in data['products']]
+                cost += min(offers, default=0)
+            costs[bike_type] = cost
+        return costs
+
+    def optimize_prices(self, market, objective='revenue'):
+        """
+        Umsatz- (objective='revenue') oder deckungsbeitragsmaximale Preise für die aktuellen
+        Bestände eines Marktes. Gibt {'prices', 'expected_sales', 'expected_revenue',
+        'expected_margin'} je Fahrradtyp und Qualität zurück; gleiche Bestände liefern das
+        zwischengespeicherte Ergebnis.
+        """
+        model = self.demand_model
+        stock = self.bike_stock[self.location_index[market]]
+        # Nachfrage je Typ wie beim Verkauf auf die vorrätigen Qualitäten verteilt
+        base = model.base_demand[model.market_index[market]].sum(axis=1, keepdims=True) * self._quality_weights(market, stock)
+        unit_costs = None
+        if objective == 'margin':
+            costs = self.unit_costs()
+            unit_costs = np.array([[costs.get(bike_type, 0)] for bike_type in model.bike_types], dtype=float)
+
+        result = get_price_optimizer(model).optimize(market, stock, unit_costs, objective, base)
+        return {name: {bike_type: dict(zip(model.qualities, row)) for bike_type, row in zip(model.bike_types, values.tolist())}
+                for name, values in result.items()}
+
+    @recorded
+    def transfer_inventory(self, transfers):
+        """
+        Transferiert Bestände zwischen Lagern
+        transfers: Dictionary mit zu transferierenden Artikeln und Mengen
+        """
+        admin_fee = 0
+        transferred_items = {}
+
+        if transfers:
+            admin_fee = 1000  # Verwaltungsgebühr für Transfers
+            self.balance -= admin_fee
+            self._own('expenses').append({'month': self.current_month, 'type': 'transfer', 'amount': admin_fee})
+
+            for item, transfer_data in transfers.items():
+                from_warehouse = transfer_data['from']
+                to_warehouse = transfer_data['to']
+                quantity = transfer_data['quantity']
+
+                if quantity <= 0:
+                    continue
+
+                # Fahrräder werden im Bestandsarray umgebucht (optional nur eine Qualität)
+                if item in self.bike_index:
+                    quality = transfer_data.get('quality')
+                    if self.item_count(from_warehouse, item, quality) < quantity:
+                        self._notify('error', f"Nicht genügend {item} im Lager {from_warehouse} vorhanden")
+                        continue
+                    taken = self.remove_bikes(from_warehouse, item, quantity, quality)
+                    self._own('bike_stock')[self.location_index[to_warehouse], self.bike_index[item]] += taken
+                    transferred_items[item] = quantity
+                    continue
+
+                # Überprüfen, ob genügend Bestand vorhanden ist
+                source_inventory = self._own('inventory_germany' if from_warehouse == 'germany' else 'inventory_france')
+                target_inventory = self._own('inventory_france' if from_warehouse == 'germany' else 'inventory_germany')
+
+                if item not in source_inventory or source_inventory[item] < quantity:
+                    self._notify('error', f"Nicht genügend {item} im Lager {from_warehouse} vorhanden")
+                    continue
+
+                # Transfer durchführen
+                source_inventory[item] -= quantity
+                target_inventory[item] = target_inventory.get(item, 0) + quantity
+                transferred_items[item] = quantity
+
+        return {'fee': admin_fee, 'items': transferred_items}
+
+    @recorded
+    def manage_workers(self, hire_skilled, fire_skilled, hire_unskilled, fire_unskilled):
+        """
+        Stellt Arbeiter ein oder entlässt sie. Die Gehälter werden beim Monatsabschluss
+        gezahlt (pay_salaries), nicht hier.
+        """
+        # Aktualisiere die Anzahl der Arbeiter
+        self.skilled_workers += hire_skilled - fire_skilled
+        self.unskilled_workers += hire_unskilled - fire_unskilled
+
+        # Stelle sicher, dass es keine negativen Arbeiterzahlen gibt
+        self.skilled_workers = max(0, self.skilled_workers)
+        self.unskilled_workers = max(0, self.unskilled_workers)
+
+        # Neue monatliche Gehälter
+        skilled_salary = self.skilled_workers * self.worker_salaries['skilled']
+        unskilled_salary = self.unskilled_workers * self.worker_salaries['unskilled']
+        total_salary = skilled_salary + unskilled_salary
+
+        return {
+            'skilled': {
+                'hired': hire_skilled,
+                'fired': fire_skilled,
+                'total': self.skilled_workers,
+                'salary': skilled_salary
+            },
+            'unskilled': {
+                'hired': hire_unskilled,
+                'fired': fire_unskilled,
+                'total': self.unskilled_workers,
+                'salary': unskilled_salary
+            },
+            'total_salary': total_salary
+        }
+
+    @recorded
+    def produce_bicycles(self, production_plan):
+        """
+        Produziert Fahrräder gemäß dem Produktionsplan
+        production_plan: Dictionary mit Fahrradtypen und Mengen; eine Menge gilt für die
+        Standardqualität, {Qualität: Menge} wählt die Qualitätsstufen. Die Arbeitszeit
+        skaliert mit dem labour_factor der Qualität, der Materialbedarf ist gleich.
+        """
+        # Arbeitszeit-Kapazitäten berechnen
+        skilled_capacity = self.skilled_workers * 150  # 150 Stunden pro Monat pro Facharbeiter
+        unskilled_capacity = self.unskilled_workers * 150  # 150 Stunden pro Monat pro Hilfsarbeiter
+
+        skilled_hours_used = 0
+        unskilled_hours_used = 0
+        production_results = {}
+        production_by_quality = {}
+        materials_used = {}
+
+        # Plan in Einträge (Fahrradtyp, Qualität, Menge) auflösen
+        entries = []
+        for bike_type, planned in production_plan.items():
+            by_quality = planned if isinstance(planned, dict) else {'standard': planned}
+            entries.extend((bike_type, quality, quantity) for quality, quantity in by_quality.items())
+
+        for bike_type, quality, quantity in entries:
+            if quantity <= 0:
+                continue
+
+            if bike_type not in self.bicycle_recipes:
+                self._notify('error', f"Unbekannter Fahrradtyp: {bike_type}")
+                continue
+            if quality not in self.quality_index:
+                self._notify('error', f"Unbekannte Qualität: {quality}")
+                continue
+
+            recipe = self.bicycle_recipes[bike_type]
+            labour_factor = self.catalog.quality_levels[quality]['labour_factor']
+            skilled_per_bike = recipe['skilled_hours'] * labour_factor
+            unskilled_per_bike = recipe['unskilled_hours'] * labour_factor
+
+            # Berechne benötigte Arbeitsstunden
+            skilled_hours_needed = skilled_per_bike * quantity
+            unskilled_hours_needed = unskilled_per_bike * quantity
+
+            # Überprüfe, ob genügend Arbeitskapazität vorhanden ist
+            if skilled_hours_used + skilled_hours_needed > skilled_capacity:
+                max_possible = int((skilled_capacity - skilled_hours_used) / skilled_per_bike)
+                self._notify(
+                    'warning', f"Nicht genügend Facharbeiterkapazität für {quantity} {bike_type}. Maximal möglich: {max_possible}")
+                quantity = max_possible
+
+            if unskilled_hours_used + unskilled_hours_needed > unskilled_capacity:
+                max_possible = int((unskilled_capacity - unskilled_hours_used) / unskilled_per_bike)
+                self._notify(
+                    'warning', f"Nicht genügend Hilfsarbeiterkapazität für {quantity} {bike_type}. Maximal möglich: {max_possible}")
+                quantity = max_possible
+
+            # Überprüfe, ob genügend Materialien vorhanden sind (kombiniert aus beiden Lagern)
+            can_produce = quantity
+            required_materials = {}
+
+            for component_type, component_name in recipe.items():
+                if component_type in ['skilled_hours', 'unskilled_hours'] or component_name is None:
+                    continue
+
+                total_available = self.inventory_germany.get(component_name, 0) + self.inventory_france.get(
+                    component_name, 0)
+
+                if total_available < quantity:
+                    can_produce = min(can_produce, total_available)
+                    self._notify(
+                        'warning', f"Nicht genügend {component_name} für {quantity} {bike_type}. Vorhanden: {total_available}")
+
+                required_materials[component_name] = quantity
+
+            # Aktualisiere Produktionsmenge basierend auf verfügbaren Materialien
+            quantity = can_produce
+
+            if quantity <= 0:
+                continue
+
+            # Verwende Materialien aus dem Lager (zunächst Deutschland, dann Frankreich)
+            for component_name, required_qty in required_materials.items():
+                # Anpassen an die tatsächliche Produktionsmenge
+                required_qty = quantity
+
+                # Erfasse verwendete Materialien
+                materials_used[component_name] = materials_used.get(component_name, 0) + required_qty
+
+                # Zuerst aus Deutschland nehmen
+                from_germany = min(self.inventory_germany.get(component_name, 0), required_qty)
+                self._own('inventory_germany')[component_name] -= from_germany
+                required_qty -= from_germany
+
+                # Dann aus Frankreich, falls noch etwas benötigt wird
+                if required_qty > 0:
+                    from_france = min(self.inventory_france.get(component_name, 0), required_qty)
+                    self._own('inventory_france')[component_name] -= from_france
+                    required_qty -= from_france
+
+            # Aktualisiere verwendete Arbeitsstunden
+            skilled_hours_used += skilled_per_bike * quantity
+            unskilled_hours_used += unskilled_per_bike * quantity
+
+            # Füge produzierte Fahrräder dem Lager Deutschland hinzu; im Tagesmodus erst,
+            # wenn die bis dahin eingeplanten Arbeitsstunden abgearbeitet sind
+            if self.daily:
+                workload = max(skilled_hours_used / skilled_capacity if skilled_capacity else 0,
+                               unskilled_hours_used / unskilled_capacity if unskilled_capacity else 0)
+                completion_day = min(self.day + max(1, math.ceil(workload * DAYS_PER_MONTH)),
+                                     month_end(self.current_month))
+                self._own('scheduler').schedule(completion_day, 'production',
+                                        {'bike_type': bike_type, 'quality': quality, 'quantity': quantity})
+            else:
+                self.add_bikes('germany', bike_type, quantity, quality)
+
+            # Speichere Produktionsergebnisse
+            production_results[bike_type] = production_results.get(bike_type, 0) + quantity
+            production_by_quality.setdefault(bike_type, {})[quality] = quantity
+
+        if production_results:
+            self._own('production_history').append({
+                'month': self.current_month,
+                'production': production_results,
+                'production_by_quality': production_by_quality,
+                'materials_used': materials_used,
+                'skilled_hours_used': skilled_hours_used,
+                'skilled_capacity': skilled_capacity,
+                'unskilled_hours_used': unskilled_hours_used,
+                'unskilled_capacity': unskilled_capacity
+            })
+
+        return {
+            'bikes': production_results,
+            'bikes_by_quality': production_by_quality,
+            'materials': materials_used,
+            'skilled_hours': skilled_hours_used,
+            'unskilled_hours': unskilled_hours_used
+        }
+
+    @recorded
+    def distribute_to_markets(self, distribution_plan):
+        """
+        Verteilt Fahrräder an die Märkte gemäß dem Verteilungsplan
+        distribution_plan: Dictionary mit Märkten und Fahrrädern; je Fahrradtyp eine Menge
+        (beliebige Qualitäten, in der Reihenfolge der Qualitätsstufen) oder {Qualität: Menge}
+        """
+        shipping_cost = 0
+        shipped_bikes = {}
+
+        for market, bikes in distribution_plan.items():
+            if market not in self.markets:
+                self._notify('error', f"Unbekannter Markt: {market}")
+                continue
+
+            shipped_bikes[market] = {}
+
+            # Nehme Fahrräder zuerst aus dem günstigeren Lager für den Transport
+            # (Münster wird aus Deutschland, Toulouse aus Frankreich beliefert)
+            if self.catalog.market_warehouses.get(market, 'germany') == 'germany':
+                local_warehouse, distant_warehouse = 'germany', 'france'
+            else:
+                local_warehouse, distant_warehouse = 'france', 'germany'
+
+            for bike_type, planned in bikes.items():
+                if bike_type not in self.bicycle_recipes:
+                    self._notify('error', f"Unbekannter Fahrradtyp: {bike_type}")
+                    continue
+
+                by_quality = planned.items() if isinstance(planned, dict) else [(None, planned)]
+                for quality, quantity in by_quality:
+                    if quantity <= 0:
+                        continue
+
+                    # Überprüfe, ob genügend Fahrräder im Lager vorhanden sind
+                    total_available = (self.item_count('germany', bike_type, quality)
+                                       + self.item_count('france', bike_type, quality))
+                    if total_available < quantity:
+                        self._notify(
+                            'warning', f"Nicht genügend {bike_type} auf Lager. Vorhanden: {total_available}, Benötigt: {quantity}")
+                        quantity = total_available
+
+                    if quantity <= 0:
+                        continue
+
+                    from_local = self.remove_bikes(local_warehouse, bike_type, quantity, quality)
+                    local_count = int(from_local.sum())
+                    shipping_cost += local_count * self.catalog.shipping_costs['local']  # 50€ pro Fahrrad
+
+                    # Falls noch mehr benötigt wird, nimm aus dem anderen Lager
+                    from_distant = self.remove_bikes(distant_warehouse, bike_type, quantity - local_count, quality)
+                    shipping_cost += int(from_distant.sum()) * self.catalog.shipping_costs['distant']  # 100€ pro Fahrrad
+
+                    # Aktualisiere die Fahrräder auf dem Markt
+                    self._own('bike_stock')[self.location_index[market], self.bike_index[bike_type]] += from_local + from_distant
+                    shipped_bikes[market][bike_type] = shipped_bikes[market].get(bike_type, 0) + quantity
+
+        # Ziehe die Transportkosten vom Guthaben ab
+        self.balance -= shipping_cost
+        if shipping_cost > 0:
+            self._own('expenses').append({'month': self.current_month, 'type': 'shipping', 'amount': shipping_cost})
+
+        return {
+            'cost': shipping_cost,
+            'bikes': shipped_bikes
+        }
+
+    def calculate_storage_usage(self):
+        """
+        Berechnet die aktuelle Nutzung der Lagerkapazität
+        """
+        # Fahrräder: Bestände beider Lager mal Platzbedarf je Typ
+        bike_space = np.array([self.item_storage_space.get(bike_type, 0) for bike_type in self.bike_types])
+        germany_usage, france_usage = (self.bike_stock[:2].sum(axis=2) @ bike_space).tolist()
+
+        for item, quantity in self.inventory_germany.items():
+            if item in self.item_storage_space:
+                germany_usage += quantity * self.item_storage_space[item]
+
+        for item, quantity in self.inventory_france.items():
+            if item in self.item_storage_space:
+                france_usage += quantity * self.item_storage_space[item]
+
+        return {
+            'germany': {
+                'used': germany_usage,
+                'total': self.storage_space['germany'],
+                'percentage': (germany_usage / self.storage_space['germany']) * 100 if self.storage_space[
+                                                                                           'germany'] > 0 else 0
+            },
+            'france': {
+                'used': france_usage,
+                'total': self.storage_space['france'],
+                'percentage': (france_usage / self.storage_space['france']) * 100 if self.storage_space[
+                                                                                         'france'] > 0 else 0
+            }
+        }
+
+    def _sell_in_market(self, market_name, share, month):
+        """
+        Verkauft in einem Markt gegen den Anteil `share` der Monatsnachfrage und verbucht
+        Umsatz und Verkaufshistorie für `month`. Gibt den Umsatz zurück.
+        Je Fahrradtyp wird eine Nachfrage gezogen und auf die vorrätigen Qualitäten verteilt;
+        alle Qualitäten werden gemeinsam als Zeilen des Bestandsarrays verrechnet.
+        """
+        preferences = self.markets[market_name]['preference']
+        sales_data = self._sales_entry(month)
+        market_sales = sales_data['by_market'].setdefault(market_name, {})
+
+        location = self.location_index[market_name]
+        active = np.flatnonzero(self.bike_stock[location].sum(axis=1) > 0)
+        if len(active) == 0:
+            return 0
+        stock = self.bike_stock[location, active]
+
+        # Zufällige Nachfrage je Fahrradtyp mit Präferenz als Einflussfaktor
+        # Höhere Präferenz = höhere durchschnittliche Nachfrage
+        draws = np.array([self.rng.gauss(preferences.get(self.bike_types[b], 0.05) * 100 * share, 20 * math.sqrt(share))
+                          for b in active])
+
+        # Aufteilung nach Qualitätswunsch; höherer Preis = geringere Nachfrage
+        model = self.demand_model
+        prices = model.price_array({market_name: self.prices[market_name]})
+        factors = model.price_factor(prices)[model.market_index[market_name], active]
+        demand = np.trunc(draws[:, None] * self._quality_weights(market_name, stock) * factors).astype(np.int64)
+
+        # Verkaufe die Mindestmenge aus Angebot und Nachfrage
+        sold = np.minimum(stock, np.maximum(0, demand))
+        revenue = sold * prices[model.market_index[market_name], active]
+        market_revenue = float(revenue.sum())
+
+        # Aktualisiere Inventar auf dem Markt
+        self._own('bike_stock')[location, active] = stock - sold
+
+        # Erfasse Verkaufsdaten (im Tagesmodus über die Markttage summiert)
+        totals = self._own('sales_totals')
+        for b, sold_row, revenue_row, demand_row in zip(active.tolist(), sold.tolist(), revenue.sum(axis=1).tolist(),
+                                                        demand.sum(axis=1).tolist()):
+            entry = market_sales.setdefault(self.bike_types[b], {'quantity': 0, 'revenue': 0, 'demand': 0,
+                                                                 'by_quality': dict.fromkeys(self.qualities, 0)})
+            entry['quantity'] += sum(sold_row)
+            entry['revenue'] += revenue_row
+            entry['demand'] += demand_row
+            for quality, quantity in zip(self.qualities, sold_row):
+                entry['by_quality'][quality] += quantity
+            totals.add(month, market_name, self.bike_types[b], sum(sold_row), revenue_row)
+
+        # Füge Einnahmen zum Guthaben hinzu
+        sales_data['total_revenue'] += market_revenue
+        self.balance += market_revenue
+        if market_revenue > 0:
+            self._own('revenues').append({'month': month, 'type': 'sales', 'amount': market_revenue})
+        return market_revenue
+
+    def simulate_sales(self):
+        """
+        Simuliert Verkäufe am Ende jedes Monats
+        """
+        for market_name in self.markets:
+            self._sell_in_market(market_name, 1, self.current_month)
+        return self.sales_history[-1]['sales']
+
+    def pay_quarterly_expenses(self):
+        """
+        Zahlt quartalsweise Ausgaben (Lagermieten etc.)
+        """
+        if self.current_month % 3 != 0:
+            return {'status': 'No quarterly expenses this month'}
+
+        # Lagermieten
+        rent_germany = self.storage_rent['germany']
+        rent_france = self.storage_rent['france']
+        total_rent = rent_germany + rent_france
+
+        # Ziehe Mieten vom Guthaben ab
+        self.balance -= total_rent
+        self._own('expenses').append({'month': self.current_month, 'type': 'rent', 'amount': total_rent})
+
+        return {
+            'germany_rent': rent_germany,
+            'france_rent': rent_france,
+            'total_rent': total_rent
+        }
+
+    def generate_monthly_report(self):
+        """
+        Generiert einen monatlichen Bericht über den Geschäftsstatus
+        """
+        # Berechne Summen
+        month_expenses = sum(item['amount'] for item in self.expenses if item['month'] == self.current_month)
+        month_revenues = sum(item['amount'] for item in self.revenues if item['month'] == self.current_month)
+        month_profit = month_revenues - month_expenses
+
+        # Lagernutzung
+        storage_usage = self.calculate_storage_usage()
+
+        # Inventarbericht
+        inventory_summary = {
+            'materials': {
+                'germany': {k: v for k, v in self.inventory_germany.items() if
+                            k not in ['damenrad', 'e_bike', 'e_mountainbike', 'herrenrad', 'mountainbike', 'rennrad']},
+                'france': {k: v for k, v in self.inventory_france.items() if
+                           k not in ['damenrad', 'e_bike', 'e_mountainbike', 'herrenrad', 'mountainbike', 'rennrad']}
+            },
+            'bicycles': {
+                'germany': self.bike_counts('germany'),
+                'france': self.bike_counts('france')
+            },
+            'markets': {market: self.bike_counts(market) for market in self.markets},
+            'bicycles_by_quality': {location: self.bike_quality_counts(location) for location in self.locations}
+        }
+
+        # Personalbestand
+        staff_summary = {
+            'skilled': self.skilled_workers,
+            'unskilled': self.unskilled_workers,
+            'total': self.skilled_workers + self.unskilled_workers
+        }
+
+        report = {
+            'month': self.current_month,
+            'balance': self.balance,
+            'debt': self.loans.outstanding(self.current_month),
+            'expenses': month_expenses,
+            'revenues': month_revenues,
+            'profit': month_profit,
+            'storage': storage_usage,
+            'inventory': inventory_summary,
+            'staff': staff_summary
+        }
+
+        self._own('monthly_reports').append(report)
+        return report
+
+    def advance_month(self):
+        """
+        Rückt zum nächsten Monat vor
+        """
+        self.current_month += 1
+        self.day = month_start(self.current_month)
+        if self.daily:
+            self._schedule_market_days()
+
+    @recorded
+    def close_month(self):
+        """
+        Monatsabschluss: fällige Lieferungen und Zahlungen, Gehälter, Quartalsausgaben, Kreditraten,
+        Verkäufe, Monatsbericht und Monatswechsel.
+        Jede Phase wird von self.timer gemessen, falls die Messung eingeschaltet ist.
+        Gibt den Monatsbericht zurück.
+        """
+        timer = self.timer
+        timer.start_month(self.current_month)
+
+        with timer.phase('process_events'):
+            self.process_events(month_end(self.current_month))
+        with timer.phase('pay_salaries'):
+            self.pay_salaries()
+        with timer.phase('pay_quarterly_expenses'):
+            self.pay_quarterly_expenses()
+        with timer.phase('pay_loan_installments'):
+            self.pay_loan_installments()
+        with timer.phase('simulate_sales'):
+            if self.daily_active:
+                # Tagesmodus: die Verkäufe sind bereits an den Markttagen verbucht
+                self._sales_entry(self.current_month)
+            else:
+                self.simulate_sales()
+        with timer.phase('generate_monthly_report'):
+            report_started = time.perf_counter()
+            report = self.generate_monthly_report()
+            if self.record_metrics:
+                REPORT_SECONDS.observe(time.perf_counter() - report_started)
+        with timer.phase('advance_month'):
+            self.advance_month()
+
+        timer.end_month()
+        if self.record_metrics:
+            MONTHS_SIMULATED.inc()
+        return report
+
+    def dashboard_reports(self):
+        """
+        Monatsberichte im Format der Konsolen-Dashboards (dashboards.py): Umsatz, Ausgaben,
+        Ergebnis sowie verkaufte Stückzahlen je Fahrradtyp und Qualität und Umsatz je Markt
+        """
+        sales_by_month = {entry['month']: entry['sales'] for entry in self.sales_history}
+        reports = []
+        for report in self.monthly_reports:
+            sales = sales_by_month.get(report['month'], {'by_market': {}})
+            sales_by_model = {}
+            sales_by_quality = dict.fromkeys(self.qualities, 0)
+            sales_by_market = {}
+            for market, market_sales in sales['by_market'].items():
+                sales_by_market[market] = sum(data['revenue'] for data in market_sales.values())
+                for bike_type, data in market_sales.items():
+                    sales_by_model[bike_type] = sales_by_model.get(bike_type, 0) + data['quantity']
+                    for quality, sold in data.get('by_quality', {}).items():
+                        sales_by_quality[quality] += sold
+
+            reports.append({
+                'month': report['month'],
+                'revenue': report['revenues'],
+                'expenses': report['expenses'],
+                'profit_loss': report['profit'],
+                'bikes_sold': sum(sales_by_model.values()),
+                'sales_by_model': sales_by_model,
+                'sales_by_quality': sales_by_quality,
+                'sales_by_market': sales_by_market
+            })
+        return reports
+
+    def is_bankrupt(self):
+        """
+        Überprüft, ob das Unternehmen bankrott ist
+        """
+        return self.balance <= 0
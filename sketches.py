@@ -0,0 +1,175 @@
+"""
+Zusammenfassungen für große Mengen von Simulationsläufen mit begrenztem Speicher.
+
+RunningMoments zählt Mittelwert und Varianz nach Welford (exakt), KLLSketch schätzt Quantile
+mit einer KLL-Skizze (Karnin, Lang, Liberty 2016), deren Größe nur logarithmisch mit der
+Anzahl der Werte wächst. Beide lassen sich zusammenführen (merge), sodass Worker-Prozesse
+eigene Teilergebnisse bilden und der Hauptprozess sie kombiniert. SeriesSketch fasst eine
+Kennzahl je Monat zusammen:
+
+    sketch = SeriesSketch(24)
+    for balances in runs:
+        sketch.add(balances)
+    sketch.quantiles((0.05, 0.5, 0.95))   # {q: Array der Länge 24}
+"""
+
+import math
+import random
+
+import numpy as np
+
+
+class RunningMoments:
+    """Anzahl, Mittelwert, Varianz, Minimum und Maximum elementweise über Arrays einer Form"""
+
+    def __init__(self, shape):
+        self.count = 0
+        self.mean = np.zeros(shape)
+        self._m2 = np.zeros(shape)
+        self.min = np.full(shape, np.inf)
+        self.max = np.full(shape, -np.inf)
+
+    def add(self, values):
+        values = np.asarray(values, dtype=float)
+        self.count += 1
+        delta = values - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (values - self.mean)
+        np.minimum(self.min, values, out=self.min)
+        np.maximum(self.max, values, out=self.max)
+
+    def merge(self, other):
+        """Nimmt die Werte eines anderen RunningMoments auf (Chan et al.)"""
+        if other.count == 0:
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self._m2 += other._m2 + delta ** 2 * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+        np.minimum(self.min, other.min, out=self.min)
+        np.maximum(self.max, other.max, out=self.max)
+        return self
+
+    @property
+    def variance(self):
+        """Stichprobenvarianz (0 bei weniger als zwei Werten)"""
+        return self._m2 / (self.count - 1) if self.count > 1 else np.zeros_like(self._m2)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+
+class KLLSketch:
+    """
+    Quantilskizze: Ebene h hält Werte mit Gewicht 2**h. Läuft eine Ebene über, wird sie
+    sortiert und jeder zweite Wert (zufällig gerade oder ungerade Positionen) wandert mit
+    doppeltem Gewicht eine Ebene höher. k bestimmt Genauigkeit und Größe (Rangfehler etwa 1/k).
+    """
+
+    def __init__(self, k=200, seed=None):
+        self.k = k
+        self.count = 0
+        self.compactors = [[]]
+        self._rng = random.Random(seed)
+
+    def _capacity(self, level):
+        depth = len(self.compactors) - level - 1
+        return max(2, math.ceil(self.k * (2 / 3) ** depth))
+
+    def __len__(self):
+        """Anzahl gespeicherter Werte"""
+        return sum(len(compactor) for compactor in self.compactors)
+
+    def add(self, value):
+        self.compactors[0].append(value)
+        self.count += 1
+        if len(self.compactors[0]) >= self._capacity(0):
+            self._compress()
+
+    def extend(self, values):
+        for value in values:
+            self.add(value)
+
+    def _compress(self):
+        level = 0
+        while level < len(self.compactors):
+            if len(self.compactors[level]) >= self._capacity(level):
+                if level + 1 == len(self.compactors):
+                    self.compactors.append([])
+                items = sorted(self.compactors[level])
+                # Bei ungerader Anzahl bleibt der größte Wert auf dieser Ebene
+                remainder = [items.pop()] if len(items) % 2 else []
+                self.compactors[level + 1].extend(items[self._rng.random() < 0.5::2])
+                self.compactors[level] = remainder
+            level += 1
+
+    def merge(self, other):
+        """Nimmt die Werte einer anderen Skizze auf; die andere Skizze bleibt unverändert"""
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append([])
+        for level, compactor in enumerate(other.compactors):
+            self.compactors[level].extend(compactor)
+        self.count += other.count
+        self._compress()
+        return self
+
+    def _weighted(self):
+        values = np.array([value for compactor in self.compactors for value in compactor], dtype=float)
+        weights = np.array([2 ** level for level, compactor in enumerate(self.compactors) for _ in compactor],
+                           dtype=float)
+        order = np.argsort(values, kind='stable')
+        return values[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs):
+        """Geschätzte Quantile für die Anteile qs (Array in derselben Reihenfolge)"""
+        if self.count == 0:
+            raise ValueError("Leere Skizze")
+        values, cumulative = self._weighted()
+        ranks = np.asarray(qs, dtype=float) * cumulative[-1]
+        positions = np.minimum(np.searchsorted(cumulative, ranks, side='left'), len(values) - 1)
+        return values[positions]
+
+    def quantile(self, q):
+        return float(self.quantiles([q])[0])
+
+
+class SeriesSketch:
+    """Eine Kennzahl je Zeitschritt (z. B. Monat): RunningMoments plus eine KLLSketch je Schritt"""
+
+    def __init__(self, length, k=200, seed=0):
+        self.length = length
+        self.moments = RunningMoments(length)
+        self.sketches = [KLLSketch(k, seed=seed * length + step) for step in range(length)]
+
+    @property
+    def count(self):
+        return self.moments.count
+
+    def add(self, series):
+        series = np.asarray(series, dtype=float)
+        self.moments.add(series)
+        for sketch, value in zip(self.sketches, series.tolist()):
+            sketch.add(value)
+
+    def merge(self, other):
+        if other.length != self.length:
+            raise ValueError(f"Unterschiedliche Längen: {self.length} und {other.length}")
+        self.moments.merge(other.moments)
+        for sketch, other_sketch in zip(self.sketches, other.sketches):
+            sketch.merge(other_sketch)
+        return self
+
+    def quantiles(self, qs):
+        """{q: Array der geschätzten Quantile je Zeitschritt}"""
+        values = np.array([sketch.quantiles(qs) for sketch in self.sketches]).T
+        return dict(zip(qs, values))
+
+    @property
+    def mean(self):
+        return self.moments.mean
+
+    @property
+    def std(self):
+        return self.moments.std
@@ -0,0 +1,100 @@
+"""
+Regelbasierte Spielstrategien für automatische Läufe der Streamlit-Engine.
+
+Eine Strategie ist eine Funktion strategy(sim), die zu Beginn eines Monats die Entscheidungen
+des Spielers trifft (Einkauf, Produktion, Verteilung). Den Monatsabschluss übernimmt der
+Aufrufer. Strategien sind Funktionen auf Modulebene, damit sie sich an Worker-Prozesse
+übergeben lassen.
+"""
+
+import math
+
+
+def passive(sim):
+    """Keine Entscheidungen: nur laufende Kosten und der Verkauf vorhandener Bestände"""
+
+
+def produce_to_capacity(sim, cash_reserve=20000):
+    """
+    Einfache Regelstrategie:
+    1. Alle Fahrräder aus den Lagern in den Markt mit der höchsten Präferenz verteilen.
+    2. Mit den vorhandenen Teilen bis zur Arbeitskapazität produzieren; die Mengen je
+       Fahrradtyp folgen der mittleren Marktpräferenz.
+    3. Fehlende Teile für den nächsten Monat beim günstigsten Lieferanten nachbestellen,
+       solange cash_reserve auf dem Konto bleibt.
+    """
+    # 1. Verteilung der fertigen Räder (beide Lager zusammen, alle Qualitäten)
+    warehouse_stock = sim.bike_stock[:2].sum(axis=(0, 2)).tolist()
+    distribution = {}
+    for bike_type, count in zip(sim.bike_types, warehouse_stock):
+        if count > 0:
+            market = max(sim.markets, key=lambda m: sim.markets[m]['preference'].get(bike_type, 0))
+            distribution.setdefault(market, {})[bike_type] = count
+    if distribution:
+        sim.distribute_to_markets(distribution)
+
+    # 2. Produktion nach Präferenz bis zur Arbeitskapazität
+    plan = capacity_plan(sim)
+    if plan:
+        sim.produce_bicycles(plan)
+
+    # 3. Teile für den Plan des nächsten Monats nachbestellen
+    required = {}
+    for bike_type, quantity in plan.items():
+        for component_type, part in sim.bicycle_recipes[bike_type].items():
+            if component_type in ['skilled_hours', 'unskilled_hours'] or part is None:
+                continue
+            required[part] = required.get(part, 0) + quantity
+
+    order, cost = {}, 0
+    for part, quantity in required.items():
+        missing = quantity - sim.item_count('germany', part) - sim.item_count('france', part)
+        offers = [(data['products'][part], supplier) for supplier, data in sim.suppliers.items()
+                  if part in data['products']]
+        if missing <= 0 or not offers:
+            continue
+        price, supplier = min(offers)
+        order.setdefault(supplier, {})[part] = missing
+        cost += price * missing
+
+    budget = sim.balance - cash_reserve
+    if cost > 0 and budget > 0:
+        scale = min(1.0, budget / cost)
+        order = {supplier: {part: int(quantity * scale) for part, quantity in items.items()}
+                 for supplier, items in order.items()}
+        sim.purchase_materials(order)
+
+
+def capacity_plan(sim):
+    """
+    Produktionsplan {Fahrradtyp: Menge}, der die Arbeitszeit beider Arbeitergruppen
+    möglichst ausschöpft; die Anteile der Typen entsprechen der mittleren Marktpräferenz.
+    """
+    weights = {bike_type: sum(market['preference'].get(bike_type, 0) for market in sim.markets.values())
+               for bike_type in sim.bicycle_recipes}
+    total_weight = sum(weights.values())
+    if total_weight <= 0:
+        return {}
+
+    recipes = sim.bicycle_recipes
+    skilled_per_unit = sum(weights[b] / total_weight * recipes[b]['skilled_hours'] for b in weights)
+    unskilled_per_unit = sum(weights[b] / total_weight * recipes[b]['unskilled_hours'] for b in weights)
+    bikes = min(sim.skilled_workers * 150 / skilled_per_unit if skilled_per_unit > 0 else math.inf,
+                sim.unskilled_workers * 150 / unskilled_per_unit if unskilled_per_unit > 0 else math.inf)
+    if not math.isfinite(bikes):
+        return {}
+
+    plan = {bike_type: int(bikes * weight / total_weight) for bike_type, weight in weights.items()}
+    return {bike_type: quantity for bike_type, quantity in plan.items() if quantity > 0}
+
+
+# Auswahl für Oberflächen und Kommandozeile
+STRATEGIES = {
+    'passive': passive,
+    'produce_to_capacity': produce_to_capacity,
+}
+
+STRATEGY_NAMES = {
+    'passive': "Abwarten (keine Entscheidungen)",
+    'produce_to_capacity': "Produktion bis zur Kapazität",
+}
@@ -1,10 +1,27 @@
 import streamlit as st
 import pandas as pd
-import random
-import json
+import multiprocessing
+import os
+import pickle
+import threading
+import time
+import uuid
 import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+import metrics
+from action_log import ActionLog, state_hash
+from advisor import apply_plan, recommend
+from autopilot import AUTOPILOT_FILE, autopilot_available, load_autopilot
+from render_service import get_service as get_render_service
+from result_cache import ResultCache
+from risk_analysis import risk_report
+from simulation_catalog import load_catalog
+from simulation_engine import BicycleSimulation
+from strategies import STRATEGIES, STRATEGY_NAMES, produce_to_capacity
+from undo_stack import UndoStack
+
 # Seitenkonfiguration
 st.set_page_config(
     page_title="Fahrrad-Geschäftssimulation",
@@ -14,828 +31,168 @@ st.set_page_config(
 )
 
 
-# Datenstrukturen für die Simulation
-class BicycleSimulation:
-    def __init__(self):
-        # Initialisierung der Simulation
-        self.current_month = 1
-        self.balance = 80000  # Startguthaben: 80.000€
-
-        # Lagerbestände
-        self.inventory_germany = {
-            'laufradsatz_alpin': 15,  # vorher 10
-            'laufradsatz_ampere': 15,  # vorher 10
-            'laufradsatz_speed': 15,  # vorher 10
-            'laufradsatz_standard': 15,  # vorher 10
-            'rahmen_herren': 15,  # vorher 10
-            'rahmen_damen': 15,  # vorher 10
-            'rahmen_mountain': 15,  # vorher 10
-            'rahmen_renn': 15,  # vorher 10
-            'lenker_comfort': 15,  # vorher 10
-            'lenker_sport': 15,  # vorher 10
-            'sattel_comfort': 15,  # vorher 10
-            'sattel_sport': 15,  # vorher 10
-            'schaltung_albatross': 15,  # vorher 10
-            'schaltung_gepard': 15,  # vorher 10
-            'motor_standard': 15,  # vorher 10
-            'motor_mountain': 15,  # vorher 10
-            'damenrad': 0,
-            'e_bike': 0,
-            'e_mountainbike': 0,
-            'herrenrad': 0,
-            'mountainbike': 0,
-            'rennrad': 0
-        }
-
-        self.inventory_france = {key: 0 for key in self.inventory_germany.keys()}
-
-        # Personal
-        self.skilled_workers = 1
-        self.unskilled_workers = 2
-
-        # Statistiken
-        self.expenses = []
-        self.revenues = []
-        self.production_history = []
-        self.sales_history = []
-        self.monthly_reports = []
-
-        # Lieferanten-Daten
-        self.suppliers = self.initialize_suppliers()
-
-        # Fahrrad-Bauanleitungen
-        self.bicycle_recipes = self.initialize_bicycle_recipes()
-
-        # Lagerplatz-Informationen
-        self.storage_space = {
-            'germany': 1000,  # Meter
-            'france': 500  # Meter
-        }
-
-        self.item_storage_space = {
-            'damenrad': 0.5,
-            'e_bike': 0.6,
-            'e_mountainbike': 0.6,
-            'herrenrad': 0.5,
-            'mountainbike': 0.6,
-            'rennrad': 0.5,
-            'laufradsatz_alpin': 0.1,
-            'laufradsatz_ampere': 0.1,
-            'laufradsatz_speed': 0.1,
-            'laufradsatz_standard': 0.1,
-            'lenker_comfort': 0.005,
-            'lenker_sport': 0.005,
-            'motor_standard': 0.05,
-            'motor_mountain': 0.05,
-            'rahmen_herren': 0.2,
-            'rahmen_damen': 0.2,
-            'rahmen_mountain': 0.2,
-            'rahmen_renn': 0.2,
-            'sattel_comfort': 0.001,
-            'sattel_sport': 0.001,
-            'schaltung_albatross': 0.001,
-            'schaltung_gepard': 0.001
-        }
-
-        # Markt-Informationen
-        self.markets = {
-            'muenster': {
-                'preference': {
-                    'herrenrad': 0.3,
-                    'damenrad': 0.3,
-                    'e_bike': 0.2,
-                    'e_mountainbike': 0.05,
-                    'mountainbike': 0.05,
-                    'rennrad': 0.1
-                },
-                'bicycles': {
-                    'damenrad': 0,
-                    'e_bike': 0,
-                    'e_mountainbike': 0,
-                    'herrenrad': 0,
-                    'mountainbike': 0,
-                    'rennrad': 0
-                }
-            },
-            'toulouse': {
-                'preference': {
-                    'herrenrad': 0.05,
-                    'damenrad': 0.05,
-                    'e_bike': 0.1,
-                    'e_mountainbike': 0.25,
-                    'mountainbike': 0.3,
-                    'rennrad': 0.35
-                },
-                'bicycles': {
-                    'damenrad': 0,
-                    'e_bike': 0,
-                    'e_mountainbike': 0,
-                    'herrenrad': 0,
-                    'mountainbike': 0,
-                    'rennrad': 0
-                }
-            }
-        }
-
-        # Preise für verkaufte Fahrräder
-        self.bicycle_prices = {
-            'damenrad': 620,
-            'e_bike': 1250,
-            'e_mountainbike': 1550,
-            'herrenrad': 620,
-            'mountainbike': 820,
-            'rennrad': 890
-        }
-
-        # Löhne für Arbeiter (monatlich)
-        self.worker_salaries = {
-            'skilled': 22*150,
-            'unskilled': 13 * 150
-        }
-
-        # Lagermieten (alle 3 Monate)
-        self.storage_rent = {
-            'germany': 4500,
-            'france': 2250
-        }
-
-    def initialize_suppliers(self):
-        # Lieferanten-Daten gemäß der Beschreibung initialisieren
-        return {
-            'velotech_supplies': {
-                'payment_term': 30,  # Tage
-                'delivery_time': 30,  # Tage
-                'complaint_probability': 0.08,  # vorher 0.095
-                'complaint_percentage': 0.15,  # vorher 0.18
-                'products': {
-                    'laufradsatz_alpin': 170,  # vorher 180
-                    'laufradsatz_ampere': 200,  # vorher 220
-                    'laufradsatz_speed': 220,  # vorher 250
-                    'laufradsatz_standard': 140,  # vorher 150
-                    'rahmen_herren': 100,  # vorher 104
-                    'rahmen_damen': 100,  # vorher 107
-                    'rahmen_mountain': 135,  # vorher 145
-                    'rahmen_renn': 120,  # vorher 130
-                    'lenker_comfort': 40,
-                    'lenker_sport': 60,
-                    'sattel_comfort': 50,
-                    'sattel_sport': 70,
-                    'schaltung_albatross': 130,
-                    'schaltung_gepard': 180,
-                    'motor_standard': 400,
-                    'motor_mountain': 600
-                }
-            },
-            'bikeparts_pro': {
-                'payment_term': 30,
-                'delivery_time': 30,
-                'complaint_probability': 0.06,  # vorher 0.07
-                'complaint_percentage': 0.12,  # vorher 0.15
-                'products': {
-                    # Preise entsprechend angepasst für Premium-Zuschlag
-                    'laufradsatz_alpin': 190,  # vorher 200
-                    'laufradsatz_ampere': 220,  # vorher 240
-                    'laufradsatz_speed': 250,  # vorher 280
-                    'laufradsatz_standard': 160,  # vorher 170
-                    'rahmen_herren': 110,  # vorher 115
-                    'rahmen_damen': 110,  # vorher 120
-                    'rahmen_mountain': 150,  # vorher 160
-                    'rahmen_renn': 135,  # vorher 145
-                    'lenker_comfort': 50,
-                    'lenker_sport': 70,
-                    'sattel_comfort': 60,
-                    'sattel_sport': 80,
-                    'schaltung_albatross': 150,
-                    'schaltung_gepard': 200,
-                    'motor_standard': 450,
-                    'motor_mountain': 650
-                }
-            },
-            'radxpert': {
-                'payment_term': 30,
-                'delivery_time': 30,
-                'complaint_probability': 0.10,  # vorher 0.12
-                'complaint_percentage': 0.22,  # vorher 0.25
-                'products': {
-                    'laufradsatz_alpin': 160,  # vorher 170
-                    'laufradsatz_ampere': 190,  # vorher 210
-                    'laufradsatz_speed': 210,  # vorher 230
-                    'laufradsatz_standard': 130,  # vorher 140
-                    'rahmen_herren': 90,  # vorher 95
-                    'rahmen_damen': 90,  # vorher 100
-                    'rahmen_mountain': 125,  # vorher 135
-                    'rahmen_renn': 110  # vorher 120
-                }
-            },
-            'cyclocomp': {
-                'payment_term': 30,
-                'delivery_time': 30,
-                'complaint_probability': 0.15,  # vorher 0.18
-                'complaint_percentage': 0.25,  # vorher 0.3
-                'products': {
-                    # Entsprechende Anpassungen für CycloComp
-                    'laufradsatz_alpin': 150,  # vorher 160
-                    'laufradsatz_ampere': 180,  # vorher 200
-                    'laufradsatz_speed': 200,  # vorher 220
-                    'laufradsatz_standard': 120,  # vorher 130
-                    'rahmen_herren': 85,  # vorher 90
-                    'rahmen_damen': 85,  # vorher 95
-                    'rahmen_mountain': 115,  # vorher 120
-                    'rahmen_renn': 100,  # vorher 110
-                    'lenker_comfort': 30,
-                    'lenker_sport': 45,
-                    'sattel_comfort': 40,
-                    'sattel_sport': 55,
-                    'schaltung_albatross': 110,
-                    'schaltung_gepard': 150,
-                    'motor_standard': 350,
-                    'motor_mountain': 500
-                }
-            },
-            'pedal_power_parts': {
-                'payment_term': 30,
-                'delivery_time': 30,
-                'complaint_probability': 0.09,  # vorher 0.105
-                'complaint_percentage': 0.18,  # vorher 0.2
-                'products': {
-                    'schaltung_albatross': 125,
-                    'schaltung_gepard': 175,
-                    'motor_standard': 390,
-                    'motor_mountain': 580
-                }
-            },
-            'gearshift_wholesale': {
-                'payment_term': 30,
-                'delivery_time': 30,
-                'complaint_probability': 0.12,  # vorher 0.145
-                'complaint_percentage': 0.22,  # vorher 0.27
-                'products': {
-                    'lenker_comfort': 35,
-                    'lenker_sport': 55,
-                    'sattel_comfort': 45,
-                    'sattel_sport': 65
-                }
-            }
-        }
-
-    def initialize_bicycle_recipes(self):
-        # Fahrrad-Bauanleitungen gemäß der Beschreibung initialisieren
-        return {
-            'rennrad': {
-                'laufradsatz': 'laufradsatz_speed',
-                'lenker': 'lenker_sport',
-                'rahmen': 'rahmen_renn',
-                'sattel': 'sattel_sport',
-                'schaltung': 'schaltung_gepard',
-                'motor': None,
-                'skilled_hours': 0.4,  # vorher 0.5
-                'unskilled_hours': 1.2  # vorher 1.3
-            },
-            'herrenrad': {
-                'laufradsatz': 'laufradsatz_standard',
-                'lenker': 'lenker_comfort',
-                'rahmen': 'rahmen_herren',
-                'sattel': 'sattel_comfort',
-                'schaltung': 'schaltung_albatross',
-                'motor': None,
-                'skilled_hours': 0.3,
-                'unskilled_hours': 1.7  # vorher 2.0
-            },
-            'damenrad': {
-                'laufradsatz': 'laufradsatz_standard',
-                'lenker': 'lenker_comfort',
-                'rahmen': 'rahmen_damen',
-                'sattel': 'sattel_comfort',
-                'schaltung': 'schaltung_albatross',
-                'motor': None,
-                'skilled_hours': 0.3,
-                'unskilled_hours': 1.7  # vorher 2.0
-            },
-            'mountainbike': {
-                'laufradsatz': 'laufradsatz_alpin',
-                'lenker': 'lenker_sport',
-                'rahmen': 'rahmen_mountain',
-                'sattel': 'sattel_sport',
-                'schaltung': 'schaltung_gepard',
-                'motor': None,
-                'skilled_hours': 0.6,  # vorher 0.7
-                'unskilled_hours': 1.2  # vorher 1.3
-            },
-            'e_mountainbike': {
-                'laufradsatz': 'laufradsatz_alpin',
-                'lenker': 'lenker_sport',
-                'rahmen': 'rahmen_mountain',
-                'sattel': 'sattel_sport',
-                'schaltung': 'schaltung_gepard',
-                'motor': 'motor_standard',
-                'skilled_hours': 0.9,  # vorher 1.0
-                'unskilled_hours': 1.4  # vorher 1.5
-            },
-            'e_bike': {
-                'laufradsatz': 'laufradsatz_ampere',
-                'lenker': 'lenker_comfort',
-                'rahmen': 'rahmen_herren',
-                'sattel': 'sattel_comfort',
-                'schaltung': 'schaltung_albatross',
-                'motor': 'motor_standard',
-                'skilled_hours': 0.7,  # vorher 0.8
-                'unskilled_hours': 1.3  # vorher 1.5
-            }
-        }
-
-    def purchase_materials(self, order):
-        """
-        Bestellt Materialien von Lieferanten
-        order: Dictionary mit Lieferanten und bestellten Materialien
-        """
-        total_cost = 0
-        purchased_items = {}
-        defect_items = {}
-
-        for supplier, items in order.items():
-            if supplier not in self.suppliers:
-                st.error(f"Unbekannter Lieferant: {supplier}")
-                continue
-
-            supplier_data = self.suppliers[supplier]
-            for item, quantity in items.items():
-                if quantity <= 0:
-                    continue
-
-                # Überprüfen, ob der Artikel beim Lieferanten verfügbar ist
-                if item not in supplier_data['products']:
-                    st.error(f"Artikel {item} ist bei {supplier} nicht verfügbar")
-                    continue
-
-                # Berechnen der Kosten
-                price = supplier_data['products'][item]
-                cost = price * quantity
-
-                # Zufällige Bestimmung, ob eine Reklamation auftritt
-                defects = 0
-                if random.random() < supplier_data['complaint_probability']:
-                    # Anzahl defekter Teile bestimmen
-                    defects = int(quantity * supplier_data['complaint_percentage'])
-                    quantity -= defects
-                    cost = price * quantity
-                    if defects > 0:
-                        defect_items[item] = defect_items.get(item, 0) + defects
-
-                if quantity > 0:
-                    total_cost += cost
-                    purchased_items[item] = purchased_items.get(item, 0) + quantity
-                    # Füge die gekauften Materialien dem Lager Deutschland hinzu (Standard)
-                    self.inventory_germany[item] = self.inventory_germany.get(item, 0) + quantity
-
-        # Kosten vom Guthaben abziehen
-        self.balance -= total_cost
-        if total_cost > 0:
-            self.expenses.append({'month': self.current_month, 'type': 'material', 'amount': total_cost})
-
-        return {'cost': total_cost, 'items': purchased_items, 'defects': defect_items}
-
-    def transfer_inventory(self, transfers):
-        """
-        Transferiert Bestände zwischen Lagern
-        transfers: Dictionary mit zu transferierenden Artikeln und Mengen
-        """
-        admin_fee = 0
-        transferred_items = {}
-
-        if transfers:
-            admin_fee = 1000  # Verwaltungsgebühr für Transfers
-            self.balance -= admin_fee
-            self.expenses.append({'month': self.current_month, 'type': 'transfer', 'amount': admin_fee})
-
-            for item, transfer_data in transfers.items():
-                from_warehouse = transfer_data['from']
-                to_warehouse = transfer_data['to']
-                quantity = transfer_data['quantity']
-
-                if quantity <= 0:
-                    continue
-
-                # Überprüfen, ob genügend Bestand vorhanden ist
-                source_inventory = self.inventory_germany if from_warehouse == 'germany' else self.inventory_france
-                target_inventory = self.inventory_france if from_warehouse == 'germany' else self.inventory_germany
-
-                if item not in source_inventory or source_inventory[item] < quantity:
-                    st.error(f"Nicht genügend {item} im Lager {from_warehouse} vorhanden")
-                    continue
-
-                # Transfer durchführen
-                source_inventory[item] -= quantity
-                target_inventory[item] = target_inventory.get(item, 0) + quantity
-                transferred_items[item] = quantity
-
-        return {'fee': admin_fee, 'items': transferred_items}
-
-    def manage_workers(self, hire_skilled, fire_skilled, hire_unskilled, fire_unskilled):
-        """
-        Stellt Arbeiter ein oder entlässt sie
-        """
-        # Aktualisiere die Anzahl der Arbeiter
-        self.skilled_workers += hire_skilled - fire_skilled
-        self.unskilled_workers += hire_unskilled - fire_unskilled
-
-        # Stelle sicher, dass es keine negativen Arbeiterzahlen gibt
-        self.skilled_workers = max(0, self.skilled_workers)
-        self.unskilled_workers = max(0, self.unskilled_workers)
-
-        # Berechne die Gehälter
-        skilled_salary = self.skilled_workers * self.worker_salaries['skilled']
-        unskilled_salary = self.unskilled_workers * self.worker_salaries['unskilled']
-        total_salary = skilled_salary + unskilled_salary
-
-        # Ziehe die Gehälter vom Guthaben ab
-        self.balance -= total_salary
-        self.expenses.append({'month': self.current_month, 'type': 'salary', 'amount': total_salary})
-
-        return {
-            'skilled': {
-                'hired': hire_skilled,
-                'fired': fire_skilled,
-                'total': self.skilled_workers,
-                'salary': skilled_salary
-            },
-            'unskilled': {
-                'hired': hire_unskilled,
-                'fired': fire_unskilled,
-                'total': self.unskilled_workers,
-                'salary': unskilled_salary
-            },
-            'total_salary': total_salary
-        }
-
-    def produce_bicycles(self, production_plan):
-        """
-        Produziert Fahrräder gemäß dem Produktionsplan
-        production_plan: Dictionary mit Fahrradtypen und Mengen
-        """
-        # Arbeitszeit-Kapazitäten berechnen
-        skilled_capacity = self.skilled_workers * 150  # 150 Stunden pro Monat pro Facharbeiter
-        unskilled_capacity = self.unskilled_workers * 150  # 150 Stunden pro Monat pro Hilfsarbeiter
-
-        skilled_hours_used = 0
-        unskilled_hours_used = 0
-        production_results = {}
-        materials_used = {}
-
-        for bike_type, quantity in production_plan.items():
-            if quantity <= 0:
-                continue
-
-            if bike_type not in self.bicycle_recipes:
-                st.error(f"Unbekannter Fahrradtyp: {bike_type}")
-                continue
-
-            recipe = self.bicycle_recipes[bike_type]
-
-            # Berechne benötigte Arbeitsstunden
-            skilled_hours_needed = recipe['skilled_hours'] * quantity
-            unskilled_hours_needed = recipe['unskilled_hours'] * quantity
-
-            # Überprüfe, ob genügend Arbeitskapazität vorhanden ist
-            if skilled_hours_used + skilled_hours_needed > skilled_capacity:
-                max_possible = int((skilled_capacity - skilled_hours_used) / recipe['skilled_hours'])
-                st.warning(
-                    f"Nicht genügend Facharbeiterkapazität für {quantity} {bike_type}. Maximal möglich: {max_possible}")
-                quantity = max_possible
-
-            if unskilled_hours_used + unskilled_hours_needed > unskilled_capacity:
-                max_possible = int((unskilled_capacity - unskilled_hours_used) / recipe['unskilled_hours'])
-                st.warning(
-                    f"Nicht genügend Hilfsarbeiterkapazität für {quantity} {bike_type}. Maximal möglich: {max_possible}")
-                quantity = max_possible
-
-            # Überprüfe, ob genügend Materialien vorhanden sind (kombiniert aus beiden Lagern)
-            can_produce = quantity
-            required_materials = {}
+# Beginn des Skriptlaufs für die Rerun-Kennzahl
+run_started = time.perf_counter()
+
+
+@st.cache_resource
+def get_catalog():
+    """Lädt den unveränderlichen Spielkatalog einmal pro Prozess für alle Sitzungen"""
+    return load_catalog()
 
-            for component_type, component_name in recipe.items():
-                if component_type in ['skilled_hours', 'unskilled_hours'] or component_name is None:
-                    continue
-
-                total_available = self.inventory_germany.get(component_name, 0) + self.inventory_france.get(
-                    component_name, 0)
-
-                if total_available < quantity:
-                    can_produce = min(can_produce, total_available)
-                    st.warning(
-                        f"Nicht genügend {component_name} für {quantity} {bike_type}. Vorhanden: {total_available}")
-
-                required_materials[component_name] = quantity
-
-            # Aktualisiere Produktionsmenge basierend auf verfügbaren Materialien
-            quantity = can_produce
-
-            if quantity <= 0:
-                continue
-
-            # Verwende Materialien aus dem Lager (zunächst Deutschland, dann Frankreich)
-            for component_name, required_qty in required_materials.items():
-                # Anpassen an die tatsächliche Produktionsmenge
-                required_qty = quantity
-
-                # Erfasse verwendete Materialien
-                materials_used[component_name] = materials_used.get(component_name, 0) + required_qty
-
-                # Zuerst aus Deutschland nehmen
-                from_germany = min(self.inventory_germany.get(component_name, 0), required_qty)
-                self.inventory_germany[component_name] -= from_germany
-                required_qty -= from_germany
-
-                # Dann aus Frankreich, falls noch etwas benötigt wird
-                if required_qty > 0:
-                    from_france = min(self.inventory_france.get(component_name, 0), required_qty)
-                    self.inventory_france[component_name] -= from_france
-                    required_qty -= from_france
-
-            # Aktualisiere verwendete Arbeitsstunden
-            skilled_hours_used += recipe['skilled_hours'] * quantity
-            unskilled_hours_used += recipe['unskilled_hours'] * quantity
-
-            # Füge produzierte Fahrräder dem Lager Deutschland hinzu
-            self.inventory_germany[bike_type] = self.inventory_germany.get(bike_type, 0) + quantity
-
-            # Speichere Produktionsergebnisse
-            production_results[bike_type] = quantity
-
-        if production_results:
-            self.production_history.append({
-                'month': self.current_month,
-                'production': production_results,
-                'materials_used': materials_used,
-                'skilled_hours_used': skilled_hours_used,
-                'skilled_capacity': skilled_capacity,
-                'unskilled_hours_used': unskilled_hours_used,
-                'unskilled_capacity': unskilled_capacity
-            })
-
-        return {
-            'bikes': production_results,
-            'materials': materials_used,
-            'skilled_hours': skilled_hours_used,
-            'unskilled_hours': unskilled_hours_used
-        }
-
-    def distribute_to_markets(self, distribution_plan):
-        """
-        Verteilt Fahrräder an die Märkte gemäß dem Verteilungsplan
-        distribution_plan: Dictionary mit Märkten und Fahrrädern
-        """
-        shipping_cost = 0
-        shipped_bikes = {}
-
-        for market, bikes in distribution_plan.items():
-            if market not in self.markets:
-                st.error(f"Unbekannter Markt: {market}")
-                continue
-
-            shipped_bikes[market] = {}
-
-            for bike_type, quantity in bikes.items():
-                if quantity <= 0:
-                    continue
-
-                if bike_type not in self.bicycle_recipes:
-                    st.error(f"Unbekannter Fahrradtyp: {bike_type}")
-                    continue
 
-                # Überprüfe, ob genügend Fahrräder im Lager vorhanden sind
-                total_available = self.inventory_germany.get(bike_type, 0) + self.inventory_france.get(bike_type, 0)
+@st.cache_resource
+def get_metrics_exporter():
+    """
+    Startet einmal pro Prozess den Kennzahlen-Export (Prometheus-Textformat):
+    BIKESIM_METRICS_PORT startet einen lokalen Endpunkt unter /metrics,
+    BIKESIM_METRICS_FILE schreibt die Kennzahlen nach jedem Skriptlauf in eine Datei.
+    """
+    port = os.environ.get("BIKESIM_METRICS_PORT")
+    return {
+        'server': metrics.start_http_server(int(port)) if port else None,
+        'file': os.environ.get("BIKESIM_METRICS_FILE"),
+        'sessions': {},  # Sitzungs-ID -> Zeitpunkt der letzten Aktivität
+        'memory_month': {},  # Sitzungs-ID -> Spielmonat der letzten Speichermessung
+        'lock': threading.Lock()
+    }
+
+
+@st.cache_resource
+def get_autopilot(path, modified):
+    """Lädt die beste Strategie der Autopilot-Datei; modified (Änderungszeit) lädt sie nach einer neuen Suche neu"""
+    return load_autopilot(path, catalog=get_catalog())
+
+
+@st.cache_resource
+def get_result_cache():
+    """Gemeinsamer Ergebnis-Cache für die Risikoanalyse (Verzeichnis über BIKESIM_CACHE_DIR)"""
+    return ResultCache()
+
+
+@st.cache_resource
+def get_advisor_executor():
+    """
+    Prozess-Pool für die Rollouts der Empfehlung, gemeinsam für alle Sitzungen.
+    BIKESIM_ADVISOR_WORKERS legt die Anzahl fest (Standard: Anzahl der CPUs); bei 1 wird im
+    Skript-Thread gerechnet (executor None).
+    """
+    workers = int(os.environ.get("BIKESIM_ADVISOR_WORKERS", os.cpu_count() or 1))
+    if workers <= 1:
+        return {'executor': None, 'workers': None}
+    return {'executor': ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')),
+            'workers': workers}
+
+
+def current_autopilot():
+    """Autopilot aus AUTOPILOT_FILE (von policy_search.py geschrieben) oder None"""
+    if not autopilot_available():
+        return None
+    return get_autopilot(AUTOPILOT_FILE, os.path.getmtime(AUTOPILOT_FILE))
+
+
+# Sitzungen ohne Aktivität in diesem Zeitraum gelten nicht mehr als aktiv
+SESSION_IDLE_SECONDS = 600
+
+
+def record_run_metrics(session_id, simulation):
+    """
+    Aktualisiert die Kennzahlen am Ende eines vollständigen Skriptlaufs. Der Speicherbedarf
+    (Pickle des Spielstands, O(Zustand)) wird nur einmal je Spielmonat gemessen.
+    """
+    exporter = get_metrics_exporter()
+    now = time.time()
+
+    with exporter['lock']:
+        exporter['sessions'][session_id] = now
+        idle = [sid for sid, seen in exporter['sessions'].items() if now - seen > SESSION_IDLE_SECONDS]
+        for sid in idle:
+            del exporter['sessions'][sid]
+            exporter['memory_month'].pop(sid, None)
+            metrics.SESSION_MEMORY_BYTES.remove(session=sid)
+            remove_action_log(sid)
+        metrics.ACTIVE_SESSIONS.set(len(exporter['sessions']))
+        sample_memory = exporter['memory_month'].get(session_id) != simulation.current_month
+        exporter['memory_month'][session_id] = simulation.current_month
+
+    if sample_memory:
+        metrics.SESSION_MEMORY_BYTES.set(len(pickle.dumps(simulation, pickle.HIGHEST_PROTOCOL)), session=session_id)
+    metrics.RERUN_SECONDS.observe(time.perf_counter() - run_started)
+
+    if exporter['file']:
+        metrics.REGISTRY.write_textfile(exporter['file'])
+
+
+# Einträge je Abschnitt des Aktionsprotokolls; danach beginnt ein neuer Abschnitt mit dem
+# aktuellen Stand, im Speicher und auf der Platte bleibt nur der vorige erhalten
+ACTION_LOG_MAX_ENTRIES = int(os.environ.get("BIKESIM_ACTION_LOG_MAX_ENTRIES", 2000))
+
+
+def action_log_path(session_id):
+    """Protokolldatei einer Sitzung in BIKESIM_ACTION_LOG_DIR oder None (nur im Speicher)"""
+    directory = os.environ.get("BIKESIM_ACTION_LOG_DIR")
+    if not directory:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"{session_id}.jsonl")
+
+
+def remove_action_log(session_id):
+    """
+    Löscht die Protokolldateien einer inaktiven Sitzung. Kehrt die Sitzung zurück, schreibt ihr
+    Protokoll den laufenden Abschnitt beim nächsten Eintrag vollständig neu.
+    """
+    path = action_log_path(session_id)
+    if path is None:
+        return
+    for name in (path, path + '.1'):
+        try:
+            os.remove(name)
+        except FileNotFoundError:
+            pass
+
 
-                if total_available < quantity:
-                    st.warning(
-                        f"Nicht genügend {bike_type} auf Lager. Vorhanden: {total_available}, Benötigt: {quantity}")
-                    quantity = total_available
-
-                if quantity <= 0:
-                    continue
-
-                # Nehme Fahrräder zuerst aus dem günstigeren Lager für den Transport
-                from_germany = 0
-                from_france = 0
-
-                # Bestimme die Transportkosten basierend auf Quelle und Ziel
-                if market == 'muenster':
-                    # Nimm zuerst aus Deutschland für Münster (billiger)
-                    from_germany = min(self.inventory_germany.get(bike_type, 0), quantity)
-                    self.inventory_germany[bike_type] -= from_germany
-                    shipping_cost += from_germany * 50  # 50€ pro Fahrrad von DE nach Münster
-
-                    # Falls noch mehr benötigt wird, nimm aus Frankreich
-                    if from_germany < quantity:
-                        from_france = min(self.inventory_france.get(bike_type, 0), quantity - from_germany)
-                        self.inventory_france[bike_type] -= from_france
-                        shipping_cost += from_france * 100  # 100€ pro Fahrrad von FR nach Münster
-
-                elif market == 'toulouse':
-                    # Nimm zuerst aus Frankreich für Toulouse (billiger)
-                    from_france = min(self.inventory_france.get(bike_type, 0), quantity)
-                    self.inventory_france[bike_type] -= from_france
-                    shipping_cost += from_france * 50  # 50€ pro Fahrrad von FR nach Toulouse
-
-                    # Falls noch mehr benötigt wird, nimm aus Deutschland
-                    if from_france < quantity:
-                        from_germany = min(self.inventory_germany.get(bike_type, 0), quantity - from_france)
-                        self.inventory_germany[bike_type] -= from_germany
-                        shipping_cost += from_germany * 100  # 500€ pro Fahrrad von DE nach Toulouse
-
-                # Aktualisiere die Fahrräder auf dem Markt
-                shipped_quantity = from_germany + from_france
-                self.markets[market]['bicycles'][bike_type] = self.markets[market]['bicycles'].get(bike_type,
-                                                                                                   0) + shipped_quantity
-                shipped_bikes[market][bike_type] = shipped_quantity
-
-        # Ziehe die Transportkosten vom Guthaben ab
-        self.balance -= shipping_cost
-        if shipping_cost > 0:
-            self.expenses.append({'month': self.current_month, 'type': 'shipping', 'amount': shipping_cost})
-
-        return {
-            'cost': shipping_cost,
-            'bikes': shipped_bikes
-        }
-
-    def calculate_storage_usage(self):
-        """
-        Berechnet die aktuelle Nutzung der Lagerkapazität
-        """
-        germany_usage = 0
-        france_usage = 0
-
-        for item, quantity in self.inventory_germany.items():
-            if item in self.item_storage_space:
-                germany_usage += quantity * self.item_storage_space[item]
-
-        for item, quantity in self.inventory_france.items():
-            if item in self.item_storage_space:
-                france_usage += quantity * self.item_storage_space[item]
-
-        return {
-            'germany': {
-                'used': germany_usage,
-                'total': self.storage_space['germany'],
-                'percentage': (germany_usage / self.storage_space['germany']) * 100 if self.storage_space[
-                                                                                           'germany'] > 0 else 0
-            },
-            'france': {
-                'used': france_usage,
-                'total': self.storage_space['france'],
-                'percentage': (france_usage / self.storage_space['france']) * 100 if self.storage_space[
-                                                                                         'france'] > 0 else 0
-            }
-        }
-
-    def simulate_sales(self):
-        """
-        Simuliert Verkäufe am Ende jedes Monats
-        """
-
-        total_revenue = 0
-        sales_by_market = {}
+# Initialisierung der Session-State-Variablen
+if 'simulation' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex[:12]
+    st.session_state.simulation = BicycleSimulation(catalog=get_catalog())
+    st.session_state.simulation.record_metrics = True
+    # Rückgängig/Wiederholen: bis zu 50 Stände je Sitzung als copy-on-write-Forks
+    st.session_state.undo = UndoStack()
+    # Jede Aktion wird protokolliert, damit sich das Spiel mit replay.py nachspielen lässt
+    ActionLog.attach(st.session_state.simulation, action_log_path(st.session_state.session_id),
+                     undo=st.session_state.undo, max_entries=ACTION_LOG_MAX_ENTRIES)
+    st.session_state.show_report = False
+    st.session_state.current_tab = "Übersicht"
+    st.session_state.monthly_action_taken = False
 
-        for market_name, market_data in self.markets.items():
-            sales_by_market[market_name] = {}
-            preferences = market_data['preference']
-            bicycles = market_data['bicycles']
 
-            for bike_type, quantity in bicycles.items():
-                if quantity <= 0:
-                    continue
+def checkpoint():
+    """Legt vor einer Aktion den aktuellen Stand für Rückgängig ab"""
+    st.session_state.undo.push(st.session_state.simulation)
 
-                # Simuliere Verkauf basierend auf Marktpräferenzen
-                preference_factor = preferences.get(bike_type, 0.05)
-                # Zufällige Nachfrage mit Präferenz als Einflussfaktor
-                # Höhere Präferenz = höhere durchschnittliche Nachfrage
-                demand = int(random.gauss(preference_factor * 100, 20))
 
-                # Verkaufe die Mindestmenge aus Angebot und Nachfrage
-                sold = min(quantity, max(0, demand))
+def discard_checkpoint():
+    """Verwirft den Stand von checkpoint(), wenn die Aktion nichts bewirkt hat"""
+    st.session_state.undo.discard(st.session_state.simulation)
 
-                # Berechne Umsatz
-                revenue = sold * self.bicycle_prices[bike_type]
-                total_revenue += revenue
 
-                # Aktualisiere Inventar auf dem Markt
-                self.markets[market_name]['bicycles'][bike_type] -= sold
+# Eingabefelder, deren Wert einen Teil des Spielstands spiegelt (Preise, Tagesmodus)
+GAME_STATE_WIDGET_PREFIXES = ('price_', 'daily_mode')
 
-                # Erfasse Verkaufsdaten
-                sales_by_market[market_name][bike_type] = {
-                    'quantity': sold,
-                    'revenue': revenue,
-                    'demand': demand
-                }
 
-        # Füge Einnahmen zum Guthaben hinzu
-        self.balance += total_revenue
-        if total_revenue > 0:
-            self.revenues.append({'month': self.current_month, 'type': 'sales', 'amount': total_revenue})
-
-        sales_data = {
-            'total_revenue': total_revenue,
-            'by_market': sales_by_market
-        }
-
-        self.sales_history.append({
-            'month': self.current_month,
-            'sales': sales_data
-        })
-
-        return sales_data
-
-    def pay_quarterly_expenses(self):
-        """
-        Zahlt quartalsweise Ausgaben (Lagermieten etc.)
-        """
-        if self.current_month % 3 != 0:
-            return {'status': 'No quarterly expenses this month'}
-
-        # Lagermieten
-        rent_germany = self.storage_rent['germany']
-        rent_france = self.storage_rent['france']
-        total_rent = rent_germany + rent_france
-
-        # Ziehe Mieten vom Guthaben ab
-        self.balance -= total_rent
-        self.expenses.append({'month': self.current_month, 'type': 'rent', 'amount': total_rent})
-
-        return {
-            'germany_rent': rent_germany,
-            'france_rent': rent_france,
-            'total_rent': total_rent
-        }
-
-    def generate_monthly_report(self):
-        """
-        Generiert einen monatlichen Bericht über den Geschäftsstatus
-        """
-        # Berechne Summen
-        month_expenses = sum(item['amount'] for item in self.expenses if item['month'] == self.current_month)
-        month_revenues = sum(item['amount'] for item in self.revenues if item['month'] == self.current_month)
-        month_profit = month_revenues - month_expenses
-
-        # Lagernutzung
-        storage_usage = self.calculate_storage_usage()
-
-        # Inventarbericht
-        inventory_summary = {
-            'materials': {
-                'germany': {k: v for k, v in self.inventory_germany.items() if
-                            k not in ['damenrad', 'e_bike', 'e_mountainbike', 'herrenrad', 'mountainbike', 'rennrad']},
-                'france': {k: v for k, v in self.inventory_france.items() if
-                           k not in ['damenrad', 'e_bike', 'e_mountainbike', 'herrenrad', 'mountainbike', 'rennrad']}
-            },
-            'bicycles': {
-                'germany': {k: v for k, v in self.inventory_germany.items() if
-                            k in ['damenrad', 'e_bike', 'e_mountainbike', 'herrenrad', 'mountainbike', 'rennrad']},
-                'france': {k: v for k, v in self.inventory_france.items() if
-                           k in ['damenrad', 'e_bike', 'e_mountainbike', 'herrenrad', 'mountainbike', 'rennrad']}
-            },
-            'markets': {market: data['bicycles'] for market, data in self.markets.items()}
-        }
-
-        # Personalbestand
-        staff_summary = {
-            'skilled': self.skilled_workers,
-            'unskilled': self.unskilled_workers,
-            'total': self.skilled_workers + self.unskilled_workers
-        }
-
-        report = {
-            'month': self.current_month,
-            'balance': self.balance,
-            'expenses': month_expenses,
-            'revenues': month_revenues,
-            'profit': month_profit,
-            'storage': storage_usage,
-            'inventory': inventory_summary,
-            'staff': staff_summary
-        }
-
-        self.monthly_reports.append(report)
-        return report
-
-    def advance_month(self):
-        """
-        Rückt zum nächsten Monat vor
-        """
-        self.current_month += 1
-
-    def is_bankrupt(self):
-        """
-        Überprüft, ob das Unternehmen bankrott ist
-        """
-        return self.balance <= 0
+def reset_game_state_widgets():
+    """Nach Rückgängig/Wiederholen lesen diese Felder ihren Wert neu aus dem aktiven Stand"""
+    for key in [key for key in st.session_state if key.startswith(GAME_STATE_WIDGET_PREFIXES)]:
+        del st.session_state[key]
 
 
-# Initialisierung der Session-State-Variablen
-if 'simulation' not in st.session_state:
-    st.session_state.simulation = BicycleSimulation()
-    st.session_state.show_report = False
-    st.session_state.current_tab = "Übersicht"
-    st.session_state.monthly_action_taken = False
+@st.fragment(run_every=1)
+def wait_for_dashboards():
+    """Fragt jede Sekunde nach, ob das Rendern im Hintergrund fertig ist, ohne die Seite zu blockieren"""
+    if st.session_state.dashboard_render.done():
+        st.rerun()
+    st.info("Dashboards werden im Hintergrund gerendert …")
 
 
 # Funktion zum Formatieren von Geldbeträgen
@@ -865,20 +222,50 @@ st.sidebar.info(f"Guthaben: {format_currency(sim.balance)}")
 st.sidebar.info(f"Facharbeiter: {sim.skilled_workers}")
 st.sidebar.info(f"Hilfsarbeiter: {sim.unskilled_workers}")
 
+# Rückgängig und Wiederholen tauschen nur das Spielobjekt der Sitzung aus
+undo = st.session_state.undo
+undo_col, redo_col = st.sidebar.columns(2)
+with undo_col:
+    if st.button("↶ Rückgängig", disabled=not undo.can_undo(),
+                 help=f"Letzte Aktion zurücknehmen ({len(undo)} von {undo.levels} Stufen gespeichert)"):
+        st.session_state.simulation = undo.undo(sim)
+        st.session_state.show_report = False
+        reset_game_state_widgets()
+        st.rerun()
+with redo_col:
+    if st.button("↷ Wiederholen", disabled=not undo.can_redo(), help="Zurückgenommene Aktion wiederholen"):
+        st.session_state.simulation = undo.redo(sim)
+        reset_game_state_widgets()
+        st.rerun()
+
+# Tagesmodus: Vorspulen bis zum nächsten Ereignis bzw. um eine Woche
+daily = st.sidebar.checkbox("Tagesgenaue Simulation", value=sim.daily, key="daily_mode",
+                            help="Lieferungen, Produktion und Verkäufe an eigenen Tagen (ab dem nächsten Monat)")
+if daily != sim.daily:
+    checkpoint()
+    sim.daily = daily
+    st.rerun()
+if sim.daily_active and not st.session_state.show_report:
+    st.sidebar.info(f"Tag: {sim.day_of_month} von 30")
+    day_col1, day_col2 = st.sidebar.columns(2)
+    with day_col1:
+        if st.button("Nächstes Ereignis"):
+            next_day = sim.next_event_day()
+            checkpoint()
+            sim.advance_to(next_day if next_day is not None else sim.day)
+            st.rerun()
+    with day_col2:
+        if st.button("+7 Tage"):
+            checkpoint()
+            sim.advance_to(sim.day + 7)
+            st.rerun()
+
 # Monat abschließen Button
 if not st.session_state.show_report:
     if st.sidebar.button("Monat abschließen"):
-        # Quartalsausgaben berechnen
-        sim.pay_quarterly_expenses()
-
-        # Verkäufe simulieren
-        sim.simulate_sales()
-
-        # Monatsbericht generieren
-        report = sim.generate_monthly_report()
-
-        # Zum nächsten Monat
-        sim.advance_month()
+        # Quartalsausgaben, Verkäufe, Monatsbericht und Monatswechsel
+        checkpoint()
+        report = sim.close_month()
 
         # Zurücksetzen der Aktionsmarkierung
         st.session_state.monthly_action_taken = False
@@ -887,6 +274,81 @@ if not st.session_state.show_report:
         st.session_state.show_report = True
         st.rerun()
 
+    # Autopilot: Einkauf, Produktion, Verteilung und Personal des Monats nach der gespeicherten Strategie
+    autopilot = current_autopilot()
+    if autopilot is not None and st.sidebar.button(
+            "Autopilot", help=f"Trifft die Entscheidungen dieses Monats nach der besten Strategie aus {AUTOPILOT_FILE}"):
+        checkpoint()
+        autopilot(sim)
+        st.session_state.monthly_action_taken = True
+        st.rerun()
+
+    # Empfehlung: Suche nach dem besten Bündel von Monatsentscheidungen (advisor.py)
+    with st.sidebar.expander("Empfehlung"):
+        advice_budget = st.slider("Rechenzeit (Sekunden)", min_value=0.5, max_value=10.0, value=2.0, step=0.5)
+        advice_horizon = st.slider("Vorausschau (Monate)", min_value=1, max_value=12, value=6)
+        if st.button("Empfehlung berechnen",
+                     help="Spielt Varianten der Entscheidungen dieses Monats mit zufälliger Nachfrage durch"):
+            advice_pool = get_advisor_executor()
+            with st.spinner("Varianten werden durchgespielt …"):
+                st.session_state.advice = recommend(
+                    sim, time_budget=advice_budget, horizon=advice_horizon,
+                    policy=autopilot if autopilot is not None else produce_to_capacity,
+                    executor=advice_pool['executor'], workers=advice_pool['workers'])
+            st.session_state.advice_state = state_hash(sim)
+
+        # Eine Empfehlung gilt nur für den Spielstand, für den sie berechnet wurde
+        advice = st.session_state.get('advice')
+        if advice is not None and st.session_state.advice_state == state_hash(sim):
+            st.write(advice['description'])
+            st.metric(f"Erwarteter Gewinn ({advice_horizon} Monate)", format_currency(advice['expected_profit']))
+            st.metric("Insolvenzrisiko", f"{advice['bankruptcy_risk'] * 100:.1f}%")
+            st.caption(f"{advice['rollouts']} von {advice['total_rollouts']} Auswertungen, "
+                       f"{advice['seconds']:.1f} s")
+            if st.button("Empfehlung übernehmen", disabled=not advice['actions']):
+                checkpoint()
+                apply_plan(sim, advice['actions'])
+                st.session_state.monthly_action_taken = True
+                del st.session_state.advice
+                st.rerun()
+
+# Debug-Panel: Laufzeit der Phasen des Monatsabschlusses
+with st.sidebar.expander("Debug: Laufzeitmessung"):
+    sim.timer.enabled = st.checkbox("Monatsabschluss messen", value=sim.timer.enabled)
+
+    timing_records = sim.timer.records()
+    if timing_records:
+        st.write(f"Letzte {len(timing_records)} von max. {sim.timer.capacity} Monaten")
+        timing_summary = sim.timer.summary()
+        st.dataframe(pd.DataFrame([
+            {
+                'Phase': phase,
+                'Ø ms': stats['mean_seconds'] * 1000,
+                'Max ms': stats['max_seconds'] * 1000,
+                'Ø Blöcke': stats['mean_allocations'],
+                'Anteil %': stats['share'] * 100
+            }
+            for phase, stats in timing_summary.items()
+        ]).round(3), hide_index=True)
+        st.line_chart(pd.DataFrame(
+            [{phase: values['seconds'] * 1000 for phase, values in record['phases'].items()}
+             for record in timing_records],
+            index=[record['month'] for record in timing_records]
+        ))
+        if st.button("Messungen löschen"):
+            sim.timer.clear()
+            st.rerun()
+    elif sim.timer.enabled:
+        st.write("Noch kein Monat gemessen.")
+
+# Debug-Panel: Aktionsprotokoll zum Nachspielen mit replay.py
+if sim.action_log is not None:
+    with st.sidebar.expander("Debug: Aktionsprotokoll"):
+        st.write(f"{len(sim.action_log)} Aktionen im laufenden Abschnitt protokolliert "
+                 f"(neuer Abschnitt nach {sim.action_log.max_entries})")
+        st.download_button("Protokoll herunterladen", sim.action_log.text(),
+                           file_name=f"spiel_{st.session_state.session_id}.jsonl", mime="application/jsonl")
+
 # Report anzeigen
 if st.session_state.show_report:
     st.info("Monatsbericht")
@@ -959,9 +421,12 @@ else:
         cols = st.columns(6)
         bike_types = ['herrenrad', 'damenrad', 'mountainbike', 'rennrad', 'e_bike', 'e_mountainbike']
 
+        bikes_germany = sim.bike_counts('germany')
+        bikes_france = sim.bike_counts('france')
+
         for i, bike_type in enumerate(bike_types):
-            de_count = sim.inventory_germany.get(bike_type, 0)
-            fr_count = sim.inventory_france.get(bike_type, 0)
+            de_count = bikes_germany.get(bike_type, 0)
+            fr_count = bikes_france.get(bike_type, 0)
             total = de_count + fr_count
 
             with cols[i]:
@@ -977,15 +442,62 @@ else:
 
         with col1:
             st.write("Münster")
+            market_bikes = sim.bike_counts('muenster')
             for bike_type in bike_types:
-                st.write(
-                    f"{bike_type.replace('_', ' ').title()}: {sim.markets['muenster']['bicycles'].get(bike_type, 0)}")
+                st.write(f"{bike_type.replace('_', ' ').title()}: {market_bikes.get(bike_type, 0)}")
 
         with col2:
             st.write("Toulouse")
+            market_bikes = sim.bike_counts('toulouse')
             for bike_type in bike_types:
-                st.write(
-                    f"{bike_type.replace('_', ' ').title()}: {sim.markets['toulouse']['bicycles'].get(bike_type, 0)}")
+                st.write(f"{bike_type.replace('_', ' ').title()}: {market_bikes.get(bike_type, 0)}")
+
+        # Kredite: Angebote, Aufnahme und laufende Kredite
+        st.subheader("Kredite")
+        credit_options = sim.catalog.credit_options
+        st.dataframe(pd.DataFrame([
+            {
+                'Kredit': terms['display_name'],
+                'Zinssatz p.a.': f"{terms['annual_interest'] * 100:.1f}%",
+                'Laufzeit (Monate)': terms['duration_months']
+            }
+            for terms in credit_options.values()
+        ]), hide_index=True)
+
+        available_credit = max(0.0, sim.catalog.credit_limit - sim.debt)
+        st.write(f"Offene Kredite: {format_currency(sim.debt)} | "
+                 f"Verfügbarer Kreditrahmen: {format_currency(available_credit)}")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            credit_option = st.selectbox("Kreditart", list(credit_options.keys()),
+                                         format_func=lambda x: credit_options[x]['display_name'])
+        with col2:
+            credit_amount = st.number_input("Kreditbetrag (€)", min_value=0, max_value=int(available_credit),
+                                            value=0, step=1000)
+
+        if st.button("Kredit aufnehmen", disabled=credit_amount <= 0):
+            checkpoint()
+            loan = sim.take_loan(credit_option, credit_amount)
+            if loan is None:
+                discard_checkpoint()
+            else:
+                # Neu laden, damit Guthaben und Kreditrahmen oben aktuell sind
+                st.rerun()
+
+        active_loans = sim.active_loans()
+        if active_loans:
+            st.dataframe(pd.DataFrame([
+                {
+                    'Kredit': credit_options[loan['option']]['display_name'],
+                    'Betrag': format_currency(loan['amount']),
+                    'Aufgenommen in Monat': loan['start_month'],
+                    'Monatliche Rate': format_currency(loan['monthly_payment']),
+                    'Restschuld': format_currency(loan['remaining']),
+                    'Letzte Rate in Monat': loan['last_payment_month']
+                }
+                for loan in active_loans
+            ]), hide_index=True)
 
     elif st.session_state.current_tab == "Einkauf":
         st.header("Einkauf von Fahrradteilen")
@@ -1061,12 +573,20 @@ else:
 
                 if st.button("Bestellen", key=f"order_btn_{supplier}"):
                     # Bestellung ausführen
+                    checkpoint()
                     result = sim.purchase_materials({supplier: order})
 
                     # Erfolgreiche Bestellung
                     if result['cost'] > 0:
                         st.success(f"Bestellung erfolgreich! Kosten: {format_currency(result['cost'])}")
 
+                        # Liefer- und Zahlungstermine
+                        delivery = result['deliveries'].get(supplier)
+                        if delivery:
+                            st.info(f"Lieferung an Tag {delivery['delivery_day']}, "
+                                    f"Zahlung an Tag {delivery['payment_day']} "
+                                    f"(spätestens beim Monatsabschluss verbucht)")
+
                         # Defekte Teile anzeigen, falls vorhanden
                         if result['defects']:
                             st.warning("Achtung! Einige Teile waren defekt und wurden nicht geliefert:")
@@ -1075,8 +595,26 @@ else:
 
                         st.session_state.monthly_action_taken = True
                     else:
+                        discard_checkpoint()
                         st.info("Es wurden keine Teile bestellt.")
 
+        # Offene Bestellungen und Rechnungen
+        open_orders = sim.open_orders()
+        if open_orders:
+            st.subheader("Offene Bestellungen")
+            st.dataframe(pd.DataFrame([
+                {
+                    'Liefertag': order['day'],
+                    'Lieferant': order['supplier'].replace('_', ' ').title(),
+                    'Artikel': ", ".join(f"{qty}x {item}" for item, qty in order['items'].items())
+                }
+                for order in open_orders
+            ]), hide_index=True)
+
+        open_invoices = sim.open_invoices()
+        if open_invoices:
+            st.write(f"Offene Rechnungen: {format_currency(sum(invoice['amount'] for invoice in open_invoices))}")
+
     elif st.session_state.current_tab == "Lager":
         st.header("Lagerverwaltung")
 
@@ -1099,29 +637,45 @@ else:
                 f"Genutzt: {storage_usage['france']['used']:.2f} von {storage_usage['france']['total']} m ({storage_usage['france']['percentage']:.1f}%)")
             st.write(f"Monatliche Miete: {format_currency(sim.storage_rent['france'])}")
 
+        # Fahrräder je Standort und Qualität
+        st.subheader("Fahrräder nach Qualität")
+        quality_names = {quality: sim.catalog.quality_levels[quality]['display_name'] for quality in sim.qualities}
+        st.dataframe(pd.DataFrame([
+            {
+                'Standort': location.title(),
+                'Fahrrad': bike_type.replace('_', ' ').title(),
+                **{quality_names[quality]: count for quality, count in by_quality.items()}
+            }
+            for location in sim.locations
+            for bike_type, by_quality in sim.bike_quality_counts(location).items()
+            if any(by_quality.values())
+        ], columns=['Standort', 'Fahrrad', *quality_names.values()]), hide_index=True)
+
         # Inventartransfer
         st.subheader("Inventartransfer zwischen Lagern")
         st.write("Transfer zwischen Lagern kostet 1.000 € pro Monat (unabhängig von der Menge).")
 
         # Liste aller Artikel mit Beständen
-        all_items = set(sim.inventory_germany.keys()).union(set(sim.inventory_france.keys()))
+        all_items = set(sim.inventory_germany.keys()).union(set(sim.inventory_france.keys()), sim.bike_types)
 
         transfers = {}
         transfer_initiated = False
 
         st.write("Artikel für Transfer auswählen:")
         for item in sorted(all_items):
-            if sim.inventory_germany.get(item, 0) > 0 or sim.inventory_france.get(item, 0) > 0:
+            de_stock = sim.item_count('germany', item)
+            fr_stock = sim.item_count('france', item)
+            if de_stock > 0 or fr_stock > 0:
                 col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
 
                 with col1:
                     st.write(item.replace('_', ' ').title())
 
                 with col2:
-                    st.write(f"DE: {sim.inventory_germany.get(item, 0)}")
+                    st.write(f"DE: {de_stock}")
 
                 with col3:
-                    st.write(f"FR: {sim.inventory_france.get(item, 0)}")
+                    st.write(f"FR: {fr_stock}")
 
                 with col4:
                     transfer_direction = st.selectbox(
@@ -1136,9 +690,7 @@ else:
                         to_warehouse = "france" if transfer_direction == "DE → FR" else "germany"
 
                         # Maximale Transfermenge
-                        max_transfer = sim.inventory_germany.get(item,
-                                                                 0) if from_warehouse == "germany" else sim.inventory_france.get(
-                            item, 0)
+                        max_transfer = de_stock if from_warehouse == "germany" else fr_stock
 
                         if max_transfer > 0:
                             transfer_qty = st.number_input(
@@ -1160,6 +712,7 @@ else:
 
         if transfer_initiated:
             if st.button("Transfer durchführen"):
+                checkpoint()
                 result = sim.transfer_inventory(transfers)
 
                 if result['fee'] > 0:
@@ -1167,6 +720,7 @@ else:
                         f"Transfer erfolgreich durchgeführt! Verwaltungsgebühr: {format_currency(result['fee'])}")
                     st.session_state.monthly_action_taken = True
                 else:
+                    discard_checkpoint()
                     st.info("Es wurde kein Transfer durchgeführt.")
 
     elif st.session_state.current_tab == "Personal":
@@ -1233,6 +787,7 @@ else:
                 st.write(f"Kosteneinsparung: {format_currency(-salary_difference)}")
 
             if st.button("Änderungen übernehmen"):
+                checkpoint()
                 result = sim.manage_workers(hire_skilled, fire_skilled, hire_unskilled, fire_unskilled)
 
                 # Erfolgsmeldung
@@ -1339,15 +894,23 @@ else:
         total_skilled_hours = 0
         total_unskilled_hours = 0
 
-        for bike_type, recipe in sim.bicycle_recipes.items():
-            # Maximale mögliche Produktionsmenge berechnen
-            max_skilled = int(skilled_capacity / recipe['skilled_hours']) if recipe['skilled_hours'] > 0 else float(
-                'inf')
-            max_unskilled = int(unskilled_capacity / recipe['unskilled_hours']) if recipe[
-                                                                                       'unskilled_hours'] > 0 else float(
-                'inf')
+        quality_levels = sim.catalog.quality_levels
 
-            max_by_labor = min(max_skilled, max_unskilled)
+        for bike_type, recipe in sim.bicycle_recipes.items():
+            quantity_col, quality_col = st.columns([2, 1])
+
+            # Qualitätsstufe bestimmt den Arbeitsaufwand (Faktor auf beide Arbeitszeiten)
+            with quality_col:
+                quality = st.selectbox(
+                    "Qualität",
+                    sim.qualities,
+                    index=sim.qualities.index('standard'),
+                    format_func=lambda q: quality_levels[q]['display_name'],
+                    key=f"produce_quality_{bike_type}"
+                )
+            labour_factor = quality_levels[quality]['labour_factor']
+            skilled_hours = recipe['skilled_hours'] * labour_factor
+            unskilled_hours = recipe['unskilled_hours'] * labour_factor
 
             # Maximale Produktionsmenge basierend auf verfügbaren Materialien
             max_by_materials = float('inf')
@@ -1364,31 +927,28 @@ else:
             remaining_skilled = skilled_capacity - total_skilled_hours
             remaining_unskilled = unskilled_capacity - total_unskilled_hours
 
-            max_remaining_skilled = int(remaining_skilled / recipe['skilled_hours']) if recipe[
-                                                                                            'skilled_hours'] > 0 else float(
-                'inf')
-            max_remaining_unskilled = int(remaining_unskilled / recipe['unskilled_hours']) if recipe[
-                                                                                                  'unskilled_hours'] > 0 else float(
-                'inf')
+            max_remaining_skilled = int(remaining_skilled / skilled_hours) if skilled_hours > 0 else float('inf')
+            max_remaining_unskilled = int(remaining_unskilled / unskilled_hours) if unskilled_hours > 0 else float('inf')
 
             max_by_remaining_labor = min(max_remaining_skilled, max_remaining_unskilled)
 
             max_production = min(max_by_materials, max_by_remaining_labor)
             max_production = max(0, max_production)  # Sicherstellen, dass es nicht negativ ist
 
-            quantity = st.number_input(
-                f"{bike_type.replace('_', ' ').title()} produzieren",
-                min_value=0,
-                max_value=int(max_production),
-                value=0,
-                step=1,
-                key=f"produce_{bike_type}"
-            )
+            with quantity_col:
+                quantity = st.number_input(
+                    f"{bike_type.replace('_', ' ').title()} produzieren",
+                    min_value=0,
+                    max_value=int(max_production),
+                    value=0,
+                    step=1,
+                    key=f"produce_{bike_type}"
+                )
 
             if quantity > 0:
-                production_plan[bike_type] = quantity
-                total_skilled_hours += quantity * recipe['skilled_hours']
-                total_unskilled_hours += quantity * recipe['unskilled_hours']
+                production_plan[bike_type] = {quality: quantity}
+                total_skilled_hours += quantity * skilled_hours
+                total_unskilled_hours += quantity * unskilled_hours
 
         # Produktionszusammenfassung
         if production_plan:
@@ -1400,6 +960,7 @@ else:
                 f"Benötigte Hilfsarbeiterzeit: {total_unskilled_hours:.2f} von {unskilled_capacity} Stunden ({(total_unskilled_hours / unskilled_capacity) * 100:.1f}%)")
 
             if st.button("Produktion starten"):
+                checkpoint()
                 result = sim.produce_bicycles(production_plan)
 
                 if sum(result['bikes'].values()) > 0:
@@ -1413,6 +974,7 @@ else:
 
                     st.session_state.monthly_action_taken = True
                 else:
+                    discard_checkpoint()
                     st.info("Es wurden keine Fahrräder produziert.")
 
     elif st.session_state.current_tab == "Absatzmarkt":
@@ -1423,10 +985,14 @@ else:
 
         bike_types = ['damenrad', 'e_bike', 'e_mountainbike', 'herrenrad', 'mountainbike', 'rennrad']
 
+        quality_levels = sim.catalog.quality_levels
+        bikes_germany = sim.bike_counts('germany')
+        bikes_france = sim.bike_counts('france')
+
         bike_stock = {}
         for bike_type in bike_types:
-            de_stock = sim.inventory_germany.get(bike_type, 0)
-            fr_stock = sim.inventory_france.get(bike_type, 0)
+            de_stock = bikes_germany[bike_type]
+            fr_stock = bikes_france[bike_type]
             bike_stock[bike_type] = {
                 'germany': de_stock,
                 'france': fr_stock,
@@ -1466,6 +1032,76 @@ else:
             for bike_type, preference in sim.markets['toulouse']['preference'].items():
                 st.write(f"{bike_type.replace('_', ' ').title()}: {preference * 100:.1f}%")
 
+        # Verkaufspreise je Markt; die Nachfrage reagiert auf Abweichungen vom Katalogpreis
+        st.subheader("Verkaufspreise")
+        st.write("Höhere Preise senken die Nachfrage, niedrigere Preise steigern sie.")
+
+        price_objective = st.radio("Preisempfehlung maximiert", ['revenue', 'margin'], horizontal=True,
+                                   format_func=lambda x: {'revenue': "Umsatz", 'margin': "Deckungsbeitrag"}[x])
+
+        price_quality = st.selectbox("Preise für Qualität", sim.qualities, index=sim.qualities.index('standard'),
+                                     format_func=lambda q: quality_levels[q]['display_name'])
+
+        def apply_price_suggestion(market, suggested_prices):
+            """Übernimmt die Empfehlung in die Simulation und in die Eingabefelder"""
+            checkpoint()
+            st.session_state.simulation.set_prices(market, suggested_prices)
+            # Die Eingabefelder übernehmen beim nächsten Lauf die neuen Preise als Startwert
+            for bike_type, by_quality in suggested_prices.items():
+                for quality in by_quality:
+                    st.session_state.pop(f"price_{market}_{bike_type}_{quality}", None)
+
+        price_tabs = st.tabs(["Münster", "Toulouse"])
+        for i, market in enumerate(['muenster', 'toulouse']):
+            with price_tabs[i]:
+                # Empfehlung für die aktuellen Marktbestände (zwischengespeichert je Bestand)
+                suggestion = sim.optimize_prices(market, price_objective)
+
+                new_prices = {}
+                price_cols = st.columns(3)
+                for j, bike_type in enumerate(bike_types):
+                    reference_price = sim.bicycle_prices[bike_type] * quality_levels[price_quality]['price_factor']
+                    with price_cols[j % 3]:
+                        new_prices[bike_type] = st.number_input(
+                            f"{bike_type.replace('_', ' ').title()} (Katalog: {format_currency(reference_price)})",
+                            min_value=1,
+                            value=int(sim.prices[market][bike_type][price_quality]),
+                            step=10,
+                            key=f"price_{market}_{bike_type}_{price_quality}"
+                        )
+
+                new_prices = {bike_type: {price_quality: price} for bike_type, price in new_prices.items()}
+                demand_factors = sim.demand_model.market_factors(market, new_prices)
+                market_stock = sim.bike_quality_counts(market)
+                st.dataframe(pd.DataFrame([
+                    {
+                        'Fahrradtyp': bike_type.replace('_', ' ').title(),
+                        'Preis': format_currency(new_prices[bike_type][price_quality]),
+                        'Erwartete Nachfrage': f"{demand_factors[bike_type][price_quality] * 100:.0f}%",
+                        'Im Markt': market_stock[bike_type][price_quality],
+                        'Empfohlener Preis': format_currency(suggestion['prices'][bike_type][price_quality]),
+                        'Erwarteter Absatz': round(suggestion['expected_sales'][bike_type][price_quality], 1)
+                    }
+                    for bike_type in bike_types
+                ]), hide_index=True)
+
+                if any(sim.prices[market][bike_type][price_quality] != new_prices[bike_type][price_quality]
+                       for bike_type in bike_types):
+                    checkpoint()
+                    sim.set_prices(market, new_prices)
+                    # Neu zeichnen, damit die Seitenleiste den neuen Rückgängig-Stand zeigt
+                    st.rerun()
+
+                if any(sum(by_quality.values()) for by_quality in market_stock.values()):
+                    expected_total = sum(sum(by_quality.values())
+                                         for by_quality in suggestion['expected_' + price_objective].values())
+                    st.write(f"Erwarteter {'Umsatz' if price_objective == 'revenue' else 'Deckungsbeitrag'} "
+                             f"mit Empfehlung: {format_currency(expected_total)}")
+                    st.button("Empfehlung übernehmen", key=f"apply_prices_{market}",
+                              on_click=apply_price_suggestion, args=(market, suggestion['prices']))
+                else:
+                    st.write("Keine Fahrräder im Markt: Empfehlung entspricht den Katalogpreisen.")
+
         # Verteilung der Fahrräder auf die Märkte
         st.subheader("Fahrräder auf Märkte verteilen")
         st.write("""
@@ -1485,12 +1121,22 @@ else:
         for i, market in enumerate(['muenster', 'toulouse']):
             with market_tabs[i]:
                 for bike_type in bike_types:
-                    de_stock = bike_stock[bike_type]['germany']
-                    fr_stock = bike_stock[bike_type]['france']
-
-                    if de_stock > 0 or fr_stock > 0:
+                    if bike_stock[bike_type]['total'] > 0:
                         st.write(f"**{bike_type.replace('_', ' ').title()}**")
 
+                        # Nur Qualitäten mit Bestand in einem der Lager anbieten
+                        available_qualities = [quality for quality in sim.qualities
+                                               if sim.item_count('germany', bike_type, quality)
+                                               + sim.item_count('france', bike_type, quality) > 0]
+                        quality = st.selectbox(
+                            "Qualität",
+                            available_qualities,
+                            format_func=lambda q: quality_levels[q]['display_name'],
+                            key=f"dist_{market}_quality_{bike_type}"
+                        )
+                        de_stock = sim.item_count('germany', bike_type, quality)
+                        fr_stock = sim.item_count('france', bike_type, quality)
+
                         col1, col2, col3 = st.columns(3)
 
                         with col1:
@@ -1504,8 +1150,8 @@ else:
                             )
 
                             if from_de > 0:
-                                distribution_plan[market][bike_type] = distribution_plan[market].get(bike_type,
-                                                                                                     0) + from_de
+                                planned = distribution_plan[market].setdefault(bike_type, {})
+                                planned[quality] = planned.get(quality, 0) + from_de
 
                                 # Berechne Transportkosten
                                 if market == 'muenster':
@@ -1524,8 +1170,8 @@ else:
                             )
 
                             if from_fr > 0:
-                                distribution_plan[market][bike_type] = distribution_plan[market].get(bike_type,
-                                                                                                     0) + from_fr
+                                planned = distribution_plan[market].setdefault(bike_type, {})
+                                planned[quality] = planned.get(quality, 0) + from_fr
 
                                 # Berechne Transportkosten
                                 if market == 'toulouse':
@@ -1535,10 +1181,11 @@ else:
 
                         with col3:
                             if market in distribution_plan and bike_type in distribution_plan[market]:
-                                st.write(f"Gesamt: {distribution_plan[market][bike_type]}")
+                                planned_total = distribution_plan[market][bike_type][quality]
+                                st.write(f"Gesamt: {planned_total}")
 
                                 # Berechne potenziellen Erlös
-                                potential_revenue = distribution_plan[market][bike_type] * sim.bicycle_prices[bike_type]
+                                potential_revenue = planned_total * sim.prices[market][bike_type][quality]
                                 st.write(f"Potenzieller Erlös: {format_currency(potential_revenue)}")
 
         # Gesamtübersicht
@@ -1548,6 +1195,7 @@ else:
             st.write(f"Transportkosten: {format_currency(shipping_costs)}")
 
             if st.button("Verteilung durchführen"):
+                checkpoint()
                 result = sim.distribute_to_markets(distribution_plan)
 
                 if result['cost'] > 0:
@@ -1556,6 +1204,7 @@ else:
 
                     st.session_state.monthly_action_taken = True
                 else:
+                    discard_checkpoint()
                     st.info("Es wurden keine Fahrräder verteilt.")
 
     elif st.session_state.current_tab == "Berichte":
@@ -1643,21 +1292,17 @@ else:
         if sim.sales_history:
             st.subheader("Verkaufsstatistiken")
 
-            # Gesamtumsatz pro Monat
-            months = []
-            revenues = []
-
-            for sale in sim.sales_history:
-                months.append(sale['month'])
-                revenues.append(sale['sales']['total_revenue'])
+            # Die Summen führt die Engine beim Verbuchen der Verkäufe mit (sim.sales_totals)
+            totals = sim.sales_totals
 
             # Umsatzgrafik
             st.write("**Umsatz pro Quartal**")
+            quarters = list(totals.by_quarter)
             fig3, ax3 = plt.subplots(figsize=(10, 4))
-            ax3.bar(months, revenues)
-            ax3.set_xlabel('Monat')
+            ax3.bar(quarters, list(totals.by_quarter.values()))
+            ax3.set_xlabel('Quartal')
             ax3.set_ylabel('Umsatz (€)')
-            ax3.set_xticks(months)
+            ax3.set_xticks(quarters)
             ax3.grid(True)
 
             st.pyplot(fig3)
@@ -1666,15 +1311,7 @@ else:
             st.write("**Verkäufe nach Fahrradtyp**")
 
             if sim.sales_history:
-                # Sammle Verkaufsdaten nach Fahrradtyp
-                bike_sales = {}
-
-                for sale in sim.sales_history:
-                    for market, market_data in sale['sales']['by_market'].items():
-                        for bike_type, bike_data in market_data.items():
-                            if bike_type not in bike_sales:
-                                bike_sales[bike_type] = 0
-                            bike_sales[bike_type] += bike_data['quantity']
+                bike_sales = {bike_type: entry['quantity'] for bike_type, entry in totals.by_bike_type.items()}
 
                 # Erstelle Kreisdiagramm
                 if bike_sales:
@@ -1693,13 +1330,7 @@ else:
             st.write("**Verkäufe nach Markt**")
 
             if sim.sales_history:
-                # Sammle Verkaufsdaten nach Markt
-                market_sales = {'muenster': 0, 'toulouse': 0}
-
-                for sale in sim.sales_history:
-                    for market, market_data in sale['sales']['by_market'].items():
-                        for bike_type, bike_data in market_data.items():
-                            market_sales[market] += bike_data['quantity']
+                market_sales = {market: totals.by_market.get(market, {}).get('quantity', 0) for market in sim.markets}
 
                 # Erstelle Balkendiagramm
                 if any(market_sales.values()):
@@ -1714,6 +1345,92 @@ else:
 
                     st.pyplot(fig5)
 
+        # Monte-Carlo-Risikoanalyse einer Strategie ab dem aktuellen Spielstand
+        st.subheader("Risikoanalyse")
+        st.write("Spielt eine Strategie ab dem aktuellen Stand mehrfach mit unterschiedlichen Zufallszahlen durch.")
+
+        risk_strategies, risk_strategy_names = dict(STRATEGIES), dict(STRATEGY_NAMES)
+        autopilot = current_autopilot()
+        if autopilot is not None:
+            risk_strategies['autopilot'] = autopilot
+            risk_strategy_names['autopilot'] = "Autopilot (gespeicherte Strategie)"
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            risk_strategy = st.selectbox("Strategie", list(risk_strategies), format_func=risk_strategy_names.get)
+        with col2:
+            risk_runs = st.number_input("Anzahl Läufe", min_value=10, max_value=5000, value=200, step=10)
+        with col3:
+            risk_months = st.number_input("Monate", min_value=1, max_value=60, value=12, step=1)
+
+        if st.button("Risikoanalyse starten"):
+            risk_progress = st.progress(0.0)
+            st.session_state.risk_report = risk_report(
+                risk_strategies[risk_strategy], runs=int(risk_runs), months=int(risk_months), start=sim,
+                progress=lambda done, total: risk_progress.progress(done / total), cache=get_result_cache())
+            st.session_state.risk_report_month = sim.current_month
+
+        risk = st.session_state.get('risk_report')
+        if risk is not None:
+            start_month = st.session_state.risk_report_month
+            horizon = len(risk['months'])
+            risk_months_axis = [start_month + m - 1 for m in risk['months']]
+
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric(f"Insolvenzrisiko ({horizon} Monate)", f"{risk['ruin_probability'] * 100:.1f}%")
+            with col2:
+                time_to_ruin = risk['expected_time_to_ruin']
+                st.metric("Mittlere Zeit bis zur Insolvenz",
+                          f"{time_to_ruin:.1f} Monate" if time_to_ruin is not None else "keine Insolvenz")
+            with col3:
+                st.metric(f"Value at Risk ({risk['var_level'] * 100:.0f}%, Monat {risk_months_axis[-1]})",
+                          format_currency(risk['value_at_risk'][-1]))
+
+            st.write("**Guthaben (Quantile über alle Läufe)**")
+            fig_risk, ax_risk = plt.subplots(figsize=(10, 4))
+            quantiles = risk['balance_quantiles']
+            ax_risk.fill_between(risk_months_axis, quantiles[0.05], quantiles[0.95], alpha=0.2, label='5–95%')
+            ax_risk.fill_between(risk_months_axis, quantiles[0.25], quantiles[0.75], alpha=0.4, label='25–75%')
+            ax_risk.plot(risk_months_axis, quantiles[0.5], linewidth=2, label='Median')
+            ax_risk.axhline(0, color='red', linewidth=1)
+            ax_risk.set_xlabel('Monat')
+            ax_risk.set_ylabel('Guthaben (€)')
+            ax_risk.grid(True)
+            ax_risk.legend()
+            st.pyplot(fig_risk)
+
+            st.dataframe(pd.DataFrame({
+                'Monat': risk_months_axis,
+                'Insolvenzwahrscheinlichkeit': [f"{p * 100:.1f}%" for p in risk['bankruptcy_probability']],
+                'Median-Guthaben': [format_currency(v) for v in quantiles[0.5]],
+                'Cash at Risk': [format_currency(v) for v in risk['cash_at_risk']],
+                'Value at Risk': [format_currency(v) for v in risk['value_at_risk']],
+            }), hide_index=True)
+
+        # Dashboards (Finanzen, Verkäufe, Märkte) im Hintergrund-Prozesspool rendern
+        if sim.monthly_reports:
+            st.subheader("Dashboards exportieren")
+            if st.button("Dashboards rendern"):
+                st.session_state.dashboard_render = get_render_service().submit(
+                    sim.dashboard_reports(), sim.catalog.market_preferences, formats=('png',))
+
+            dashboard_render = st.session_state.get('dashboard_render')
+            if dashboard_render is not None and not dashboard_render.done():
+                wait_for_dashboards()
+            elif dashboard_render is not None:
+                try:
+                    dashboard_images = dashboard_render.result()
+                except Exception as e:
+                    st.error(f"Dashboards konnten nicht gerendert werden: {e}")
+                else:
+                    dashboard_titles = {'financial': "Finanzen", 'sales': "Verkäufe", 'market': "Märkte"}
+                    for dashboard, images in dashboard_images.items():
+                        st.image(images['png'], caption=dashboard_titles.get(dashboard, dashboard))
+                        st.download_button(f"{dashboard_titles.get(dashboard, dashboard)} herunterladen (PNG)",
+                                           images['png'], file_name=f"fahrradsimulation_{dashboard}.png",
+                                           mime="image/png", key=f"download_{dashboard}")
+
     elif st.session_state.current_tab == "Hilfe":
         st.header("Hilfe & Spielanleitung")
 
@@ -1755,4 +1472,7 @@ else:
           - Frankreich → Münster: 100 € pro Fahrrad
 
         Viel Erfolg bei Ihrer Fahrradproduktion!
-        """)
\ No newline at end of file
+        """)
+
+# Kennzahlen des Skriptlaufs erfassen (nur bei vollständigen Läufen, st.rerun bricht vorher ab)
+record_run_metrics(st.session_state.session_id, sim)
@@ -0,0 +1,105 @@
+"""
+Rückgängig und Wiederholen für Spiele der Streamlit-Engine (simulation_engine.py).
+
+Vor jeder Aktion wird mit sim.fork() ein Stand abgelegt. Ein Fork teilt alle Bestände und die
+Historie mit dem Spiel, bis eine Seite sie ändert (copy-on-write); eine Stufe kostet daher nur
+die Container, die die folgende Aktion tatsächlich ändert, und keine tiefe Kopie. Rückgängig
+und Wiederholen tauschen nur das Spielobjekt aus (O(1)):
+
+    undo = UndoStack()
+    undo.push(sim)
+    sim.purchase_materials(...)
+    sim = undo.undo(sim)
+
+Hängt am Spiel ein Aktionsprotokoll (action_log.py), wandert es zum jeweils aktiven Stand mit
+und erhält Einträge 'checkpoint', 'discard', 'undo' und 'redo', sodass replay.py auch Spiele mit
+zurückgenommenen Aktionen exakt nachspielt.
+"""
+
+from collections import deque
+
+# Anzahl der Stufen je Sitzung
+DEFAULT_LEVELS = 50
+
+# Protokolleinträge des Stapels (von replay.py nachgespielt)
+UNDO_ACTIONS = ('checkpoint', 'discard', 'undo', 'redo')
+
+
+class UndoStack:
+    """Stapel gespeicherter Spielstände; die ältesten Stufen fallen nach `levels` Einträgen weg"""
+
+    def __init__(self, levels=DEFAULT_LEVELS):
+        self._undo = deque(maxlen=levels)
+        self._redo = []
+
+    @property
+    def levels(self):
+        return self._undo.maxlen
+
+    def can_undo(self):
+        return bool(self._undo)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def __len__(self):
+        return len(self._undo)
+
+    @staticmethod
+    def _log(sim, action, switched=False):
+        if sim.action_log is not None:
+            sim.action_log.note(sim, action, switched)
+
+    @staticmethod
+    def _activate(restored, current):
+        """Übergibt Oberfläche, Laufzeitmessung, Kennzahlen und Protokoll an den wiederhergestellten Stand"""
+        restored.ui, restored.timer, restored.action_log = current.ui, current.timer, current.action_log
+        restored.record_metrics, current.record_metrics = current.record_metrics, False
+        current.action_log = None
+        return restored
+
+    def push(self, sim):
+        """Legt den aktuellen Stand vor einer Aktion ab; eine neue Aktion verwirft die Wiederholungen"""
+        self._log(sim, 'checkpoint')
+        self._undo.append(sim.fork())
+        self._redo.clear()
+
+    def discard(self, sim):
+        """Verwirft die zuletzt abgelegte Stufe, wenn die Aktion danach nichts geändert hat (z. B. abgelehnter Kredit)"""
+        self._log(sim, 'discard')
+        self._undo.pop()
+
+    def undo(self, sim):
+        """Gibt den Stand vor der letzten Aktion zurück; `sim` wird zum Wiederholen abgelegt"""
+        self._log(sim, 'undo', switched=True)
+        restored = self._activate(self._undo.pop(), sim)
+        self._redo.append(sim)
+        return restored
+
+    def redo(self, sim):
+        """Gibt den zuletzt zurückgenommenen Stand zurück"""
+        self._log(sim, 'redo', switched=True)
+        restored = self._activate(self._redo.pop(), sim)
+        self._undo.append(sim)
+        return restored
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+
+    def states(self):
+        """Abgelegte Stände als (Rückgängig, Wiederholen), jeweils älteste zuerst"""
+        return list(self._undo), list(self._redo)
+
+    @classmethod
+    def restore(cls, undo_states, redo_states, levels=DEFAULT_LEVELS):
+        """
+        Stapel aus gespeicherten Ständen (z. B. entpickelt aus einem Aktionsprotokoll). Die Stände
+        können Container teilen und werden daher wieder als Forks markiert (copy-on-write).
+        """
+        stack = cls(levels)
+        for state in [*undo_states, *redo_states]:
+            state._shared = set(state.COPY_ON_WRITE)
+        stack._undo.extend(undo_states)
+        stack._redo.extend(redo_states)
+        return stack